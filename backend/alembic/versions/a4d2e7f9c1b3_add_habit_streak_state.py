@@ -0,0 +1,103 @@
+"""Add streak state to habits
+
+Revision ID: a4d2e7f9c1b3
+Revises: f1c6a8d3e5b7
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from datetime import date, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d2e7f9c1b3'
+down_revision: Union[str, Sequence[str], None] = 'f1c6a8d3e5b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_HABITS = 500
+RECENT_DAYS = 90
+
+
+def _streak_state(completed_days, anchor):
+    # Frozen copy of app.habit_stats.compute as of this revision
+    current = longest = 0
+    previous = None
+    for day in completed_days:
+        current = current + 1 if previous is not None and day == previous + timedelta(days=1) else 1
+        longest = max(longest, current)
+        previous = day
+
+    anchor = max(anchor, previous) if previous else anchor
+    mask = 0
+    for day in completed_days:
+        offset = (anchor - day).days
+        if 0 <= offset < RECENT_DAYS:
+            mask |= 1 << offset
+    return {
+        'current_streak': current,
+        'longest_streak': longest,
+        'last_completed_on': previous,
+        'recent_completions': (mask & ((1 << RECENT_DAYS) - 1)).to_bytes(RECENT_DAYS // 8 + 1, 'little'),
+        'recent_anchor': anchor,
+    }
+
+
+def _backfill(conn) -> None:
+    # Migrations run at startup, so the stats must be right before the first request reads them.
+    # Habits without completed logs keep the column defaults, which already describe them.
+    habits = sa.table(
+        'habits',
+        sa.column('id', sa.Uuid()),
+        sa.column('current_streak', sa.Integer()),
+        sa.column('longest_streak', sa.Integer()),
+        sa.column('last_completed_on', sa.Date()),
+        sa.column('recent_completions', sa.LargeBinary()),
+        sa.column('recent_anchor', sa.Date()),
+    )
+    logs = sa.table('habit_logs', sa.column('habit_id', sa.Uuid()), sa.column('date', sa.Date()), sa.column('completed', sa.Boolean()))
+    update = habits.update().where(habits.c.id == sa.bindparam('habit_id'))
+    today, after = date.today(), None
+    # A batch of habits at a time, so only their logs are ever in memory
+    while True:
+        query = sa.select(habits.c.id).order_by(habits.c.id).limit(BATCH_HABITS)
+        if after is not None:
+            query = query.where(habits.c.id > after)
+        habit_ids = conn.execute(query).scalars().all()
+        if not habit_ids:
+            return
+        days = {}
+        for habit_id, day in conn.execute(
+            sa.select(logs.c.habit_id, logs.c.date)
+            .where(logs.c.habit_id.in_(habit_ids), logs.c.completed == sa.true())
+            .order_by(logs.c.habit_id, logs.c.date)
+        ):
+            days.setdefault(habit_id, []).append(day)
+        if days:
+            conn.execute(update, [
+                {'habit_id': habit_id, **_streak_state(habit_days, today)} for habit_id, habit_days in days.items()
+            ])
+        after = habit_ids[-1]
+
+
+def upgrade() -> None:
+    """Upgrade schema and fill the new columns from the existing logs."""
+    op.add_column('habits', sa.Column('current_streak', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('habits', sa.Column('longest_streak', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('habits', sa.Column('last_completed_on', sa.Date(), nullable=True))
+    op.add_column('habits', sa.Column('recent_completions', sa.LargeBinary(length=12), nullable=True))
+    op.add_column('habits', sa.Column('recent_anchor', sa.Date(), nullable=True))
+    _backfill(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('habits') as batch_op:
+        batch_op.drop_column('recent_anchor')
+        batch_op.drop_column('recent_completions')
+        batch_op.drop_column('last_completed_on')
+        batch_op.drop_column('longest_streak')
+        batch_op.drop_column('current_streak')
@@ -0,0 +1,81 @@
+"""Add per-habit-per-year completion bitmaps
+
+Revision ID: b8e3f1a6d2c9
+Revises: a4d2e7f9c1b3
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e3f1a6d2c9'
+down_revision: Union[str, Sequence[str], None] = 'a4d2e7f9c1b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_HABITS = 500
+YEAR_BYTES = 46  # 366 bits
+
+
+def _build_years(days):
+    # Frozen copy of app.habit_bitmaps.build_years as of this revision
+    years = {}
+    for day in days:
+        bits = years.setdefault(day.year, bytearray(YEAR_BYTES))
+        index = day.timetuple().tm_yday - 1
+        bits[index >> 3] |= 1 << (index & 7)
+    return {year: bytes(bits) for year, bits in years.items()}
+
+
+def upgrade() -> None:
+    """Upgrade schema and fill the bitmaps from the existing logs."""
+    bitmaps = op.create_table('habit_bitmaps',
+    sa.Column('habit_id', sa.Uuid(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('bits', sa.LargeBinary(length=46), nullable=False),
+    sa.ForeignKeyConstraint(['habit_id'], ['habits.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('habit_id', 'year')
+    )
+    op.create_index('ix_habit_bitmaps_user_year', 'habit_bitmaps', ['user_id', 'year'], unique=False)
+    _backfill(bitmaps)
+
+
+def _backfill(bitmaps: sa.Table) -> None:
+    # The heatmap reads only these rows, so they must exist before the first request after startup
+    habits = sa.table('habits', sa.column('id', sa.Uuid()), sa.column('user_id', sa.Uuid()))
+    logs = sa.table('habit_logs', sa.column('habit_id', sa.Uuid()), sa.column('date', sa.Date()), sa.column('completed', sa.Boolean()))
+    conn, after = op.get_bind(), None
+    # A batch of habits at a time, so only their logs are ever in memory
+    while True:
+        query = sa.select(habits.c.id, habits.c.user_id).order_by(habits.c.id).limit(BATCH_HABITS)
+        if after is not None:
+            query = query.where(habits.c.id > after)
+        owners = dict(conn.execute(query).all())
+        if not owners:
+            return
+        days = {}
+        for habit_id, day in conn.execute(
+            sa.select(logs.c.habit_id, logs.c.date)
+            .where(logs.c.habit_id.in_(list(owners)), logs.c.completed == sa.true())
+        ):
+            days.setdefault(habit_id, []).append(day)
+        rows = [
+            {'habit_id': habit_id, 'year': year, 'user_id': owners[habit_id], 'bits': bits}
+            for habit_id, habit_days in days.items()
+            for year, bits in _build_years(habit_days).items()
+        ]
+        if rows:
+            op.bulk_insert(bitmaps, rows)
+        after = list(owners)[-1]
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_habit_bitmaps_user_year', table_name='habit_bitmaps')
+    op.drop_table('habit_bitmaps')
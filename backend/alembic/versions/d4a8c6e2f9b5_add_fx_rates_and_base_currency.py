@@ -0,0 +1,51 @@
+"""Add fx_rates table and users.base_currency; expense index covers currency; rollups count unconverted spend
+
+Revision ID: d4a8c6e2f9b5
+Revises: c2f7a9e4b6d1
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a8c6e2f9b5'
+down_revision: Union[str, Sequence[str], None] = 'c2f7a9e4b6d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema. Load rates with scripts/load_fx_rates.py."""
+    op.create_table('fx_rates',
+    sa.Column('currency', sa.String(length=3), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('rate', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('currency', 'date')
+    )
+    op.add_column('users', sa.Column('base_currency', sa.String(length=3), nullable=False, server_default='NGN'))
+    # d571880c6a67 added expenses.currency, but schemas built by create_all never had it
+    if 'currency' not in {column['name'] for column in sa.inspect(op.get_bind()).get_columns('expenses')}:
+        op.add_column('expenses', sa.Column('currency', sa.String(length=3), nullable=False, server_default='NGN'))
+    # Expenses without a rate are left out of spend totals and counted here instead
+    op.add_column('daily_rollups', sa.Column('spend_unconverted', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('expense_rollups', sa.Column('unconverted_count', sa.Integer(), nullable=False, server_default='0'))
+    # Spend totals convert per row, so the covering index needs the currency too
+    op.drop_index('ix_expenses_user_date', table_name='expenses', if_exists=True)
+    op.create_index('ix_expenses_user_date', 'expenses', ['user_id', 'date', 'category', 'amount', 'currency'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_expenses_user_date', table_name='expenses', if_exists=True)
+    op.create_index('ix_expenses_user_date', 'expenses', ['user_id', 'date', 'category', 'amount'], unique=False)
+    with op.batch_alter_table('expense_rollups') as batch_op:
+        batch_op.drop_column('unconverted_count')
+    with op.batch_alter_table('daily_rollups') as batch_op:
+        batch_op.drop_column('spend_unconverted')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('base_currency')
+    op.drop_table('fx_rates')
@@ -0,0 +1,59 @@
+"""Composite (user_id, date) indexes for per-day tables
+
+Revision ID: d7a4c1e9b2f3
+Revises: c58d2e4f6a10
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a4c1e9b2f3'
+down_revision: Union[str, Sequence[str], None] = 'c58d2e4f6a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> columns of its composite index (leading user_id, date)
+COMPOSITE_INDEXES = {
+    'todos': ['user_id', 'date'],
+    'habit_logs': ['user_id', 'date'],
+    'expenses': ['user_id', 'date', 'category', 'amount'],
+    'transactions': ['user_id', 'date'],
+    'learning_sessions': ['user_id', 'date'],
+    'workouts': ['user_id', 'date'],
+}
+# Single-column indexes made redundant by the composites (daily_notes is covered by uq_user_note_date)
+REDUNDANT_TABLES = list(COMPOSITE_INDEXES) + ['daily_notes']
+
+
+def _existing_tables() -> set:
+    # transactions only exists where create_all has run
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    tables = _existing_tables()
+    for table, columns in COMPOSITE_INDEXES.items():
+        if table in tables:
+            op.create_index(f'ix_{table}_user_date', table, columns, unique=False, if_not_exists=True)
+    for table in REDUNDANT_TABLES:
+        if table in tables:
+            op.drop_index(op.f(f'ix_{table}_user_id'), table_name=table, if_exists=True)
+            op.drop_index(op.f(f'ix_{table}_date'), table_name=table, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    tables = _existing_tables()
+    for table in REDUNDANT_TABLES:
+        if table in tables:
+            op.create_index(op.f(f'ix_{table}_user_id'), table, ['user_id'], unique=False, if_not_exists=True)
+            op.create_index(op.f(f'ix_{table}_date'), table, ['date'], unique=False, if_not_exists=True)
+    for table in COMPOSITE_INDEXES:
+        if table in tables:
+            op.drop_index(f'ix_{table}_user_date', table_name=table, if_exists=True)
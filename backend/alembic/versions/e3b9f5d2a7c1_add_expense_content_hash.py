@@ -0,0 +1,66 @@
+"""Add content hash to expenses for import de-duplication
+
+Revision ID: e3b9f5d2a7c1
+Revises: d7a4c1e9b2f3
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b9f5d2a7c1'
+down_revision: Union[str, Sequence[str], None] = 'd7a4c1e9b2f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_ROWS = 5000
+
+
+def _content_hash(day, amount, description, occurrence):
+    # Frozen copy of app.expense_import.content_hash as of this revision
+    key = f"{day.isoformat()}|{amount:.2f}|{' '.join((description or '').lower().split())}|{occurrence}"
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def _backfill(conn) -> None:
+    expenses = sa.table(
+        'expenses',
+        sa.column('id', sa.Uuid()), sa.column('user_id', sa.Uuid()), sa.column('date', sa.Date()),
+        sa.column('amount', sa.Float()), sa.column('description', sa.String()),
+        sa.column('created_at', sa.DateTime()), sa.column('content_hash', sa.String()),
+    )
+    rows = conn.execute(
+        sa.select(expenses.c.id, expenses.c.user_id, expenses.c.date, expenses.c.amount, expenses.c.description)
+        .order_by(expenses.c.user_id, expenses.c.date, expenses.c.created_at)
+    )
+    occurrences, updates = {}, []
+    update = sa.update(expenses).where(expenses.c.id == sa.bindparam('expense_id')).values(content_hash=sa.bindparam('hash'))
+    for expense_id, user_id, day, amount, description in rows.all():
+        key = (user_id, day, round(amount, 2), ' '.join((description or '').lower().split()))
+        occurrence = occurrences.get(key, 0)
+        occurrences[key] = occurrence + 1
+        updates.append({'expense_id': expense_id, 'hash': _content_hash(day, amount, description, occurrence)})
+        if len(updates) >= BATCH_ROWS:
+            conn.execute(update, updates)
+            updates = []
+    if updates:
+        conn.execute(update, updates)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('expenses', sa.Column('content_hash', sa.String(length=32), nullable=True))
+    _backfill(op.get_bind())
+    op.create_index('ix_expenses_user_content_hash', 'expenses', ['user_id', 'content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_expenses_user_content_hash', table_name='expenses')
+    with op.batch_alter_table('expenses') as batch_op:
+        batch_op.drop_column('content_hash')
@@ -0,0 +1,77 @@
+"""Make (user_id, content_hash) unique on expenses, renumbering duplicate hashes first
+
+Revision ID: e6b2d9f4a1c8
+Revises: d4a8c6e2f9b5
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b2d9f4a1c8'
+down_revision: Union[str, Sequence[str], None] = 'd4a8c6e2f9b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_ROWS = 5000
+
+
+def _content_hash(day, amount, description, occurrence):
+    # Frozen copy of app.expense_import.content_hash as of this revision
+    key = f"{day.isoformat()}|{amount:.2f}|{' '.join((description or '').lower().split())}|{occurrence}"
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def _renumber(conn) -> None:
+    # Manual and assistant entries were all hashed as occurrence 0 before this revision, so
+    # identical ones on the same day share a hash. Renumber the days that have such a clash
+    # the way e3b9f5d2a7c1 numbered everything: in creation order, per (date, amount, description).
+    expenses = sa.table(
+        'expenses',
+        sa.column('id', sa.Uuid()), sa.column('user_id', sa.Uuid()), sa.column('date', sa.Date()),
+        sa.column('amount', sa.Float()), sa.column('description', sa.String()),
+        sa.column('created_at', sa.DateTime()), sa.column('content_hash', sa.String()),
+    )
+    clashes = conn.execute(
+        sa.select(expenses.c.user_id, expenses.c.date).distinct()
+        .where(expenses.c.content_hash.is_not(None))
+        .group_by(expenses.c.user_id, expenses.c.date, expenses.c.content_hash)
+        .having(sa.func.count() > 1)
+    ).all()
+    update = sa.update(expenses).where(expenses.c.id == sa.bindparam('expense_id')).values(content_hash=sa.bindparam('hash'))
+    updates = []
+    for user_id, day in clashes:
+        rows = conn.execute(
+            sa.select(expenses.c.id, expenses.c.amount, expenses.c.description)
+            .where(expenses.c.user_id == user_id, expenses.c.date == day)
+            .order_by(expenses.c.created_at, expenses.c.id)
+        )
+        occurrences = {}
+        for expense_id, amount, description in rows.all():
+            key = (round(amount, 2), ' '.join((description or '').lower().split()))
+            occurrence = occurrences.get(key, 0)
+            occurrences[key] = occurrence + 1
+            updates.append({'expense_id': expense_id, 'hash': _content_hash(day, amount, description, occurrence)})
+        if len(updates) >= BATCH_ROWS:
+            conn.execute(update, updates)
+            updates = []
+    if updates:
+        conn.execute(update, updates)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _renumber(op.get_bind())
+    op.drop_index('ix_expenses_user_content_hash', table_name='expenses', if_exists=True)
+    op.create_index('ix_expenses_user_content_hash', 'expenses', ['user_id', 'content_hash'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_expenses_user_content_hash', table_name='expenses')
+    op.create_index('ix_expenses_user_content_hash', 'expenses', ['user_id', 'content_hash'], unique=False)
@@ -0,0 +1,42 @@
+"""Add daily_rollups table
+
+Revision ID: f1c6a8d3e5b7
+Revises: e3b9f5d2a7c1
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c6a8d3e5b7'
+down_revision: Union[str, Sequence[str], None] = 'e3b9f5d2a7c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema. app.migrations rebuilds the rollups once the upgrade reaches head."""
+    op.create_table('daily_rollups',
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('habits_completed', sa.Integer(), nullable=False),
+    sa.Column('habits_total', sa.Integer(), nullable=False),
+    sa.Column('todos_done', sa.Integer(), nullable=False),
+    sa.Column('todos_total', sa.Integer(), nullable=False),
+    sa.Column('learning_minutes', sa.Integer(), nullable=False),
+    sa.Column('workout_count', sa.Integer(), nullable=False),
+    sa.Column('spend', sa.Float(), nullable=False),
+    sa.Column('mood', sa.String(length=50), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'date')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('daily_rollups')
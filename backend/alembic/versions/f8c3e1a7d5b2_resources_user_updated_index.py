@@ -0,0 +1,38 @@
+"""Composite (user_id, updated_at, id) index for resources keyset pagination
+
+Revision ID: f8c3e1a7d5b2
+Revises: e6b2d9f4a1c8
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f8c3e1a7d5b2'
+down_revision: Union[str, Sequence[str], None] = 'e6b2d9f4a1c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_resources() -> bool:
+    # resources only exists where create_all has run
+    return sa.inspect(op.get_bind()).has_table('resources')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if _has_resources():
+        op.create_index('ix_resources_user_updated', 'resources', ['user_id', 'updated_at', 'id'], unique=False, if_not_exists=True)
+        # Made redundant by the composite
+        op.drop_index(op.f('ix_resources_user_id'), table_name='resources', if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if _has_resources():
+        op.create_index(op.f('ix_resources_user_id'), 'resources', ['user_id'], unique=False, if_not_exists=True)
+        op.drop_index('ix_resources_user_updated', table_name='resources', if_exists=True)
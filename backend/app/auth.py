@@ -1,14 +1,20 @@
 import os
+import math
+import time
 import uuid
+import asyncio
+import itertools
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional, Union, Any
 from jose import jwt
 from passlib.context import CryptContext
 from dotenv import load_dotenv
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, or_, func
 from . import models, schemas, database
 
 load_dotenv()
@@ -21,9 +27,27 @@ if not SECRET_KEY:
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
+# Password hashing runs on its own small pool so bcrypt never blocks the event loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+BCRYPT_ROUNDS = os.getenv("BCRYPT_ROUNDS")  # Pin explicitly to skip calibration
+BCRYPT_TARGET_MS = float(os.getenv("BCRYPT_TARGET_MS", "250"))
+BCRYPT_MIN_ROUNDS = int(os.getenv("BCRYPT_MIN_ROUNDS", "10"))
+BCRYPT_MAX_ROUNDS = int(os.getenv("BCRYPT_MAX_ROUNDS", "15"))
+
+# invalidate_principal only reaches this process: with several workers, a password change or
+# deactivation takes effect on the others when their entry expires, so this TTL bounds that window
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "1024"))
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+if BCRYPT_ROUNDS:
+    pwd_context.update(bcrypt__rounds=int(BCRYPT_ROUNDS))
+
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_stats = {"pending": 0, "peak_pending": 0, "completed": 0, "rejected": 0, "rounds": None}
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -31,6 +55,66 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+async def _run_hash_job(fn, *args):
+    # Shed load instead of queueing unboundedly; only auth endpoints feel the backpressure
+    if _hash_stats["pending"] >= PASSWORD_HASH_MAX_QUEUE:
+        _hash_stats["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service is busy, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    _hash_stats["pending"] += 1
+    _hash_stats["peak_pending"] = max(_hash_stats["peak_pending"], _hash_stats["pending"])
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, fn, *args)
+    finally:
+        _hash_stats["pending"] -= 1
+        _hash_stats["completed"] += 1
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hash_job(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_hash_job(get_password_hash, password)
+
+def _calibrate_bcrypt_rounds() -> int:
+    # Time one hash at the floor cost; each extra round doubles the work
+    probe = CryptContext(schemes=["bcrypt"], bcrypt__rounds=BCRYPT_MIN_ROUNDS)
+    started = time.perf_counter()
+    probe.hash("atlas-calibration")
+    elapsed_ms = max((time.perf_counter() - started) * 1000, 0.001)
+    extra_rounds = math.floor(math.log2(BCRYPT_TARGET_MS / elapsed_ms)) if BCRYPT_TARGET_MS > elapsed_ms else 0
+    return max(BCRYPT_MIN_ROUNDS, min(BCRYPT_MAX_ROUNDS, BCRYPT_MIN_ROUNDS + extra_rounds))
+
+async def calibrate_password_hashing() -> None:
+    if BCRYPT_ROUNDS:
+        rounds = int(BCRYPT_ROUNDS)
+    else:
+        loop = asyncio.get_running_loop()
+        rounds = await loop.run_in_executor(_hash_executor, _calibrate_bcrypt_rounds)
+        pwd_context.update(bcrypt__rounds=rounds)
+    _hash_stats["rounds"] = rounds
+    print(f"🔐 bcrypt cost: {rounds} rounds (target {BCRYPT_TARGET_MS:.0f}ms, {PASSWORD_HASH_WORKERS} workers)")
+
+def password_hash_stats() -> dict:
+    return {**_hash_stats, "workers": PASSWORD_HASH_WORKERS, "max_queue": PASSWORD_HASH_MAX_QUEUE}
+
+def select_user_by_email(email: str):
+    # Must stay lower(users.email) = :email to match ix_users_email_lower
+    return select(models.User).where(func.lower(models.User.email) == email.lower().strip())
+
+def select_user_by_identifier(identifier: str):
+    # Each OR arm matches one expression index (BitmapOr on Postgres, MULTI-INDEX OR on SQLite)
+    identifier = identifier.lower().strip()
+    return select(models.User).where(
+        or_(
+            func.lower(models.User.email) == identifier,
+            func.lower(models.User.username) == identifier
+        )
+    )
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -49,7 +133,68 @@ def create_refresh_token(data: dict) -> str:
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+# In-process principal cache: (user_id, version) -> (expires_at, column snapshot).
+# Bumping a user's version makes every cached entry for them unreachable. Versions come from
+# one counter and only the most recently invalidated users keep their own; everyone else is
+# at the floor, which rises past any version that is dropped so its old keys stay unreachable.
+_principal_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_principal_versions: "OrderedDict[uuid.UUID, int]" = OrderedDict()
+_principal_version_counter = itertools.count(1)
+_principal_version_floor = 0
+_principal_stats = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+
+def _principal_key(user_id: uuid.UUID) -> tuple:
+    return (user_id, _principal_versions.get(user_id, _principal_version_floor))
+
+def _snapshot_user(user: models.User) -> dict:
+    # Only plain column values are cached, never the session-bound instance
+    return {attr.key: getattr(user, attr.key) for attr in models.User.__mapper__.column_attrs}
+
+def _get_cached_principal(key: tuple) -> Optional[models.User]:
+    if PRINCIPAL_CACHE_TTL_SECONDS <= 0:
+        return None
+    entry = _principal_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, snapshot = entry
+    if expires_at < time.monotonic():
+        del _principal_cache[key]
+        return None
+    _principal_cache.move_to_end(key)
+    # A fresh detached instance per request so handlers can't mutate shared state
+    return models.User(**snapshot)
+
+def _store_principal(key: tuple, user: models.User) -> None:
+    # `key` is taken before the user is read, so an invalidation in between orphans this entry
+    if PRINCIPAL_CACHE_TTL_SECONDS <= 0:
+        return
+    _principal_cache[key] = (time.monotonic() + PRINCIPAL_CACHE_TTL_SECONDS, _snapshot_user(user))
+    _principal_cache.move_to_end(key)
+    while len(_principal_cache) > PRINCIPAL_CACHE_MAX_ENTRIES:
+        _principal_cache.popitem(last=False)
+        _principal_stats["evictions"] += 1
+
+def invalidate_principal(user_id: uuid.UUID) -> None:
+    """Drop any cached principal for this user (call after profile or credential changes)."""
+    global _principal_version_floor
+    old_key = _principal_key(user_id)
+    _principal_versions[user_id] = next(_principal_version_counter)
+    _principal_versions.move_to_end(user_id)
+    _principal_cache.pop(old_key, None)
+    _principal_stats["invalidations"] += 1
+    while len(_principal_versions) > PRINCIPAL_CACHE_MAX_ENTRIES:
+        _, _principal_version_floor = _principal_versions.popitem(last=False)
+
+def principal_cache_stats() -> dict:
+    lookups = _principal_stats["hits"] + _principal_stats["misses"]
+    return {
+        **_principal_stats,
+        "size": len(_principal_cache),
+        "hit_rate": round(_principal_stats["hits"] / lookups, 4) if lookups else 0.0,
+    }
+
 async def get_current_user(
+    request: Request,
     db: AsyncSession = Depends(database.get_db),
     token: str = Depends(oauth2_scheme)
 ):
@@ -67,9 +212,19 @@ async def get_current_user(
         user_id = uuid.UUID(user_id_str)
     except Exception:
         raise credentials_exception
-    
+    # Lets the session layer route this user's reads after their own writes (read-your-writes)
+    request.state.user_id = user_id
+
+    key = _principal_key(user_id)
+    cached_user = _get_cached_principal(key)
+    if cached_user is not None:
+        _principal_stats["hits"] += 1
+        return cached_user
+    _principal_stats["misses"] += 1
+
     result = await db.execute(select(models.User).where(models.User.id == user_id))
     user = result.scalar_one_or_none()
     if user is None:
         raise credentials_exception
+    _store_principal(key, user)
     return user
@@ -0,0 +1,121 @@
+import io
+import os
+import csv
+import json
+import uuid
+import zipfile
+from datetime import date, datetime
+from typing import AsyncIterator, List, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import models
+
+# Rows fetched per round trip; memory stays bounded by this however large the account is
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "500"))
+
+# Parents before children, so an importer can replay the tables in order
+USER_OWNED_MODELS = [
+    models.Habit,
+    models.HabitLog,
+    models.Project,
+    models.ProjectFocus,
+    models.Todo,
+    models.DailyNote,
+    models.Expense,
+    models.Transaction,
+    models.RecurringTransaction,
+    models.Budget,
+    models.Resource,
+    models.LearningSession,
+    models.Workout,
+    models.VisionItem,
+]
+
+def export_statements(user_id: uuid.UUID) -> List[Tuple[str, object]]:
+    """(table name, Core SELECT) for every table holding the user's data."""
+    users = models.User.__table__
+    statements = [
+        ("user", select(*[column for column in users.c if column.name != "hashed_password"]).where(users.c.id == user_id)),
+    ]
+    for model in USER_OWNED_MODELS:
+        table = model.__table__
+        statements.append((table.name, select(table).where(table.c.user_id == user_id)))
+        if model is models.Workout:
+            sets = models.ExerciseSet.__table__
+            statements.append((sets.name, select(sets).join(table, sets.c.workout_id == table.c.id).where(table.c.user_id == user_id)))
+    return statements
+
+async def _batches(db: AsyncSession, stmt) -> AsyncIterator[list]:
+    # Core rows through a server-side cursor: nothing lands in the identity map
+    result = await db.stream(stmt.execution_options(yield_per=EXPORT_BATCH_ROWS))
+    async for partition in result.partitions():
+        yield partition
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, bytes):
+        return value.hex()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def _csv_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return value.hex()
+    return value
+
+async def stream_ndjson(db: AsyncSession, user_id: uuid.UUID) -> AsyncIterator[bytes]:
+    """One {"table": ..., "row": {...}} object per line, table by table."""
+    for name, stmt in export_statements(user_id):
+        keys = [column.key for column in stmt.selected_columns]
+        async for rows in _batches(db, stmt):
+            lines = [
+                json.dumps({"table": name, "row": dict(zip(keys, row))}, default=_json_default) + "\n"
+                for row in rows
+            ]
+            yield "".join(lines).encode()
+
+class _ChunkBuffer(io.RawIOBase):
+    """Write-only sink that ZipFile streams into; drained after every batch."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+async def stream_csv_zip(db: AsyncSession, user_id: uuid.UUID) -> AsyncIterator[bytes]:
+    """A zip archive with one <table>.csv per table, compressed as the rows arrive."""
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, stmt in export_statements(user_id):
+            text = io.StringIO()
+            writer = csv.writer(text)
+            writer.writerow([column.key for column in stmt.selected_columns])
+            with archive.open(f"{name}.csv", "w", force_zip64=True) as entry:
+                async for rows in _batches(db, stmt):
+                    writer.writerows([_csv_value(value) for value in row] for row in rows)
+                    entry.write(text.getvalue().encode())
+                    text.seek(0)
+                    text.truncate()
+                    chunk = buffer.drain()
+                    if chunk:
+                        yield chunk
+                entry.write(text.getvalue().encode())
+            chunk = buffer.drain()
+            if chunk:
+                yield chunk
+    # Closing the archive writes the central directory
+    yield buffer.drain()
@@ -1,7 +1,16 @@
 import os
+import time
+import uuid
+import random
+import asyncio
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.pool import NullPool
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session
+from fastapi import Request
 from dotenv import load_dotenv
+from .write_queue import SerializedWriter, SerializedWriteSession
 
 load_dotenv()
 
@@ -21,11 +30,15 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL or DATABASE_URL.strip() == "":
     DATABASE_URL = DEFAULT_DB
 
-# Fix Railway's "postgres://" prefix if present and convert to asyncpg
-if DATABASE_URL.startswith("postgres://"):
-    DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql+asyncpg://", 1)
-elif DATABASE_URL.startswith("postgresql://") and "+asyncpg" not in DATABASE_URL:
-    DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+def _normalize_url(url: str) -> str:
+    # Fix Railway's "postgres://" prefix if present and convert to asyncpg
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgresql://") and "+asyncpg" not in url:
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+DATABASE_URL = _normalize_url(DATABASE_URL)
 
 DRIVE_TYPE = "POSTGRESQL" if "postgresql" in DATABASE_URL else "SQLITE"
 print(f"📡 DATABASE: {DRIVE_TYPE}")
@@ -34,11 +47,181 @@ if DRIVE_TYPE == "SQLITE":
 else:
     print(f"✅ Persistent storage active: {DATABASE_URL.split('@')[-1]}")
 
-engine = create_async_engine(
-    DATABASE_URL, 
-    echo=True,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+# Engine profile: dev (verbose, small pool), prod (tuned pool, no echo) or
+# pgbouncer (transaction pooling: no client-side pool, no prepared statement cache)
+DB_PROFILE = os.getenv("DB_PROFILE", "prod" if os.getenv("DATABASE_URL") else "dev").lower()
+if DB_PROFILE not in ("dev", "prod", "pgbouncer"):
+    print(f"⚠️  WARNING: Unknown DB_PROFILE '{DB_PROFILE}', falling back to 'prod'")
+    DB_PROFILE = "prod"
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5" if DB_PROFILE == "dev" else "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10" if DB_PROFILE == "dev" else "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "0" if DB_PROFILE == "pgbouncer" else "100"))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+DB_CONNECT_TIMEOUT = float(os.getenv("DB_CONNECT_TIMEOUT", "10"))
+# Fraction of statements echoed to stdout (1.0 in dev, off in prod)
+DB_SQL_LOG_SAMPLE_RATE = float(os.getenv("DB_SQL_LOG_SAMPLE_RATE", "1.0" if DB_PROFILE == "dev" else "0"))
+
+# SQLite connection tuning: WAL lets readers run alongside the single writer, NORMAL sync
+# only fsyncs at checkpoints (still durable against app crashes), and busy_timeout makes a
+# writer wait for the lock instead of failing with "database is locked"
+SQLITE_TUNING = os.getenv("SQLITE_TUNING", "true").lower() == "true"
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    # Negative values are KiB rather than pages
+    "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536")),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+}
+# "pool": each request opens its own connection and writers contend for SQLite's lock.
+# "serialized": write requests share one writer connection with group commit and
+# GET/HEAD requests read from a pool of read-only connections.
+SQLITE_WRITE_MODE = os.getenv("SQLITE_WRITE_MODE", "pool").lower()
+SQLITE_WRITE_QUEUE_MAX = int(os.getenv("SQLITE_WRITE_QUEUE_MAX", "64"))
+SQLITE_WRITE_QUEUE_TIMEOUT = float(os.getenv("SQLITE_WRITE_QUEUE_TIMEOUT", "10"))
+SQLITE_GROUP_COMMIT_MAX = int(os.getenv("SQLITE_GROUP_COMMIT_MAX", "32"))
+SQLITE_GROUP_COMMIT_WINDOW_MS = float(os.getenv("SQLITE_GROUP_COMMIT_WINDOW_MS", "5"))
+SQLITE_READ_POOL_SIZE = int(os.getenv("SQLITE_READ_POOL_SIZE", "8"))
+# Read replica for the read-heavy endpoints using get_read_db; unset means reads stay on the primary
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL", "").strip()
+# After a user commits, their get_read_db reads go to the primary for this long (keep above replica lag)
+REPLICA_READ_YOUR_WRITES_SECONDS = float(os.getenv("REPLICA_READ_YOUR_WRITES_SECONDS", "5"))
+# How often to run PRAGMA optimize and a passive WAL checkpoint (0 disables)
+SQLITE_MAINTENANCE_SECONDS = float(os.getenv("SQLITE_MAINTENANCE_SECONDS", "3600"))
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: dict = SQLITE_PRAGMAS) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+def _engine_options() -> dict:
+    if DRIVE_TYPE == "SQLITE":
+        return {
+            "connect_args": {"check_same_thread": False, "timeout": DB_CONNECT_TIMEOUT},
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+            "pool_pre_ping": DB_PROFILE != "dev",
+        }
+
+    connect_args = {
+        "timeout": DB_CONNECT_TIMEOUT,
+        "command_timeout": DB_STATEMENT_TIMEOUT_MS / 1000,
+        # asyncpg's own cache plus SQLAlchemy's adapter-level prepared statement cache
+        "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+    }
+    if DB_PROFILE == "pgbouncer":
+        # pgbouncer hands each transaction to any server connection, so server-side prepared
+        # statements must be disabled and named uniquely; it also rejects startup parameters
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+        return {
+            "poolclass": NullPool,
+            "connect_args": connect_args,
+        }
+
+    connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+        "connect_args": connect_args,
+    }
+
+ENGINE_OPTIONS = _engine_options()
+engine = create_async_engine(DATABASE_URL, echo=False, **ENGINE_OPTIONS)
+
+if DRIVE_TYPE == "SQLITE" and SQLITE_TUNING:
+    @event.listens_for(engine.sync_engine, "connect")
+    def _tune_sqlite_connection(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection)
+
+# Every engine requests can run on; listeners such as query stats attach to all of them
+engines = [engine]
+
+writer = None
+read_engine = None
+if SQLITE_WRITE_MODE == "serialized" and DRIVE_TYPE != "SQLITE":
+    print("⚠️  WARNING: SQLITE_WRITE_MODE=serialized only applies to SQLite, ignoring")
+elif SQLITE_WRITE_MODE == "serialized":
+    _sqlite_connect_args = ENGINE_OPTIONS["connect_args"]
+    writer_engine = create_async_engine(
+        DATABASE_URL, echo=False, connect_args=_sqlite_connect_args, pool_size=1, max_overflow=0,
+    )
+    read_engine = create_async_engine(
+        DATABASE_URL, echo=False, connect_args=_sqlite_connect_args,
+        pool_size=SQLITE_READ_POOL_SIZE, max_overflow=0, pool_timeout=DB_POOL_TIMEOUT,
+    )
+
+    @event.listens_for(writer_engine.sync_engine, "connect")
+    def _setup_writer_connection(dbapi_connection, connection_record):
+        if SQLITE_TUNING:
+            apply_sqlite_pragmas(dbapi_connection)
+        # Take over transaction control from the driver so SAVEPOINTs nest inside our BEGIN
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(writer_engine.sync_engine, "begin")
+    def _begin_immediate(conn):
+        # Grab the write lock up front instead of failing to upgrade a read transaction later
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    @event.listens_for(read_engine.sync_engine, "connect")
+    def _setup_read_connection(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, {**SQLITE_PRAGMAS, "query_only": "ON"} if SQLITE_TUNING else {"query_only": "ON"})
+
+    writer = SerializedWriter(
+        writer_engine,
+        queue_max=SQLITE_WRITE_QUEUE_MAX,
+        queue_timeout=SQLITE_WRITE_QUEUE_TIMEOUT,
+        group_max=SQLITE_GROUP_COMMIT_MAX,
+        window_ms=SQLITE_GROUP_COMMIT_WINDOW_MS,
+    )
+    engines += [writer_engine, read_engine]
+
+if DATABASE_REPLICA_URL:
+    replica_engine = create_async_engine(_normalize_url(DATABASE_REPLICA_URL), echo=False, **ENGINE_OPTIONS)
+    engines.append(replica_engine)
+    print(f"📖 Read replica: {replica_engine.url.host or replica_engine.url.database}")
+elif read_engine is not None:
+    # Serialized SQLite writes are committed before the response goes out, so the read pool never lags
+    replica_engine = read_engine
+else:
+    replica_engine = engine
+
+if DB_SQL_LOG_SAMPLE_RATE > 0:
+    def _log_sampled_sql(conn, cursor, statement, parameters, context, executemany):
+        if DB_SQL_LOG_SAMPLE_RATE >= 1 or random.random() < DB_SQL_LOG_SAMPLE_RATE:
+            print(f"🧾 SQL: {' '.join(statement.split())}")
+
+    for _engine in engines:
+        event.listen(_engine.sync_engine, "before_cursor_execute", _log_sampled_sql)
+
+def describe_engine() -> str:
+    pool = engine.pool
+    if isinstance(pool, NullPool):
+        pool_desc = "pool=NullPool"
+    else:
+        # Read back from the pool itself so the line reflects SQLAlchemy's effective defaults
+        pool_desc = (
+            f"pool={type(pool).__name__} size={pool.size()} overflow={pool._max_overflow} "
+            f"timeout={pool._timeout}s recycle={pool._recycle}s pre_ping={pool._pre_ping}"
+        )
+    if DRIVE_TYPE == "SQLITE":
+        tuning = " ".join(f"{k}={v}" for k, v in SQLITE_PRAGMAS.items()) if SQLITE_TUNING else "untuned"
+        mode = f"serialized(queue={SQLITE_WRITE_QUEUE_MAX} group={SQLITE_GROUP_COMMIT_MAX} readers={SQLITE_READ_POOL_SIZE})" if writer else "pool"
+        return f"profile={DB_PROFILE} {pool_desc} sqlite[{tuning}] writes={mode} sql_log_sample={DB_SQL_LOG_SAMPLE_RATE}"
+    return f"profile={DB_PROFILE} {pool_desc} stmt_cache={DB_STATEMENT_CACHE_SIZE} sql_log_sample={DB_SQL_LOG_SAMPLE_RATE}"
+
+print(f"🏊 DB engine: {describe_engine()}")
 
 SessionLocal = async_sessionmaker(
     bind=engine,
@@ -49,6 +232,128 @@ SessionLocal = async_sessionmaker(
 class Base(DeclarativeBase):
     pass
 
-async def get_db():
-    async with SessionLocal() as session:
-        yield session
+# --- Read routing ---
+
+# user_id -> monotonic time until which that user's reads must see the primary
+_recent_writers: dict = {}
+
+def _remember_write(user_id) -> None:
+    now = time.monotonic()
+    if len(_recent_writers) > 10_000:
+        for key in [key for key, until in _recent_writers.items() if until <= now]:
+            del _recent_writers[key]
+    _recent_writers[user_id] = now + REPLICA_READ_YOUR_WRITES_SECONDS
+
+def wrote_recently(user_id) -> bool:
+    until = _recent_writers.get(user_id)
+    return until is not None and until > time.monotonic()
+
+@event.listens_for(Session, "after_commit")
+def _track_user_commit(session):
+    if replica_engine is engine:
+        return
+    # get_current_user records the principal on request.state; get_db/get_read_db attach it
+    user_id = getattr(session.info.get("request_state"), "user_id", None)
+    if user_id is not None:
+        _remember_write(user_id)
+
+class ReadRoutingSession(Session):
+    """Reads go to the replica unless the requesting user committed recently; flushes always hit the primary."""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or wrote_recently(getattr(self.info.get("request_state"), "user_id", None)):
+            return engine.sync_engine
+        return replica_engine.sync_engine
+
+ReplicaSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    sync_session_class=ReadRoutingSession,
+    expire_on_commit=False,
+)
+
+# --- SQLite maintenance ---
+# Long-lived pooled connections never close, so PRAGMA optimize (normally run on close)
+# and WAL checkpoints are driven from a background task instead.
+
+_maintenance_task = None
+maintenance_stats = {"runs": 0, "last_run_at": None, "last_checkpoint": None, "last_error": None}
+
+async def run_sqlite_maintenance(checkpoint: str = "PASSIVE") -> dict:
+    async with engine.connect() as conn:
+        await conn.exec_driver_sql("PRAGMA optimize")
+        busy, wal_pages, checkpointed = (await conn.exec_driver_sql(f"PRAGMA wal_checkpoint({checkpoint})")).one()
+    maintenance_stats["runs"] += 1
+    maintenance_stats["last_run_at"] = datetime.utcnow().isoformat()
+    maintenance_stats["last_checkpoint"] = {
+        "mode": checkpoint, "busy": bool(busy), "wal_pages": wal_pages, "checkpointed": checkpointed,
+    }
+    return maintenance_stats["last_checkpoint"]
+
+async def _maintenance_loop() -> None:
+    while True:
+        await asyncio.sleep(SQLITE_MAINTENANCE_SECONDS)
+        try:
+            await run_sqlite_maintenance()
+            maintenance_stats["last_error"] = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            maintenance_stats["last_error"] = str(e)
+            print(f"⚠️  SQLite maintenance failed: {e}")
+
+def start_sqlite_maintenance() -> None:
+    global _maintenance_task
+    if DRIVE_TYPE == "SQLITE" and SQLITE_TUNING and SQLITE_MAINTENANCE_SECONDS > 0 and _maintenance_task is None:
+        _maintenance_task = asyncio.create_task(_maintenance_loop())
+        print(f"🧹 SQLite maintenance every {SQLITE_MAINTENANCE_SECONDS:.0f}s (optimize + WAL checkpoint)")
+
+async def stop_sqlite_maintenance() -> None:
+    global _maintenance_task
+    if _maintenance_task is not None:
+        _maintenance_task.cancel()
+        try:
+            await _maintenance_task
+        except asyncio.CancelledError:
+            pass
+        _maintenance_task = None
+    if DRIVE_TYPE == "SQLITE" and SQLITE_TUNING:
+        # Fold the WAL back into the main file so a clean shutdown leaves a single db file
+        try:
+            await run_sqlite_maintenance(checkpoint="TRUNCATE")
+        except Exception as e:
+            print(f"⚠️  SQLite shutdown checkpoint failed: {e}")
+
+ReadSessionLocal = async_sessionmaker(
+    bind=read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+) if read_engine is not None else SessionLocal
+
+def _attach_request(session: AsyncSession, request: Request) -> AsyncSession:
+    if request is not None:
+        session.info["request_state"] = request.state
+    return session
+
+async def get_db(request: Request = None):
+    if writer is None:
+        async with SessionLocal() as session:
+            yield _attach_request(session, request)
+        return
+
+    if request is not None and request.method in ("GET", "HEAD"):
+        async with ReadSessionLocal() as session:
+            yield _attach_request(session, request)
+        return
+
+    # Takes the writer at the first write, not here, and hands it back on commit or close
+    async with SerializedWriteSession(writer, read_engine) as session:
+        yield _attach_request(session, request)
+
+def read_session(request: Request = None) -> AsyncSession:
+    """Standalone replica-routed session, for endpoints that fan independent queries out concurrently."""
+    return _attach_request(ReplicaSessionLocal(), request)
+
+async def get_read_db(request: Request = None):
+    """Session for read-only endpoints that may be served by DATABASE_REPLICA_URL."""
+    async with ReplicaSessionLocal() as session:
+        yield _attach_request(session, request)
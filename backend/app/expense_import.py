@@ -0,0 +1,304 @@
+import io
+import os
+import re
+import csv
+import uuid
+import asyncio
+import hashlib
+import functools
+import itertools
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+import sqlalchemy as sa
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import models, database, rollups
+from .upsert import dialect_insert
+
+IMPORT_BATCH_ROWS = int(os.getenv("IMPORT_BATCH_ROWS", "2000"))
+# Row-level problems reported back to the client; the rest are only counted
+MAX_REPORTED_ERRORS = 20
+
+# Tried in order; day-first before month-first since most statements here are NGN/GBP style
+DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d", "%d %b %Y", "%d-%b-%Y", "%b %d, %Y", "%m/%d/%Y", "%d/%m/%y"]
+
+CSV_COLUMNS = {
+    "date": ["date", "transaction date", "posted date", "value date", "trans date"],
+    "amount": ["amount", "value", "amount (ngn)"],
+    "debit": ["debit", "withdrawal", "withdrawals", "money out", "paid out"],
+    "description": ["description", "narration", "details", "memo", "payee", "name", "remarks"],
+    "category": ["category"],
+}
+
+class ImportRowError(ValueError):
+    pass
+
+def content_hash(day: date, amount: float, description: str, occurrence: int = 0) -> str:
+    """
+    Identity of an expense for de-duplication. `occurrence` numbers identical (date, amount,
+    description) rows within one statement, so two real coffees on the same day both survive
+    while a re-imported or overlapping statement does not double them.
+    """
+    key = f"{day.isoformat()}|{amount:.2f}|{' '.join(description.lower().split())}|{occurrence}"
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+async def next_content_hash(
+    db: AsyncSession, user_id: uuid.UUID, day: date, amount: float, description: str, exclude_id: Optional[uuid.UUID] = None,
+) -> str:
+    """
+    content_hash for one expense written outside an import: the first occurrence none of the
+    user's other expenses that day holds, so a second identical entry is numbered 1 just as a
+    statement (or the backfill) would number it. `exclude_id` is the expense being edited.
+    """
+    condition = [models.Expense.user_id == user_id, models.Expense.date == day, models.Expense.content_hash.is_not(None)]
+    if exclude_id is not None:
+        condition.append(models.Expense.id != exclude_id)
+    # No autoflush: an edit in progress would otherwise be written out just for this read
+    query = select(models.Expense.content_hash).where(*condition).execution_options(autoflush=False)
+    taken = set((await db.execute(query)).scalars())
+    occurrence = 0
+    while (digest := content_hash(day, amount, description, occurrence)) in taken:
+        occurrence += 1
+    return digest
+
+def parse_amount(raw: str) -> float:
+    text = raw.strip()
+    negative = text.startswith("(") and text.endswith(")")
+    cleaned = re.sub(r"[^\d.\-]", "", text)
+    if not cleaned or cleaned in ("-", "."):
+        raise ImportRowError(f"invalid amount {raw!r}")
+    value = float(cleaned)
+    return -abs(value) if negative else value
+
+# Statements repeat the same few hundred dates and strptime dominates parsing time
+@functools.lru_cache(maxsize=4096)
+def parse_date(raw: str, date_format: Optional[str] = None) -> date:
+    text = raw.strip()
+    for fmt in [date_format] if date_format else DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ImportRowError(f"invalid date {raw!r}")
+
+def _csv_field(header: List[str], names: List[str]) -> Optional[int]:
+    for name in names:
+        if name in header:
+            return header.index(name)
+    return None
+
+def parse_csv(stream: io.TextIOBase, date_format: Optional[str] = None) -> Iterator[dict]:
+    """
+    Header row required. A Debit/Withdrawal column wins over Amount and rows without a debit
+    (credits) are skipped; otherwise the absolute Amount is the expense.
+    """
+    reader = csv.reader(stream)
+    header = [column.strip().lower() for column in next(reader, [])]
+    fields = {key: _csv_field(header, names) for key, names in CSV_COLUMNS.items()}
+    if fields["date"] is None or (fields["amount"] is None and fields["debit"] is None):
+        raise ImportRowError("CSV needs a date column and an amount or debit column")
+
+    for line, row in enumerate(reader, start=2):
+        if not any(value.strip() for value in row):
+            continue
+
+        def cell(key: str) -> str:
+            index = fields[key]
+            return row[index].strip() if index is not None and index < len(row) else ""
+
+        try:
+            if fields["debit"] is not None:
+                if not cell("debit"):
+                    yield {"skip": True}
+                    continue
+                amount = abs(parse_amount(cell("debit")))
+            else:
+                amount = abs(parse_amount(cell("amount")))
+            yield {
+                "date": parse_date(cell("date"), date_format),
+                "amount": amount,
+                "description": cell("description"),
+                "category": cell("category") or None,
+            }
+        except ImportRowError as e:
+            yield {"error": f"line {line}: {e}"}
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<\r\n]*)")
+
+def parse_ofx(stream: io.TextIOBase, date_format: Optional[str] = None) -> Iterator[dict]:
+    """OFX 1.x (SGML, unclosed tags) and 2.x (XML). Only debits (negative TRNAMT) are expenses."""
+    transaction = None
+    for line in stream:
+        for closing, tag, value in _OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if not closing:
+                    transaction = {}
+                    continue
+                if transaction is not None:
+                    yield _ofx_row(transaction)
+                transaction = None
+            elif transaction is not None and not closing:
+                transaction[tag] = value.strip()
+
+def _ofx_row(transaction: dict) -> dict:
+    try:
+        amount = parse_amount(transaction.get("TRNAMT", ""))
+        if amount >= 0:
+            return {"skip": True}
+        posted = transaction.get("DTPOSTED", "")[:8]
+        return {
+            "date": parse_date(posted, "%Y%m%d"),
+            "amount": abs(amount),
+            "description": transaction.get("NAME") or transaction.get("MEMO", ""),
+            "category": None,
+        }
+    except ImportRowError as e:
+        return {"error": f"transaction {transaction.get('FITID', '?')}: {e}"}
+
+def _qif_date(raw: str, date_format: Optional[str]) -> date:
+    if date_format:
+        return parse_date(raw, date_format)
+    # QIF writes US month-first dates, often with a 2-digit year after an apostrophe: 1/15'24
+    parts = re.split(r"[/'\-. ]+", raw.strip())
+    if len(parts) != 3 or not all(part.isdigit() for part in parts):
+        raise ImportRowError(f"invalid date {raw!r}")
+    month, day, year = (int(part) for part in parts)
+    if year < 100:
+        year += 2000
+    try:
+        return date(year, month, day)
+    except ValueError:
+        raise ImportRowError(f"invalid date {raw!r}")
+
+def parse_qif(stream: io.TextIOBase, date_format: Optional[str] = None) -> Iterator[dict]:
+    """Bank/CCard QIF records (D, T/U, P, M, L ... ^). Only debits (negative T) are expenses."""
+    record, number = {}, 0
+    for line in stream:
+        line = line.rstrip("\r\n")
+        if not line or line.startswith("!"):
+            continue
+        code, value = line[0], line[1:].strip()
+        if code != "^":
+            record.setdefault(code, value)
+            continue
+        number += 1
+        try:
+            amount = parse_amount(record.get("T") or record.get("U", ""))
+            if amount >= 0:
+                yield {"skip": True}
+            else:
+                yield {
+                    "date": _qif_date(record.get("D", ""), date_format),
+                    "amount": abs(amount),
+                    "description": record.get("P") or record.get("M", ""),
+                    # Categories look like "Food:Groceries"; keep the top level
+                    "category": record.get("L", "").split(":")[0].strip("[]") or None,
+                }
+        except ImportRowError as e:
+            yield {"error": f"record {number}: {e}"}
+        record = {}
+
+PARSERS = {"csv": parse_csv, "ofx": parse_ofx, "qif": parse_qif}
+
+def detect_format(filename: Optional[str]) -> str:
+    extension = os.path.splitext(filename or "")[1].lower().lstrip(".")
+    return "ofx" if extension == "qfx" else extension if extension in PARSERS else "csv"
+
+async def _insert_batch(db: AsyncSession, rows: List[dict]) -> Tuple[int, List[tuple]]:
+    """
+    Inserts the rows whose content hash the user doesn't have yet, leaving the rest to the
+    unique (user_id, content_hash) index. Returns how many went in, and the (date, category)
+    pairs whose rollups that may have changed.
+    """
+    expenses = models.Expense
+    columns = list(rows[0])
+    if database.DRIVE_TYPE == "POSTGRESQL":
+        # COPY is several times faster than multi-row INSERT for large batches, but has no
+        # ON CONFLICT: stage the batch in a temp table and move it across in one statement
+        connection = await db.connection()
+        await connection.exec_driver_sql(
+            "CREATE TEMP TABLE IF NOT EXISTS expense_import_staging (LIKE expenses INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+        await connection.exec_driver_sql("TRUNCATE expense_import_staging")
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            "expense_import_staging", records=[tuple(row[column] for column in columns) for row in rows], columns=columns,
+        )
+        staging = sa.table("expense_import_staging", *[sa.column(column) for column in columns])
+        stmt = dialect_insert(expenses).from_select(columns, select(staging))
+        stmt = stmt.on_conflict_do_nothing(index_elements=["user_id", "content_hash"])
+        inserted = (await db.execute(stmt.returning(expenses.date, expenses.category))).all()
+        return len(inserted), list(inserted)
+
+    stmt = dialect_insert(expenses).on_conflict_do_nothing(index_elements=["user_id", "content_hash"])
+    if database.engine.dialect.insert_executemany_returning:
+        # executemany is rendered as batched multi-row INSERT ... VALUES ... RETURNING
+        inserted = (await db.execute(stmt.returning(expenses.date, expenses.category), rows)).all()
+        return len(inserted), list(inserted)
+    # No RETURNING: the rowcount says how many went in but not which, so refresh every pair
+    result = await db.execute(stmt, rows)
+    return result.rowcount, [(row["date"], row["category"]) for row in rows]
+
+async def import_expenses(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    stream: io.TextIOBase,
+    file_format: str,
+    default_category: str = "Imported",
+    date_format: Optional[str] = None,
+    currency: str = "NGN",
+) -> dict:
+    """
+    Parses the statement in batches (off the event loop) and bulk-inserts the rows in
+    `currency`; rows whose content hash the user already has are skipped by the insert itself
+    and counted as duplicates. The caller commits.
+    """
+    rows = PARSERS[file_format](stream, date_format)
+    occurrences: Dict[tuple, int] = {}
+    summary = {"format": file_format, "parsed": 0, "inserted": 0, "duplicates": 0, "skipped": 0, "invalid": 0, "errors": []}
+    created_at = datetime.utcnow()
+    written = set()
+
+    while True:
+        batch = await asyncio.to_thread(list, itertools.islice(rows, IMPORT_BATCH_ROWS))
+        if not batch:
+            break
+
+        candidates = {}
+        for row in batch:
+            if row.get("skip"):
+                summary["skipped"] += 1
+                continue
+            if "error" in row:
+                summary["invalid"] += 1
+                if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+                    summary["errors"].append(row["error"])
+                continue
+            summary["parsed"] += 1
+            description = (row["description"] or (row["category"] or default_category))[:255]
+            key = (row["date"], round(row["amount"], 2), " ".join(description.lower().split()))
+            occurrence = occurrences.get(key, 0)
+            occurrences[key] = occurrence + 1
+            digest = content_hash(row["date"], row["amount"], description, occurrence)
+            candidates[digest] = {
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "date": row["date"],
+                "amount": round(row["amount"], 2),
+                "category": (row["category"] or default_category)[:50],
+                "description": description,
+                "currency": currency,
+                "content_hash": digest,
+                "created_at": created_at,
+            }
+        if not candidates:
+            continue
+
+        inserted, touched = await _insert_batch(db, list(candidates.values()))
+        summary["inserted"] += inserted
+        summary["duplicates"] += len(candidates) - inserted
+        written.update((day, category) for day, category in touched)
+
+    await rollups.refresh_expenses(db, user_id, written)
+    return summary
@@ -0,0 +1,98 @@
+import csv
+import os
+from datetime import datetime
+from typing import Iterable, TextIO
+from sqlalchemy import select, case, func, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import models
+from .upsert import dialect_insert
+
+# Rates are stored as units of a currency per one unit of this currency, which has no rows
+FX_REFERENCE_CURRENCY = os.getenv("FX_REFERENCE_CURRENCY", "USD")
+# Optional rates file (date,currency,rate) loaded by scripts/load_fx_rates.py when no path is given
+FX_RATES_FILE = os.getenv("FX_RATES_FILE", "")
+# Rows per INSERT when loading a rates file
+FX_LOAD_BATCH = 1000
+
+SYMBOLS = {"NGN": "₦", "USD": "$", "EUR": "€", "GBP": "£", "GHS": "₵", "KES": "KSh", "ZAR": "R"}
+
+def format_amount(amount: float, currency: str) -> str:
+    symbol = SYMBOLS.get(currency)
+    return f"{symbol}{amount:,.2f}" if symbol else f"{amount:,.2f} {currency}"
+
+def _rate_expr(currency, day):
+    """Latest rate for `currency` on or before `day`; NULL when none has been loaded."""
+    rates = models.FxRate
+    latest = (
+        select(rates.rate)
+        .where(rates.currency == currency, rates.date <= day)
+        .order_by(rates.date.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    return case((currency == FX_REFERENCE_CURRENCY, literal(1.0)), else_=latest)
+
+def converted(amount, currency, day, base):
+    """
+    SQL expression for `amount` in `base`, using the rates of `day`, for use inside SUM().
+    Rows already in the base currency skip the rate lookups entirely. Rows whose rate is
+    missing are NULL, so SUM() leaves them out instead of adding a foreign amount at face
+    value; `unconverted` counts them so callers can say the total is incomplete.
+    """
+    return case(
+        (currency == base, amount),
+        else_=amount * _rate_expr(base, day) / _rate_expr(currency, day),
+    )
+
+def expense_amount(base):
+    expenses = models.Expense
+    return converted(expenses.amount, expenses.currency, expenses.date, base)
+
+def unconverted(amount, rows=None):
+    """
+    Aggregate over expenses: how many rows `amount` (an expense_amount) left out for lack of a rate.
+    Counts every row by default, which needs no column of its own; pass `rows` (e.g. the expense
+    id) when the expenses are outer-joined and a group can have none.
+    """
+    rows = func.count() if rows is None else func.count(rows)
+    return rows - func.count(amount)
+
+def user_base_currency(user_id):
+    """Scalar subquery for a user's base currency, for statements that span users."""
+    return select(models.User.base_currency).where(models.User.id == user_id).scalar_subquery()
+
+def parse_rates(stream: TextIO) -> Iterable[dict]:
+    """Reads `date,currency,rate` rows (header optional), rate being units per reference unit."""
+    for line_number, row in enumerate(csv.reader(stream), start=1):
+        if not row or not row[0].strip() or row[0].strip().lower() == "date":
+            continue
+        try:
+            day = datetime.strptime(row[0].strip(), "%Y-%m-%d").date()
+            currency = row[1].strip().upper()
+            value = float(row[2])
+        except (IndexError, ValueError):
+            raise ValueError(f"line {line_number}: expected date,currency,rate, got {row!r}")
+        if len(currency) != 3 or value <= 0:
+            raise ValueError(f"line {line_number}: invalid rate {row!r}")
+        yield {"date": day, "currency": currency, "rate": value}
+
+async def load_rates(db: AsyncSession, stream: TextIO) -> int:
+    """Upserts every rate in the stream on (currency, date). The caller commits."""
+    loaded, batch = 0, {}
+
+    async def flush():
+        stmt = dialect_insert(models.FxRate).values(list(batch.values()))
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=["currency", "date"], set_={"rate": stmt.excluded.rate},
+        ))
+
+    # Keyed so a repeated (currency, date) in one batch keeps the last rate instead of conflicting twice
+    for row in parse_rates(stream):
+        batch[(row["currency"], row["date"])] = row
+        if len(batch) >= FX_LOAD_BATCH:
+            await flush()
+            loaded, batch = loaded + len(batch), {}
+    if batch:
+        await flush()
+        loaded += len(batch)
+    return loaded
@@ -0,0 +1,94 @@
+import os
+import uuid
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional
+from sqlalchemy import select, delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import models, database
+
+# Habits per batch in the backfill; each batch is its own transaction
+HABIT_BITMAP_BACKFILL_BATCH = int(os.getenv("HABIT_BITMAP_BACKFILL_BATCH", "500"))
+
+YEAR_BYTES = 46  # 366 bits
+
+def _day_index(day: date) -> int:
+    return day.timetuple().tm_yday - 1
+
+def set_day(
+    db: AsyncSession,
+    habit: models.Habit,
+    bitmap: Optional[models.HabitBitmap],
+    day: date,
+    completed: bool,
+) -> None:
+    """
+    Sets or clears `day` in the habit's bitmap for that year, creating the row on first use.
+    `bitmap` is the row the caller loaded alongside the (locked) habit. The caller commits.
+    """
+    if bitmap is None:
+        bitmap = models.HabitBitmap(habit_id=habit.id, year=day.year, user_id=habit.user_id, bits=bytes(YEAR_BYTES))
+        db.add(bitmap)
+    bits = bytearray(bitmap.bits)
+    index = _day_index(day)
+    if completed:
+        bits[index >> 3] |= 1 << (index & 7)
+    else:
+        bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+    bitmap.bits = bytes(bits)
+
+def pack_range(years: Dict[int, bytes], start: date, end: date) -> bytes:
+    """
+    Slices the year bitmaps into one bitstring where bit i (LSB first) is start + i, by
+    shifting whole years at a time rather than walking days.
+    """
+    packed = 0
+    segment_start = start
+    while segment_start <= end:
+        segment_end = min(end, date(segment_start.year, 12, 31))
+        bits = years.get(segment_start.year)
+        if bits:
+            length = (segment_end - segment_start).days + 1
+            segment = (int.from_bytes(bits, "little") >> _day_index(segment_start)) & ((1 << length) - 1)
+            packed |= segment << (segment_start - start).days
+        segment_start = segment_end + timedelta(days=1)
+    days = (end - start).days + 1
+    return packed.to_bytes((days + 7) // 8, "little")
+
+def build_years(days: Iterable[date]) -> Dict[int, bytes]:
+    years: Dict[int, bytearray] = {}
+    for day in days:
+        bits = years.setdefault(day.year, bytearray(YEAR_BYTES))
+        index = _day_index(day)
+        bits[index >> 3] |= 1 << (index & 7)
+    return {year: bytes(bits) for year, bits in years.items()}
+
+async def backfill(batch_size: int = HABIT_BITMAP_BACKFILL_BATCH) -> int:
+    """Rebuilds every habit's year bitmaps from its completed logs, paging through habits by id."""
+    written, after = 0, None
+    while True:
+        async with database.SessionLocal() as db:
+            query = select(models.Habit.id, models.Habit.user_id).order_by(models.Habit.id).limit(batch_size)
+            if after is not None:
+                query = query.where(models.Habit.id > after)
+            habits = dict((await db.execute(query)).all())
+            if not habits:
+                return written
+            result = await db.execute(
+                select(models.HabitLog.habit_id, models.HabitLog.date)
+                .where(models.HabitLog.habit_id.in_(list(habits)), models.HabitLog.completed == True)
+            )
+            days: Dict[uuid.UUID, list] = {}
+            for habit_id, day in result:
+                days.setdefault(habit_id, []).append(day)
+
+            rows = [
+                {"habit_id": habit_id, "year": year, "user_id": habits[habit_id], "bits": bits}
+                for habit_id, habit_days in days.items()
+                for year, bits in build_years(habit_days).items()
+            ]
+            await db.execute(delete(models.HabitBitmap).where(models.HabitBitmap.habit_id.in_(list(habits))))
+            if rows:
+                await db.execute(insert(models.HabitBitmap), rows)
+            await db.commit()
+            written += len(rows)
+            after = list(habits)[-1]
@@ -0,0 +1,150 @@
+import os
+from datetime import date, timedelta
+from typing import Iterable, List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import models, database
+
+# Habits per batch in the backfill; each batch is its own transaction
+HABIT_STATS_BACKFILL_BATCH = int(os.getenv("HABIT_STATS_BACKFILL_BATCH", "500"))
+
+RECENT_DAYS = 90
+RATE_WINDOWS = (7, 30, 90)
+
+def _mask(habit: models.Habit) -> int:
+    return int.from_bytes(habit.recent_completions or b"", "little")
+
+def _encode(mask: int) -> bytes:
+    return (mask & ((1 << RECENT_DAYS) - 1)).to_bytes(RECENT_DAYS // 8 + 1, "little")
+
+def _set_mask(habit: models.Habit, mask: int) -> None:
+    habit.recent_completions = _encode(mask)
+
+def _mark(habit: models.Habit, day: date, completed: bool) -> None:
+    """Sets or clears `day` in the 90-day window, sliding the window forward if `day` is newer."""
+    mask, anchor = _mask(habit), habit.recent_anchor
+    if anchor is None or day > anchor:
+        mask = mask << (day - anchor).days if anchor is not None else 0
+        anchor = day
+    offset = (anchor - day).days
+    if offset < RECENT_DAYS:
+        mask = mask | (1 << offset) if completed else mask & ~(1 << offset)
+    habit.recent_anchor = anchor
+    _set_mask(habit, mask)
+
+def compute(completed_days: List[date], anchor: date) -> dict:
+    """Every stored stat column of a habit with these completed days (ascending), as of `anchor`."""
+    current = longest = 0
+    previous = None
+    for day in completed_days:
+        current = current + 1 if previous is not None and day == previous + timedelta(days=1) else 1
+        longest = max(longest, current)
+        previous = day
+
+    anchor = max(anchor, previous) if previous else anchor
+    mask = 0
+    for day in completed_days:
+        offset = (anchor - day).days
+        if 0 <= offset < RECENT_DAYS:
+            mask |= 1 << offset
+    return {
+        "current_streak": current,
+        "longest_streak": longest,
+        "last_completed_on": previous,
+        "recent_completions": _encode(mask),
+        "recent_anchor": anchor,
+    }
+
+def _rebuild(habit: models.Habit, completed_days: List[date], anchor: date) -> None:
+    """Recomputes every stat from the habit's completed days (ascending)."""
+    for name, value in compute(completed_days, anchor).items():
+        setattr(habit, name, value)
+
+async def _completed_days(db: AsyncSession, habit_ids: Iterable) -> dict:
+    result = await db.execute(
+        select(models.HabitLog.habit_id, models.HabitLog.date)
+        .where(models.HabitLog.habit_id.in_(list(habit_ids)), models.HabitLog.completed == True)
+        .order_by(models.HabitLog.habit_id, models.HabitLog.date)
+    )
+    days = {}
+    for habit_id, day in result:
+        days.setdefault(habit_id, []).append(day)
+    return days
+
+async def apply_toggle(db: AsyncSession, habit: models.Habit, day: date, completed: bool) -> None:
+    """
+    Updates the habit's streaks after its log for `day` was set to `completed`. Toggles at
+    the head of the latest run (today, yesterday) are applied in O(1); anything that could
+    split or join older runs, such as un-toggling a past day, re-reads that habit's completed
+    days. The caller commits.
+    """
+    last, one_day = habit.last_completed_on, timedelta(days=1)
+    local = True
+    if completed:
+        if last is None or day > last + one_day:
+            habit.current_streak, habit.last_completed_on = 1, day
+            habit.longest_streak = max(habit.longest_streak, 1)
+        elif day == last + one_day:
+            habit.current_streak, habit.last_completed_on = habit.current_streak + 1, day
+            habit.longest_streak = max(habit.longest_streak, habit.current_streak)
+        else:
+            local = day == last
+    elif last is not None and day <= last:
+        # Trimming the latest run is local unless it is the only run or might be the longest
+        local = day == last and 1 < habit.current_streak < habit.longest_streak
+        if local:
+            habit.current_streak, habit.last_completed_on = habit.current_streak - 1, day - one_day
+
+    if local:
+        _mark(habit, day, completed)
+    else:
+        days = (await _completed_days(db, [habit.id])).get(habit.id, [])
+        _rebuild(habit, days, max(habit.recent_anchor or day, day))
+
+def stats(habit: models.Habit, today: date) -> dict:
+    """Streaks and rolling completion rates as of `today`, from the stored state alone."""
+    last = habit.last_completed_on
+    # A run that ended yesterday is still current until today is over
+    current = habit.current_streak if last is not None and last >= today - timedelta(days=1) else 0
+
+    mask, anchor = _mask(habit), habit.recent_anchor
+    age = (today - habit.created_at.date()).days + 1 if habit.created_at else RECENT_DAYS
+    rates = {}
+    for window in RATE_WINDOWS:
+        completed = 0
+        if anchor is not None:
+            low = (anchor - today).days
+            high = low + window - 1
+            low, high = max(low, 0), min(high, RECENT_DAYS - 1)
+            if low <= high:
+                completed = bin((mask >> low) & ((1 << (high - low + 1)) - 1)).count("1")
+        tracked = max(1, min(window, age))
+        rates[f"completion_{window}d"] = round(min(1.0, completed / tracked), 3)
+
+    return {
+        "habit_id": habit.id,
+        "name": habit.name,
+        "current_streak": current,
+        "longest_streak": habit.longest_streak,
+        "last_completed_on": last,
+        **rates,
+    }
+
+async def backfill(batch_size: int = HABIT_STATS_BACKFILL_BATCH, today: Optional[date] = None) -> int:
+    """Recomputes the stored stats for every habit from its logs, paging through habits by id."""
+    today = today or date.today()
+    done, after = 0, None
+    while True:
+        async with database.SessionLocal() as db:
+            query = select(models.Habit).order_by(models.Habit.id).limit(batch_size)
+            if after is not None:
+                query = query.where(models.Habit.id > after)
+            habits = list((await db.scalars(query)).all())
+            if not habits:
+                return done
+            days = await _completed_days(db, [habit.id for habit in habits])
+            for habit in habits:
+                _rebuild(habit, days.get(habit.id, []), today)
+            await db.commit()
+            done += len(habits)
+            after = habits[-1].id
@@ -0,0 +1,16 @@
+import hashlib
+from fastapi import Request, Response
+
+def etag_response(request: Request, body: bytes, media_type: str = "application/json") -> Response:
+    """
+    Serves `body` with a strong ETag, or an empty 304 when the client's If-None-Match already
+    has it. `no-cache` makes browsers revalidate every time instead of trusting a stale copy.
+    """
+    etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if etag in tags or "*" in tags:
+            return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
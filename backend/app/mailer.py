@@ -0,0 +1,288 @@
+import os
+import json
+import time
+import uuid
+import random
+import asyncio
+import smtplib
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import List, Optional
+from dotenv import load_dotenv
+from sqlalchemy import select, update, and_
+from . import models, database
+
+load_dotenv()
+
+EMAIL_FROM = os.getenv("EMAIL_FROM", "Atlas <onboarding@resend.dev>")
+# resend, smtp, file or memory. The file sink writes reset tokens to disk in plaintext, so it is
+# only the default in the dev profile; other profiles send nothing until one is configured.
+EMAIL_TRANSPORT = os.getenv("EMAIL_TRANSPORT") or (
+    "resend" if os.getenv("RESEND_API_KEY") else "file" if database.DB_PROFILE == "dev" else ""
+)
+EMAIL_OUTBOX_DIR = os.getenv("EMAIL_OUTBOX_DIR", os.path.join(database.DATA_DIR, "outbox"))
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "20"))
+EMAIL_POLL_SECONDS = float(os.getenv("EMAIL_POLL_SECONDS", "5"))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "6"))
+EMAIL_BACKOFF_BASE_SECONDS = float(os.getenv("EMAIL_BACKOFF_BASE_SECONDS", "10"))
+EMAIL_CLAIM_LEASE_SECONDS = float(os.getenv("EMAIL_CLAIM_LEASE_SECONDS", "120"))
+EMAIL_BREAKER_THRESHOLD = int(os.getenv("EMAIL_BREAKER_THRESHOLD", "5"))
+EMAIL_BREAKER_COOLDOWN_SECONDS = float(os.getenv("EMAIL_BREAKER_COOLDOWN_SECONDS", "60"))
+
+# --- Transports ---
+# Each transport exposes a blocking send(to, subject, html); the dispatcher runs it off the event loop.
+
+class ResendTransport:
+    name = "resend"
+
+    def __init__(self):
+        # Imported here: the SDK adds ~200ms to startup for deployments that don't use it
+        import resend
+        resend.api_key = os.getenv("RESEND_API_KEY")
+        self.client = resend
+
+    def send(self, to: str, subject: str, html: str) -> None:
+        self.client.Emails.send({"from": EMAIL_FROM, "to": [to], "subject": subject, "html": html})
+
+class SmtpTransport:
+    name = "smtp"
+
+    def __init__(self):
+        self.host = os.getenv("SMTP_HOST", "localhost")
+        self.port = int(os.getenv("SMTP_PORT", "587"))
+        self.username = os.getenv("SMTP_USERNAME")
+        self.password = os.getenv("SMTP_PASSWORD")
+        self.use_tls = os.getenv("SMTP_USE_TLS", "true").lower() == "true"
+
+    def send(self, to: str, subject: str, html: str) -> None:
+        message = EmailMessage()
+        message["From"] = EMAIL_FROM
+        message["To"] = to
+        message["Subject"] = subject
+        message.set_content("This message requires an HTML-capable mail client.")
+        message.add_alternative(html, subtype="html")
+        with smtplib.SMTP(self.host, self.port, timeout=15) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+            smtp.send_message(message)
+
+class FileTransport:
+    name = "file"
+
+    def __init__(self, directory: str = EMAIL_OUTBOX_DIR):
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+
+    def send(self, to: str, subject: str, html: str) -> None:
+        filename = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.json"
+        with open(os.path.join(self.directory, filename), "w") as f:
+            json.dump({"from": EMAIL_FROM, "to": to, "subject": subject, "html": html}, f, indent=2)
+
+class MemoryTransport:
+    name = "memory"
+
+    def __init__(self):
+        self.sent: List[dict] = []
+
+    def send(self, to: str, subject: str, html: str) -> None:
+        self.sent.append({"to": to, "subject": subject, "html": html})
+
+TRANSPORTS = {
+    "resend": ResendTransport,
+    "smtp": SmtpTransport,
+    "file": FileTransport,
+    "memory": MemoryTransport,
+}
+
+def build_transport(name: str = EMAIL_TRANSPORT):
+    """The named transport, or None when none is configured."""
+    if not name:
+        return None
+    if name not in TRANSPORTS:
+        raise ValueError(f"Unknown EMAIL_TRANSPORT '{name}' (expected one of {', '.join(TRANSPORTS)})")
+    return TRANSPORTS[name]()
+
+# --- Templates ---
+
+def render_password_reset_email(reset_token: str) -> str:
+    return f"""
+        <div style="font-family: sans-serif; max-width: 600px; margin: auto; padding: 20px; border: 1px solid #eee; border-radius: 12px;">
+            <h2 style="color: #2eaadc; margin-bottom: 20px;">Reset your password</h2>
+            <p>You requested a password reset for your Atlas account. Copy the token below and paste it into the reset page:</p>
+            <div style="background: #f9f9f9; padding: 15px; border-radius: 8px; font-family: monospace; font-size: 14px; word-break: break-all; border: 1px solid #ddd; margin: 20px 0;">
+                {reset_token}
+            </div>
+            <p style="color: #666; font-size: 12px; line-height: 1.5;">
+                This token will expire in <strong>15 minutes</strong>.<br/>
+                If you didn't request this, you can safely ignore this email.
+            </p>
+            <hr style="border: none; border-top: 1px solid #eee; margin: 20px 0;" />
+            <p style="text-align: center; color: #aaa; font-size: 10px;">Atlas System • Automated Message</p>
+        </div>
+    """
+
+def enqueue_email(db, to: str, subject: str, html: str) -> models.EmailOutbox:
+    """Stage an email in the caller's transaction; it is sent only if that transaction commits."""
+    message = models.EmailOutbox(to_address=to, subject=subject, html=html)
+    db.add(message)
+    return message
+
+# --- Dispatcher ---
+
+class OutboxDispatcher:
+    def __init__(self, transport=None):
+        self.transport = transport
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._consecutive_failures = 0
+        self._breaker_open_until = 0.0
+        self.stats = {"sent": 0, "failed_attempts": 0, "dead": 0, "breaker_trips": 0}
+
+    def start(self) -> None:
+        if self._task is None:
+            if self.transport is None:
+                self.transport = build_transport()
+            if self.transport is None:
+                # Mail still queues; it goes out once a transport is configured and the API restarts
+                print(f"⚠️  No email transport configured for DB_PROFILE={database.DB_PROFILE} "
+                      "(set EMAIL_TRANSPORT or RESEND_API_KEY); outbox emails stay pending")
+                return
+            self._task = asyncio.create_task(self._run())
+            print(f"📬 Email outbox dispatcher started (transport: {self.transport.name})")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def notify(self) -> None:
+        # Called after a commit that enqueued mail so it goes out without waiting for the next poll
+        self._wakeup.set()
+
+    @property
+    def breaker_open(self) -> bool:
+        return time.monotonic() < self._breaker_open_until
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "transport": self.transport.name if self.transport else None,
+            "breaker_open": self.breaker_open,
+            "consecutive_failures": self._consecutive_failures,
+        }
+
+    async def _scrub_finished(self) -> None:
+        # Bodies hold reset tokens; once a message is sent or dead nothing needs them
+        async with database.SessionLocal() as db:
+            result = await db.execute(
+                update(models.EmailOutbox)
+                .where(models.EmailOutbox.status != "PENDING", models.EmailOutbox.html != "")
+                .values(html="")
+            )
+            await db.commit()
+        if result.rowcount:
+            print(f"🧹 Cleared the bodies of {result.rowcount} finished outbox emails")
+
+    async def _run(self) -> None:
+        try:
+            await self._scrub_finished()
+        except Exception as e:
+            print(f"⚠️  Email outbox scrub failed: {e}")
+        while True:
+            try:
+                delivered = await self.dispatch_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️  Email outbox dispatch error: {e}")
+                delivered = 0
+            # A full batch means more may be waiting; otherwise sleep until notified or the next poll
+            if delivered < EMAIL_BATCH_SIZE or self.breaker_open:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=EMAIL_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def _claim_batch(self, db) -> List[models.EmailOutbox]:
+        now = datetime.utcnow()
+        due_ids = (await db.execute(
+            select(models.EmailOutbox.id)
+            .where(and_(models.EmailOutbox.status == "PENDING", models.EmailOutbox.next_attempt_at <= now))
+            .order_by(models.EmailOutbox.next_attempt_at)
+            .limit(EMAIL_BATCH_SIZE)
+        )).scalars().all()
+        if not due_ids:
+            return []
+
+        # Conditional claim so concurrent workers never pick up the same message
+        token = str(uuid.uuid4())
+        await db.execute(
+            update(models.EmailOutbox)
+            .where(and_(
+                models.EmailOutbox.id.in_(due_ids),
+                models.EmailOutbox.status == "PENDING",
+                models.EmailOutbox.next_attempt_at <= now,
+            ))
+            .values(claim_token=token, next_attempt_at=now + timedelta(seconds=EMAIL_CLAIM_LEASE_SECONDS))
+        )
+        await db.commit()
+        result = await db.execute(select(models.EmailOutbox).where(models.EmailOutbox.claim_token == token))
+        return list(result.scalars().all())
+
+    async def dispatch_once(self) -> int:
+        if self.breaker_open:
+            return 0
+
+        async with database.SessionLocal() as db:
+            batch = await self._claim_batch(db)
+            delivered = 0
+            for message in batch:
+                if self.breaker_open:
+                    # Release the rest of the claim so they're retried once the breaker closes
+                    message.next_attempt_at = datetime.utcnow()
+                    message.claim_token = None
+                    continue
+                try:
+                    await asyncio.to_thread(self.transport.send, message.to_address, message.subject, message.html)
+                except Exception as e:
+                    self._record_failure(message, e)
+                else:
+                    message.status = "SENT"
+                    message.sent_at = datetime.utcnow()
+                    message.last_error = None
+                    message.html = ""
+                    self._consecutive_failures = 0
+                    self.stats["sent"] += 1
+                    delivered += 1
+                message.attempts += 1
+                message.claim_token = None
+            await db.commit()
+            return delivered
+
+    def _record_failure(self, message: models.EmailOutbox, error: Exception) -> None:
+        self.stats["failed_attempts"] += 1
+        message.last_error = str(error)[:1000]
+        if message.attempts + 1 >= EMAIL_MAX_ATTEMPTS:
+            message.status = "FAILED"
+            message.html = ""
+            self.stats["dead"] += 1
+            print(f"❌ Email to {message.to_address} failed permanently after {message.attempts + 1} attempts: {error}")
+        else:
+            backoff = EMAIL_BACKOFF_BASE_SECONDS * (2 ** message.attempts)
+            message.next_attempt_at = datetime.utcnow() + timedelta(seconds=backoff * random.uniform(0.8, 1.2))
+
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= EMAIL_BREAKER_THRESHOLD:
+            self._breaker_open_until = time.monotonic() + EMAIL_BREAKER_COOLDOWN_SECONDS
+            self._consecutive_failures = 0
+            self.stats["breaker_trips"] += 1
+            print(f"⚠️  Email circuit breaker open for {EMAIL_BREAKER_COOLDOWN_SECONDS:.0f}s ({self.transport.name} failing)")
+
+dispatcher = OutboxDispatcher()
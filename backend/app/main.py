@@ -1,25 +1,41 @@
 import os
-import resend
+import time
 from fastapi import FastAPI, Depends, HTTPException, status, Form
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import Annotated
-from . import models, schemas, auth, database
-from .routers import habits, projects, daily_notes, expenses, search, budgets, todos, learning, workouts, user_data, ai, resources, vision, uploads
+from . import models, schemas, auth, database, mailer, migrations, pagination, query_stats, rollover
+from .routers import habits, projects, daily_notes, expenses, search, budgets, todos, learning, workouts, user_data, ai, resources, vision, uploads, admin, dashboard, stats
 from datetime import timedelta
 from jose import JWTError, jwt
 
 app = FastAPI(title="Atlas API")
 
+# Startup (schema check, bcrypt calibration, background tasks) slower than this is logged as a warning
+COLD_START_TARGET_MS = float(os.getenv("COLD_START_TARGET_MS", "1500"))
+
 @app.on_event("startup")
 async def startup():
-    # Create tables if they don't exist
-    async with database.engine.begin() as conn:
-        await conn.run_sync(models.Base.metadata.create_all)
-    
-    print("✅ Database tables initialized.")
+    started = time.perf_counter()
+    await migrations.ensure_schema()
+    await auth.calibrate_password_hashing()
+    mailer.dispatcher.start()
+    database.start_sqlite_maintenance()
+    rollover.start_rollover_job()
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    marker = "✅" if elapsed_ms <= COLD_START_TARGET_MS else "⚠️ "
+    print(f"{marker} Startup finished in {elapsed_ms:.0f}ms (target {COLD_START_TARGET_MS:.0f}ms)")
+
+@app.on_event("shutdown")
+async def shutdown():
+    await mailer.dispatcher.stop()
+    await rollover.stop_rollover_job()
+    if database.writer:
+        await database.writer.close()
+    await database.stop_sqlite_maintenance()
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,21 +43,22 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=pagination.PAGE_HEADERS,
 )
+app.add_middleware(query_stats.QueryStatsMiddleware)
 
 @app.post("/auth/register", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
 async def register(user_in: schemas.UserCreate, db: AsyncSession = Depends(database.get_db)):
     # Normalize email to lowercase
     email_lower = user_in.email.lower().strip()
-    from sqlalchemy import func
-    result = await db.execute(select(models.User).where(func.lower(models.User.email) == email_lower))
+    result = await db.execute(auth.select_user_by_email(email_lower))
     if result.scalar_one_or_none():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    hashed_password = auth.get_password_hash(user_in.password)
+    hashed_password = await auth.get_password_hash_async(user_in.password)
     db_user = models.User(
         email=email_lower,
         hashed_password=hashed_password,
@@ -66,6 +83,9 @@ app.include_router(ai.router)
 app.include_router(resources.router)
 app.include_router(vision.router)
 app.include_router(uploads.router)
+app.include_router(admin.router)
+app.include_router(dashboard.router)
+app.include_router(stats.router)
 
 @app.post("/auth/login", response_model=schemas.Token)
 async def login(
@@ -73,22 +93,11 @@ async def login(
     password: str = Form(...),
     db: AsyncSession = Depends(database.get_db)
 ):
-    from sqlalchemy import or_, func
-    
-    # Check if 'username' is an email (contains @) or a username
-    identifier = username.lower().strip()
-    
-    result = await db.execute(
-        select(models.User).where(
-            or_(
-                func.lower(models.User.email) == identifier,
-                func.lower(models.User.username) == identifier
-            )
-        )
-    )
+    # 'username' may be either an email or a username; both are matched case-insensitively
+    result = await db.execute(auth.select_user_by_identifier(username))
     user = result.scalar_one_or_none()
     
-    if not user or not auth.verify_password(password, user.hashed_password):
+    if not user or not await auth.verify_password_async(password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -150,9 +159,7 @@ async def forgot_password(
     request: schemas.ForgotPasswordRequest,
     db: AsyncSession = Depends(database.get_db)
 ):
-    from sqlalchemy import func
-    email_lower = request.email.lower().strip()
-    result = await db.execute(select(models.User).where(func.lower(models.User.email) == email_lower))
+    result = await db.execute(auth.select_user_by_email(request.email))
     user = result.scalar_one_or_none()
     
     if not user:
@@ -164,38 +171,15 @@ async def forgot_password(
         expires_delta=timedelta(minutes=15)
     )
     
-    # Send Email via Resend
-    resend.api_key = os.getenv("RESEND_API_KEY")
-    try:
-        resend.Emails.send({
-            "from": "Atlas <onboarding@resend.dev>",
-            "to": [user.email],
-            "subject": "Reset your Atlas Password",
-            "html": f"""
-                <div style="font-family: sans-serif; max-width: 600px; margin: auto; padding: 20px; border: 1px solid #eee; border-radius: 12px;">
-                    <h2 style="color: #2eaadc; margin-bottom: 20px;">Reset your password</h2>
-                    <p>You requested a password reset for your Atlas account. Copy the token below and paste it into the reset page:</p>
-                    <div style="background: #f9f9f9; padding: 15px; border-radius: 8px; font-family: monospace; font-size: 14px; word-break: break-all; border: 1px solid #ddd; margin: 20px 0;">
-                        {reset_token}
-                    </div>
-                    <p style="color: #666; font-size: 12px; line-height: 1.5;">
-                        This token will expire in <strong>15 minutes</strong>.<br/>
-                        If you didn't request this, you can safely ignore this email.
-                    </p>
-                    <hr style="border: none; border-top: 1px solid #eee; margin: 20px 0;" />
-                    <p style="text-align: center; color: #aaa; font-size: 10px;">Atlas System • Automated Message</p>
-                </div>
-            """
-        })
-        print(f"✅ Password reset email sent to {user.email}")
-    except Exception as e:
-        print(f"\n⚠️  RESEND EMAIL FAILED (likely onboarding@resend.dev limitation)")
-        print(f"Error: {e}")
-        print(f"\n--- FALLBACK: PASSWORD RESET TOKEN ---")
-        print(f"To: {user.email}")
-        print(f"Token: {reset_token}")
-        print(f"Copy this token to the reset page.")
-        print(f"---------------------------------------\n")
+    # Queue the email in the outbox; the background dispatcher delivers it off the request path
+    mailer.enqueue_email(
+        db,
+        to=user.email,
+        subject="Reset your Atlas Password",
+        html=mailer.render_password_reset_email(reset_token),
+    )
+    await db.commit()
+    mailer.dispatcher.notify()
     
     return {"message": "If an account exists with that email, a reset link has been sent."}
 
@@ -221,8 +205,9 @@ async def reset_password(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    user.hashed_password = auth.get_password_hash(request.new_password)
+    user.hashed_password = await auth.get_password_hash_async(request.new_password)
     await db.commit()
+    auth.invalidate_principal(user.id)
     
     return {"message": "Password has been successfully reset."}
 
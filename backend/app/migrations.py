@@ -0,0 +1,145 @@
+import os
+import re
+import ast
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
+from sqlalchemy import inspect, text
+from . import database, models, rollups
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines run a single process, so no lock is needed
+    fcntl = None
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ALEMBIC_INI = os.path.join(BACKEND_DIR, "alembic.ini")
+VERSIONS_DIR = os.path.join(BACKEND_DIR, "alembic", "versions")
+# Databases initialized by create_all before migrations were tracked are stamped at the newest of
+# these revisions whose columns they already have (the oldest when none match), then upgraded
+LEGACY_BASELINES = [
+    ("update_projects_todos", {"projects": {"status", "priority", "deadline", "tags"}, "todos": {"project_id"}}),
+    ("phase_17_finance", {"budgets": {"period"}, "transactions": {"id"}, "recurring_transactions": {"id"}}),
+]
+# Key for pg_advisory_xact_lock, shared by every worker and replica of the app
+MIGRATION_LOCK_KEY = 0x41544C53
+
+# Revisions that add rollup tables; an upgrade applying any of them rebuilds the rollups once
+# the schema is at head, since the endpoints read only those tables
+ROLLUP_REVISIONS = {"f1c6a8d3e5b7", "c2f7a9e4b6d1"}
+
+_REVISION_LINE = re.compile(r"^(revision|down_revision)\b[^=\n]*=\s*(.+)$", re.MULTILINE)
+
+def _alembic_config():
+    # Imported lazily: alembic adds ~150ms to every worker start and is only needed to run DDL
+    from alembic.config import Config
+    return Config(ALEMBIC_INI)
+
+def _script_head() -> Optional[str]:
+    """Head revision read straight from the version files, or None if the graph isn't a single line."""
+    revisions, parents = set(), set()
+    for filename in os.listdir(VERSIONS_DIR):
+        if not filename.endswith(".py"):
+            continue
+        with open(os.path.join(VERSIONS_DIR, filename)) as f:
+            found = dict(_REVISION_LINE.findall(f.read()))
+        if "revision" not in found:
+            continue
+        revisions.add(ast.literal_eval(found["revision"]))
+        down = ast.literal_eval(found.get("down_revision", "None"))
+        parents.update(down if isinstance(down, (tuple, list)) else [down] if down else [])
+    heads = revisions - parents
+    return heads.pop() if len(heads) == 1 else None
+
+async def _current_revision() -> Optional[str]:
+    # Plain SELECT instead of reflection: this runs on every worker start
+    async with database.engine.connect() as conn:
+        try:
+            return (await conn.execute(text("SELECT version_num FROM alembic_version"))).scalar_one_or_none()
+        except Exception:
+            return None
+
+@asynccontextmanager
+async def _file_lock():
+    # Postgres takes an advisory lock inside the migration transaction instead
+    path = database.engine.url.database
+    if database.DRIVE_TYPE != "SQLITE" or fcntl is None or not path or path == ":memory:":
+        yield
+        return
+    with open(f"{path}.migrate.lock", "w") as lock_file:
+        await asyncio.to_thread(fcntl.flock, lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+def _legacy_baseline(inspector) -> str:
+    """The revision an untracked create_all schema was built at, judged by its tables and columns."""
+    tables = set(inspector.get_table_names())
+    for revision, schema in LEGACY_BASELINES:
+        if all(
+            table in tables and columns <= {column["name"] for column in inspector.get_columns(table)}
+            for table, columns in schema.items()
+        ):
+            return revision
+    return LEGACY_BASELINES[-1][0]
+
+def _migrate(sync_conn, cfg, head: str) -> tuple:
+    """Returns (outcome, whether the rollups need rebuilding)."""
+    from alembic import command
+    from alembic.script import ScriptDirectory
+
+    inspector = inspect(sync_conn)
+    current = None
+    if inspector.has_table("alembic_version"):
+        current = sync_conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    if current == head:
+        return f"already at {head} (migrated by another worker)", False
+
+    # env.py runs on this connection and transaction instead of opening its own engine
+    cfg.attributes["connection"] = sync_conn
+    if not inspector.has_table("users"):
+        models.Base.metadata.create_all(sync_conn)
+        command.stamp(cfg, "head")
+        return f"created fresh schema at {head}", False
+
+    base = current
+    if current is None:
+        base = _legacy_baseline(inspector)
+        command.stamp(cfg, base)
+    pending = {revision.revision for revision in ScriptDirectory.from_config(cfg).iterate_revisions(head, base)}
+    command.upgrade(cfg, "head")
+    # resources, vision_items and the transaction tables were only ever created by create_all
+    models.Base.metadata.create_all(sync_conn)
+    source = current or f"legacy create_all schema (as of {base})"
+    return f"upgraded {source} -> {head}", bool(pending & ROLLUP_REVISIONS)
+
+async def ensure_schema() -> str:
+    """
+    Brings the database to the Alembic head. When it is already current (every start after
+    the first) this costs one SELECT and no DDL; otherwise one worker migrates under a lock
+    while the others wait and then find it current.
+    """
+    started = time.perf_counter()
+    head = _script_head()
+    current = await _current_revision()
+
+    if head is not None and current == head:
+        outcome = f"at head {head}, no DDL"
+    else:
+        from alembic.script import ScriptDirectory
+        cfg = _alembic_config()
+        head = ScriptDirectory.from_config(cfg).get_current_head()
+        async with _file_lock():
+            async with database.engine.begin() as conn:
+                if database.DRIVE_TYPE == "POSTGRESQL":
+                    await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+                outcome, rebuild_rollups = await conn.run_sync(_migrate, cfg, head)
+            if rebuild_rollups:
+                # After the commit: the backfill runs in its own per-batch transactions
+                written = await rollups.backfill()
+                outcome += f", rebuilt {written} rollup rows"
+
+    print(f"🗄️  Schema {outcome} ({(time.perf_counter() - started) * 1000:.0f}ms)")
+    return outcome
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, date
 from typing import List, Optional
-from sqlalchemy import String, ForeignKey, DateTime, Date, Boolean, UniqueConstraint, Text, Float, BigInteger
+from sqlalchemy import String, ForeignKey, DateTime, Date, Boolean, UniqueConstraint, Text, Float, BigInteger, LargeBinary, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .database import Base
 
@@ -13,6 +13,8 @@ class User(Base):
     username: Mapped[Optional[str]] = mapped_column(String(255), unique=True, index=True, nullable=True)
     hashed_password: Mapped[str] = mapped_column(String(255))
     full_name: Mapped[Optional[str]] = mapped_column(String(255))
+    # Currency every spend summary and rollup is converted into
+    base_currency: Mapped[str] = mapped_column(String(3), default="NGN", server_default="NGN")
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     habits: Mapped[List["Habit"]] = relationship(back_populates="owner", cascade="all, delete-orphan")
@@ -29,6 +31,10 @@ class User(Base):
     workouts: Mapped[List["Workout"]] = relationship(back_populates="owner", cascade="all, delete-orphan")
     vision_items: Mapped[List["VisionItem"]] = relationship(back_populates="owner", cascade="all, delete-orphan")
 
+# Case-insensitive login/registration lookups filter on lower(...), which the plain indexes can't serve
+Index("ix_users_email_lower", func.lower(User.email))
+Index("ix_users_username_lower", func.lower(User.username))
+
 class Habit(Base):
     __tablename__ = "habits"
 
@@ -40,16 +46,25 @@ class Habit(Base):
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
+    # Streak state, kept up to date by every log toggle (app/habit_stats.py)
+    current_streak: Mapped[int] = mapped_column(default=0) # length of the run ending on last_completed_on
+    longest_streak: Mapped[int] = mapped_column(default=0)
+    last_completed_on: Mapped[Optional[date]] = mapped_column(Date)
+    # Bit i set = completed on recent_anchor - i, for the 90 days up to the anchor
+    recent_completions: Mapped[Optional[bytes]] = mapped_column(LargeBinary(12))
+    recent_anchor: Mapped[Optional[date]] = mapped_column(Date)
+
     owner: Mapped["User"] = relationship(back_populates="habits")
     logs: Mapped[List["HabitLog"]] = relationship(back_populates="habit", cascade="all, delete-orphan")
+    bitmaps: Mapped[List["HabitBitmap"]] = relationship(back_populates="habit", cascade="all, delete-orphan")
 
 class HabitLog(Base):
     __tablename__ = "habit_logs"
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     habit_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("habits.id"), index=True)
-    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), index=True)
-    date: Mapped[date] = mapped_column(Date, index=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"))
+    date: Mapped[date] = mapped_column(Date)
     completed: Mapped[bool] = mapped_column(Boolean, default=False)
 
     habit: Mapped["Habit"] = relationship(back_populates="logs")
@@ -57,6 +72,22 @@ class HabitLog(Base):
 
     __table_args__ = (
         UniqueConstraint("user_id", "habit_id", "date", name="uq_user_habit_date"),
+        Index("ix_habit_logs_user_date", "user_id", "date"),
+    )
+
+# One row per habit per year instead of one per day: bit i (LSB first) = completed on day i of the year
+class HabitBitmap(Base):
+    __tablename__ = "habit_bitmaps"
+
+    habit_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("habits.id"), primary_key=True)
+    year: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"))
+    bits: Mapped[bytes] = mapped_column(LargeBinary(46)) # 366 bits
+
+    habit: Mapped["Habit"] = relationship(back_populates="bitmaps")
+
+    __table_args__ = (
+        Index("ix_habit_bitmaps_user_year", "user_id", "year"),
     )
 
 class Project(Base):
@@ -98,8 +129,8 @@ class DailyNote(Base):
     __tablename__ = "daily_notes"
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), index=True)
-    date: Mapped[date] = mapped_column(Date, index=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"))
+    date: Mapped[date] = mapped_column(Date)
     content: Mapped[str] = mapped_column(Text)
     mood: Mapped[Optional[str]] = mapped_column(String(50))
     highlight: Mapped[Optional[str]] = mapped_column(String(255))
@@ -118,22 +149,31 @@ class Expense(Base):
     __tablename__ = "expenses"
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), index=True)
-    date: Mapped[date] = mapped_column(Date, index=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"))
+    date: Mapped[date] = mapped_column(Date)
     amount: Mapped[float] = mapped_column(Float)
     category: Mapped[str] = mapped_column(String(50))
     description: Mapped[str] = mapped_column(String(255))
+    currency: Mapped[str] = mapped_column(String(3), default="NGN", server_default="NGN")
+    # See expense_import.content_hash; unique per user, so statement imports skip rows the user already has
+    content_hash: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     owner: Mapped["User"] = relationship(back_populates="expenses")
 
+    # Also covers /expenses/stats/summary (category totals over a range) without touching the table
+    __table_args__ = (
+        Index("ix_expenses_user_date", "user_id", "date", "category", "amount", "currency"),
+        Index("ix_expenses_user_content_hash", "user_id", "content_hash", unique=True),
+    )
+
 class Transaction(Base):
     __tablename__ = "transactions"
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), index=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"))
     
-    date: Mapped[date] = mapped_column(Date, index=True)
+    date: Mapped[date] = mapped_column(Date)
     amount: Mapped[float] = mapped_column(Float)
     type: Mapped[str] = mapped_column(String(20), default="EXPENSE") # INCOME, EXPENSE, TRANSFER
     category: Mapped[str] = mapped_column(String(50), index=True)
@@ -144,6 +184,10 @@ class Transaction(Base):
 
     owner: Mapped["User"] = relationship(back_populates="transactions")
 
+    __table_args__ = (
+        Index("ix_transactions_user_date", "user_id", "date"),
+    )
+
 class RecurringTransaction(Base):
     __tablename__ = "recurring_transactions"
 
@@ -180,10 +224,10 @@ class Todo(Base):
     __tablename__ = "todos"
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), index=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"))
     project_id: Mapped[Optional[uuid.UUID]] = mapped_column(ForeignKey("projects.id"), index=True, nullable=True)
     
-    date: Mapped[date] = mapped_column(Date, index=True)
+    date: Mapped[date] = mapped_column(Date)
     content: Mapped[str] = mapped_column(String(255))
     priority: Mapped[str] = mapped_column(String(10), default="medium") # low, medium, high
     is_completed: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -193,12 +237,16 @@ class Todo(Base):
     owner: Mapped["User"] = relationship(back_populates="todos")
     project: Mapped["Project"] = relationship(back_populates="todos")
 
+    __table_args__ = (
+        Index("ix_todos_user_date", "user_id", "date"),
+    )
+
 class LearningSession(Base):
     __tablename__ = "learning_sessions"
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), index=True)
-    date: Mapped[date] = mapped_column(Date, index=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"))
+    date: Mapped[date] = mapped_column(Date)
     subject: Mapped[str] = mapped_column(String(100), index=True)
     resource_type: Mapped[Optional[str]] = mapped_column(String(50)) # Book, Course, Podcast, etc.
     resource_name: Mapped[Optional[str]] = mapped_column(String(255))
@@ -214,11 +262,15 @@ class LearningSession(Base):
     owner: Mapped["User"] = relationship(back_populates="learning_sessions")
     resource: Mapped["Resource"] = relationship(back_populates="sessions")
 
+    __table_args__ = (
+        Index("ix_learning_sessions_user_date", "user_id", "date"),
+    )
+
 class Resource(Base):
     __tablename__ = "resources"
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), index=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"))
     
     title: Mapped[str] = mapped_column(String(255), index=True)
     type: Mapped[str] = mapped_column(String(50)) # Book, Course, Video, Article, Project
@@ -238,12 +290,17 @@ class Resource(Base):
     owner: Mapped["User"] = relationship(back_populates="resources")
     sessions: Mapped[List["LearningSession"]] = relationship(back_populates="resource")
 
+    # Keyset pagination order of the resources list (newest updated first)
+    __table_args__ = (
+        Index("ix_resources_user_updated", "user_id", "updated_at", "id"),
+    )
+
 class Workout(Base):
     __tablename__ = "workouts"
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), index=True)
-    date: Mapped[date] = mapped_column(Date, index=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"))
+    date: Mapped[date] = mapped_column(Date)
     type: Mapped[str] = mapped_column(String(100)) # e.g., "Leg Day", "Push"
     notes: Mapped[Optional[str]] = mapped_column(Text)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -251,6 +308,10 @@ class Workout(Base):
     owner: Mapped["User"] = relationship(back_populates="workouts")
     sets: Mapped[List["ExerciseSet"]] = relationship(back_populates="workout", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_workouts_user_date", "user_id", "date"),
+    )
+
 class ExerciseSet(Base):
     __tablename__ = "exercise_sets"
 
@@ -283,3 +344,61 @@ class VisionItem(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     owner: Mapped["User"] = relationship(back_populates="vision_items")
+
+# Per-user, per-day activity totals, recomputed from the source tables on every write (app/rollups.py)
+class DailyRollup(Base):
+    __tablename__ = "daily_rollups"
+
+    # The (user_id, date) primary key is the index every history read scans
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    date: Mapped[date] = mapped_column(Date, primary_key=True)
+    habits_completed: Mapped[int] = mapped_column(default=0)
+    habits_total: Mapped[int] = mapped_column(default=0)
+    todos_done: Mapped[int] = mapped_column(default=0)
+    todos_total: Mapped[int] = mapped_column(default=0)
+    learning_minutes: Mapped[int] = mapped_column(default=0)
+    workout_count: Mapped[int] = mapped_column(default=0)
+    spend: Mapped[float] = mapped_column(Float, default=0)
+    spend_unconverted: Mapped[int] = mapped_column(default=0) # expenses left out of spend for lack of an FX rate
+    mood: Mapped[Optional[str]] = mapped_column(String(50))
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Per-user monthly spend by category, so whole-month summaries skip the raw expenses (app/rollups.py)
+class ExpenseRollup(Base):
+    __tablename__ = "expense_rollups"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    month: Mapped[date] = mapped_column(Date, primary_key=True) # first day of the month
+    category: Mapped[str] = mapped_column(String(50), primary_key=True)
+    total: Mapped[float] = mapped_column(Float, default=0)
+    expense_count: Mapped[int] = mapped_column(default=0)
+    unconverted_count: Mapped[int] = mapped_column(default=0) # of those, left out of total for lack of an FX rate
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Daily exchange rates as units of the currency per one unit of fx.FX_REFERENCE_CURRENCY (app/fx.py)
+class FxRate(Base):
+    __tablename__ = "fx_rates"
+
+    currency: Mapped[str] = mapped_column(String(3), primary_key=True)
+    date: Mapped[date] = mapped_column(Date, primary_key=True)
+    rate: Mapped[float] = mapped_column(Float)
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    to_address: Mapped[str] = mapped_column(String(255))
+    subject: Mapped[str] = mapped_column(String(255))
+    html: Mapped[str] = mapped_column(Text)
+    status: Mapped[str] = mapped_column(String(20), default="PENDING") # PENDING, SENT, FAILED
+    attempts: Mapped[int] = mapped_column(default=0)
+    # Doubles as the claim lease: a dispatcher pushes it forward while a send is in flight
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    claim_token: Mapped[Optional[str]] = mapped_column(String(36))
+    last_error: Mapped[Optional[str]] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
@@ -0,0 +1,77 @@
+import os
+import json
+import uuid
+import base64
+from datetime import date, datetime
+from typing import Optional, Sequence
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import Date, DateTime, Uuid, tuple_
+
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "100"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "500"))
+
+# Pagination and aggregates travel in headers so list endpoints keep returning a plain JSON array
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+PAGE_HEADERS = [NEXT_CURSOR_HEADER, "X-Total-Count", "X-Total-Amount", "X-Total-Minutes", "X-Completed-Count", "X-Unconverted-Count"]
+
+class PageParams:
+    """Query parameters shared by every paginated endpoint (?cursor=...&limit=...)."""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's X-Next-Cursor header"),
+        limit: Optional[int] = Query(None, ge=1, le=PAGE_SIZE_MAX),
+    ):
+        self.cursor = cursor
+        self.limit = limit
+
+    @property
+    def first_page(self) -> bool:
+        return self.cursor is None
+
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else str(v) for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, columns: Sequence) -> tuple:
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if len(raw) != len(columns):
+            raise ValueError("cursor does not match this endpoint")
+        values = []
+        for column, value in zip(columns, raw):
+            if isinstance(column.type, DateTime):
+                values.append(datetime.fromisoformat(value))
+            elif isinstance(column.type, Date):
+                values.append(date.fromisoformat(value))
+            elif isinstance(column.type, Uuid):
+                values.append(uuid.UUID(value))
+            else:
+                values.append(value)
+        return tuple(values)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
+async def paginate(db, stmt, keys: Sequence, page: PageParams, response: Response, default_limit: int = PAGE_SIZE_DEFAULT) -> list:
+    """
+    Keyset pagination, newest first, over `keys` (e.g. date, id). Fetches one extra row to know
+    whether another page exists and, if so, returns its cursor in the X-Next-Cursor header.
+    """
+    limit = page.limit or default_limit
+    stmt = stmt.order_by(*[key.desc() for key in keys])
+    if page.cursor is not None:
+        after = decode_cursor(page.cursor, keys)
+        # The bound on the leading key alone lets the planner range-scan the (user_id, key) index
+        stmt = stmt.where(keys[0] <= after[0], tuple_(*keys) < after)
+
+    rows = (await db.execute(stmt.limit(limit + 1))).scalars().all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(rows[-1], key.key) for key in keys])
+    return rows
+
+def set_total_headers(response: Response, **totals) -> None:
+    # total_count -> X-Total-Count, total_amount -> X-Total-Amount, ...
+    for name, value in totals.items():
+        header = "X-" + "-".join(part.capitalize() for part in name.split("_"))
+        response.headers[header] = str(round(value, 2) if isinstance(value, float) else value or 0)
@@ -0,0 +1,170 @@
+import os
+import json
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import event
+from . import database
+
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+# Run EXPLAIN for slow SELECTs on Postgres and include the plan in the log line
+DB_SLOW_QUERY_EXPLAIN = os.getenv("DB_SLOW_QUERY_EXPLAIN", "false").lower() == "true"
+
+# Issued as statements only by some drivers/modes (e.g. SQLite savepoints), so they are kept
+# out of query counts to make budgets comparable; they still show up in the slow-query log
+_TRANSACTION_CONTROL = ("BEGIN", "SAVEPOINT", "RELEASE", "ROLLBACK", "COMMIT")
+
+class RequestQueryStats:
+    __slots__ = ("count", "total_ms", "slowest_ms", "slowest_statement")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_statement: Optional[str] = None
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("atlas_query_stats", default=None)
+_current_scope: ContextVar[Optional[dict]] = ContextVar("atlas_query_scope", default=None)
+
+# route -> running aggregates since process start (or the last reset)
+_route_stats: dict = {}
+
+def _compact(statement: str, limit: int = 500) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + "…"
+
+def _route_label(scope: Optional[dict]) -> str:
+    if scope is None:
+        return "background"
+    route = scope.get("route")
+    return f"{scope['method']} {route.path if route is not None else scope['path']}"
+
+def _redact(parameters) -> list:
+    # Log only the shape of bound parameters, never their values
+    if isinstance(parameters, dict):
+        return [f"{key}:{type(value).__name__}" for key, value in parameters.items()]
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (list, tuple, dict)):
+            return [f"<{len(parameters)} rows>"]
+        return [type(value).__name__ for value in parameters]
+    return []
+
+def _explain(conn, statement: str, parameters) -> Optional[str]:
+    if conn.dialect.name != "postgresql" or not statement.lstrip().upper().startswith("SELECT"):
+        return None
+    # Runs on the request's connection inside its transaction, so a failing EXPLAIN is confined to
+    # a savepoint; otherwise Postgres would abort the transaction under the caller's next statement
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT atlas_explain")
+        try:
+            cursor.execute("EXPLAIN " + statement, parameters)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        except Exception as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT atlas_explain")
+            plan = f"EXPLAIN failed: {e}"
+        cursor.execute("RELEASE SAVEPOINT atlas_explain")
+        return plan
+    except Exception as e:
+        return f"EXPLAIN skipped: {e}"
+    finally:
+        cursor.close()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context rather than the connection: a statement that fails never
+    # reaches after_cursor_execute, and its start time goes away with its context
+    if context is not None:
+        context._atlas_query_start = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_atlas_query_start", None)
+    if started is None:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    stats = _current.get()
+    if stats is not None and not statement.lstrip().upper().startswith(_TRANSACTION_CONTROL):
+        stats.count += 1
+        stats.total_ms += elapsed_ms
+        if elapsed_ms > stats.slowest_ms:
+            stats.slowest_ms = elapsed_ms
+            stats.slowest_statement = statement
+
+    if elapsed_ms >= DB_SLOW_QUERY_MS:
+        record = {
+            "event": "slow_query",
+            "at": datetime.utcnow().isoformat(),
+            "route": _route_label(_current_scope.get()),
+            "duration_ms": round(elapsed_ms, 2),
+            "statement": _compact(statement),
+            "params": _redact(parameters),
+        }
+        if DB_SLOW_QUERY_EXPLAIN:
+            record["plan"] = _explain(conn, statement, parameters)
+        print(f"🐢 {json.dumps(record)}")
+
+for _engine in database.engines:
+    event.listen(_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(_engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+def _record_route(route: str, stats: RequestQueryStats) -> None:
+    agg = _route_stats.get(route)
+    if agg is None:
+        agg = _route_stats[route] = {
+            "requests": 0, "queries": 0, "max_queries": 0, "db_ms": 0.0,
+            "slowest_ms": 0.0, "slowest_statement": None,
+        }
+    agg["requests"] += 1
+    agg["queries"] += stats.count
+    agg["max_queries"] = max(agg["max_queries"], stats.count)
+    agg["db_ms"] += stats.total_ms
+    if stats.slowest_ms > agg["slowest_ms"]:
+        agg["slowest_ms"] = stats.slowest_ms
+        agg["slowest_statement"] = _compact(stats.slowest_statement or "")
+
+def route_stats() -> dict:
+    return {
+        route: {
+            **agg,
+            "db_ms": round(agg["db_ms"], 2),
+            "slowest_ms": round(agg["slowest_ms"], 2),
+            "avg_queries": round(agg["queries"] / agg["requests"], 2),
+            "avg_db_ms": round(agg["db_ms"] / agg["requests"], 2),
+        }
+        for route, agg in sorted(_route_stats.items(), key=lambda item: -item[1]["db_ms"])
+    }
+
+def reset_route_stats() -> None:
+    _route_stats.clear()
+
+class QueryStatsMiddleware:
+    """ASGI middleware attributing SQL statements to the matched FastAPI route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestQueryStats()
+        stats_token = _current.set(stats)
+        scope_token = _current_scope.set(scope)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode()))
+                headers.append((b"server-timing", f"db;dur={stats.total_ms:.1f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            # Unmatched paths (404s) are not aggregated to keep the table bounded
+            if scope.get("route") is not None:
+                _record_route(_route_label(scope), stats)
+            _current.reset(stats_token)
+            _current_scope.reset(scope_token)
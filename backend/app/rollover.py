@@ -0,0 +1,102 @@
+import os
+import asyncio
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import select, update, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import models, database, rollups, upsert
+
+# UTC hour at which every user's open todos are carried into the new day; unset leaves it to the client
+TODO_ROLLOVER_HOUR_UTC = os.getenv("TODO_ROLLOVER_HOUR_UTC")
+# Users per UPDATE in the all-users job; each batch is its own short transaction
+TODO_ROLLOVER_BATCH_USERS = int(os.getenv("TODO_ROLLOVER_BATCH_USERS", "500"))
+
+_rollover_task = None
+rollover_stats = {"runs": 0, "last_run_at": None, "last_target_date": None, "last_moved": 0, "last_ms": None, "last_error": None}
+
+def _pending(target_date: date, user_filter):
+    return and_(user_filter, models.Todo.date < target_date, models.Todo.is_completed == False)
+
+async def carry_over_for_user(db: AsyncSession, user_id: uuid.UUID, target_date: date) -> List[models.Todo]:
+    """Moves the user's unfinished past todos to target_date and returns them. The caller commits."""
+    values = {"date": target_date, "is_carried_over": True}
+    condition = _pending(target_date, models.Todo.user_id == user_id)
+    return await upsert.update_returning(db, models.Todo, condition, values)
+
+async def carry_over_all_users(target_date: date, batch_users: int = TODO_ROLLOVER_BATCH_USERS) -> int:
+    """
+    Day-rollover job: one UPDATE per batch of users (served by the (user_id, date) index),
+    paging through users by id. Idempotent, so a second worker running it finds nothing to move.
+    """
+    moved, after = 0, None
+    todos = models.Todo.__table__
+    while True:
+        async with database.SessionLocal() as db:
+            query = select(models.User.id).order_by(models.User.id).limit(batch_users)
+            if after is not None:
+                query = query.where(models.User.id > after)
+            user_ids = list((await db.scalars(query)).all())
+            if not user_ids:
+                return moved
+            result = await db.execute(
+                update(todos)
+                .where(_pending(target_date, todos.c.user_id.in_(user_ids)))
+                .values(date=target_date, is_carried_over=True)
+            )
+            if result.rowcount:
+                await rollups.refresh_after_carry_over(db, user_ids, target_date)
+            await db.commit()
+            moved += result.rowcount
+            after = user_ids[-1]
+
+async def run_rollover(target_date: Optional[date] = None, batch_users: int = TODO_ROLLOVER_BATCH_USERS) -> int:
+    target_date = target_date or datetime.utcnow().date()
+    started = time.perf_counter()
+    moved = await carry_over_all_users(target_date, batch_users)
+    rollover_stats.update({
+        "runs": rollover_stats["runs"] + 1,
+        "last_run_at": datetime.utcnow().isoformat(),
+        "last_target_date": target_date.isoformat(),
+        "last_moved": moved,
+        "last_ms": round((time.perf_counter() - started) * 1000, 1),
+        "last_error": None,
+    })
+    return moved
+
+def _seconds_until_next_run(hour: int) -> float:
+    now = datetime.utcnow()
+    next_run = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if next_run <= now:
+        next_run += timedelta(days=1)
+    return (next_run - now).total_seconds()
+
+async def _rollover_loop(hour: int) -> None:
+    while True:
+        await asyncio.sleep(_seconds_until_next_run(hour))
+        try:
+            moved = await run_rollover()
+            print(f"🌅 Carried over {moved} open todos to {rollover_stats['last_target_date']} ({rollover_stats['last_ms']}ms)")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            rollover_stats["last_error"] = str(e)
+            print(f"⚠️  Todo rollover failed: {e}")
+
+def start_rollover_job() -> None:
+    global _rollover_task
+    if TODO_ROLLOVER_HOUR_UTC and _rollover_task is None:
+        hour = int(TODO_ROLLOVER_HOUR_UTC)
+        _rollover_task = asyncio.create_task(_rollover_loop(hour))
+        print(f"🌅 Todo rollover daily at {hour:02d}:00 UTC")
+
+async def stop_rollover_job() -> None:
+    global _rollover_task
+    if _rollover_task is not None:
+        _rollover_task.cancel()
+        try:
+            await _rollover_task
+        except asyncio.CancelledError:
+            pass
+        _rollover_task = None
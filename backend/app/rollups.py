@@ -0,0 +1,257 @@
+import os
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import select, delete, insert, union, union_all, literal, func, true, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import models, database, fx
+from .upsert import dialect_insert
+
+# Users per statement in the backfill; each batch is its own transaction
+ROLLUP_BACKFILL_BATCH_USERS = int(os.getenv("ROLLUP_BACKFILL_BATCH_USERS", "200"))
+# Literal (user, day) keys per refresh statement (SQLite caps a compound SELECT at 500 terms)
+ROLLUP_KEYS_PER_STATEMENT = 200
+
+# Tables whose rows carry a (user_id, date) that a rollup row summarises
+SOURCE_MODELS = [models.HabitLog, models.Todo, models.LearningSession, models.Workout, models.Expense, models.DailyNote]
+
+GRADES = [(90, "S"), (80, "A"), (60, "B"), (40, "C")]
+
+def life_score(habits_completed: int, habits_total: int, todos_done: int, todos_total: int, learning_minutes: int) -> dict:
+    """Habits are worth 50 points, todos 30 and the first 60 minutes of learning 20."""
+    habit_points = 50 * habits_completed / habits_total if habits_total else 25
+    todo_points = 30 * todos_done / todos_total if todos_total else 0
+    focus_points = min(20, learning_minutes / 60 * 20)
+    score = int(habit_points + todo_points + focus_points + 0.5)
+    grade = next((label for threshold, label in GRADES if score >= threshold), "D")
+    return {
+        "score": score,
+        "grade": grade,
+        "habits": round(habit_points, 1),
+        "todos": round(todo_points, 1),
+        "focus": round(focus_points, 1),
+    }
+
+def _on_day(model, k):
+    return and_(model.user_id == k.c.user_id, model.date == k.c.date)
+
+def _count(model, k, *extra):
+    return select(func.count()).select_from(model).where(_on_day(model, k), *extra).scalar_subquery()
+
+def _sum(column, model, k):
+    return select(func.coalesce(func.sum(column), 0)).where(_on_day(model, k)).scalar_subquery()
+
+def _spend(k, *conditions):
+    """Expenses matching `conditions`, summed in the user's base currency."""
+    amount = fx.expense_amount(fx.user_base_currency(k.c.user_id))
+    return select(func.coalesce(func.sum(amount), 0)).where(*conditions).scalar_subquery()
+
+def _unconverted(k, *conditions):
+    """How many of those _spend left out for lack of an exchange rate."""
+    amount = fx.expense_amount(fx.user_base_currency(k.c.user_id))
+    return select(fx.unconverted(amount)).where(*conditions).scalar_subquery()
+
+def _metrics(k) -> dict:
+    """Rollup column -> correlated subquery computing it for the key row k."""
+    return {
+        "habits_completed": _count(models.HabitLog, k, models.HabitLog.completed == True),
+        # Habits that existed by the end of that day, so adding one doesn't rewrite history
+        "habits_total": select(func.count()).select_from(models.Habit).where(
+            models.Habit.user_id == k.c.user_id, func.date(models.Habit.created_at) <= k.c.date
+        ).scalar_subquery(),
+        "todos_done": _count(models.Todo, k, models.Todo.is_completed == True),
+        "todos_total": _count(models.Todo, k),
+        "learning_minutes": _sum(models.LearningSession.duration_minutes, models.LearningSession, k),
+        "workout_count": _count(models.Workout, k),
+        "spend": _spend(k, _on_day(models.Expense, k)),
+        "spend_unconverted": _unconverted(k, _on_day(models.Expense, k)),
+        "mood": select(models.DailyNote.mood).where(_on_day(models.DailyNote, k)).limit(1).scalar_subquery(),
+    }
+
+async def _recompute(db: AsyncSession, model, k, key_columns: List[str], values: dict) -> int:
+    """INSERT INTO model SELECT <key columns of k>, <values> ... ON CONFLICT (keys) DO UPDATE."""
+    # Python-side defaults don't apply to INSERT ... SELECT, so updated_at is part of the row
+    values = {**values, "updated_at": literal(datetime.utcnow(), model.__table__.c.updated_at.type)}
+    # SQLite needs a WHERE on an INSERT ... SELECT before ON CONFLICT to parse it
+    source = select(*[k.c[name] for name in key_columns], *[expr.label(name) for name, expr in values.items()]).where(true())
+    stmt = dialect_insert(model).from_select([*key_columns, *values], source)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={name: stmt.excluded[name] for name in values},
+    )
+    result = await db.execute(stmt)
+    return result.rowcount
+
+async def refresh(db: AsyncSession, keys) -> int:
+    """
+    Recomputes the rollup rows for `keys`, a SELECT of distinct (user_id, date) pairs, with one
+    INSERT ... SELECT ... ON CONFLICT DO UPDATE. Recomputing instead of applying deltas keeps
+    the rows correct under concurrent writers and lets the same statement serve the backfill.
+    The caller commits.
+    """
+    k = keys.subquery("k")
+    return await _recompute(db, models.DailyRollup, k, ["user_id", "date"], _metrics(k))
+
+async def refresh_days(db: AsyncSession, user_id: uuid.UUID, days: Iterable[Optional[date]]) -> None:
+    """Recomputes the user's rollups for the given days. The caller commits."""
+    days = sorted({day for day in days if day is not None})
+    columns = models.DailyRollup.__table__.c
+    for start in range(0, len(days), ROLLUP_KEYS_PER_STATEMENT):
+        keys = [
+            select(literal(user_id, columns.user_id.type).label("user_id"), literal(day, columns.date.type).label("date"))
+            for day in days[start:start + ROLLUP_KEYS_PER_STATEMENT]
+        ]
+        await refresh(db, keys[0] if len(keys) == 1 else union(*keys))
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+def month_end(day: date) -> date:
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+async def refresh_spend(db: AsyncSession, user_id: uuid.UUID, entries: Iterable[Tuple[Optional[date], str]]) -> None:
+    """Recomputes the user's monthly category totals for the months of the (day, category) entries."""
+    keys = sorted({(month_start(day), category) for day, category in entries if day is not None})
+    columns = models.ExpenseRollup.__table__.c
+    expenses = models.Expense
+    for start in range(0, len(keys), ROLLUP_KEYS_PER_STATEMENT):
+        # The month's last day rides along in the key so the range test stays dialect-neutral
+        selects = [
+            select(
+                literal(user_id, columns.user_id.type).label("user_id"),
+                literal(month, columns.month.type).label("month"),
+                literal(month_end(month), columns.month.type).label("month_end"),
+                literal(category, columns.category.type).label("category"),
+            )
+            for month, category in keys[start:start + ROLLUP_KEYS_PER_STATEMENT]
+        ]
+        k = (selects[0] if len(selects) == 1 else union(*selects)).subquery("k")
+        in_month = and_(
+            expenses.user_id == k.c.user_id, expenses.date >= k.c.month, expenses.date <= k.c.month_end,
+            expenses.category == k.c.category,
+        )
+        await _recompute(db, models.ExpenseRollup, k, ["user_id", "month", "category"], {
+            "total": _spend(k, in_month),
+            "expense_count": select(func.count()).select_from(expenses).where(in_month).scalar_subquery(),
+            "unconverted_count": _unconverted(k, in_month),
+        })
+
+async def refresh_expenses(db: AsyncSession, user_id: uuid.UUID, entries: Iterable[Tuple[Optional[date], str]]) -> None:
+    """Daily and monthly rollups for expenses written on the (day, category) entries. The caller commits."""
+    entries = set(entries)
+    await refresh_days(db, user_id, [day for day, _ in entries])
+    await refresh_spend(db, user_id, entries)
+
+def spend_by_category(user_id: uuid.UUID, base_currency: str, start_date: date, end_date: date):
+    """
+    SELECT (category, total, unconverted) for the range in the user's base currency: whole
+    months come from expense_rollups and only the partial months at either edge are summed
+    from the raw expenses. `unconverted` counts the expenses left out for lack of a rate.
+    """
+    expenses, monthly = models.Expense, models.ExpenseRollup
+    amount = fx.expense_amount(base_currency)
+
+    def raw(low: date, high: date):
+        return (
+            select(expenses.category, func.sum(amount).label("total"), fx.unconverted(amount).label("unconverted"))
+            .where(expenses.user_id == user_id, expenses.date >= low, expenses.date <= high)
+            .group_by(expenses.category)
+        )
+
+    first_full = start_date if start_date.day == 1 else month_end(start_date) + timedelta(days=1)
+    last_full = end_date if end_date == month_end(end_date) else month_start(end_date) - timedelta(days=1)
+    if first_full > last_full:
+        return raw(start_date, end_date)
+
+    parts = [
+        select(monthly.category, monthly.total.label("total"), monthly.unconverted_count.label("unconverted")).where(
+            monthly.user_id == user_id, monthly.month >= first_full, monthly.month <= last_full,
+            monthly.expense_count > 0,
+        )
+    ]
+    if start_date < first_full:
+        parts.append(raw(start_date, first_full - timedelta(days=1)))
+    if end_date > last_full:
+        parts.append(raw(last_full + timedelta(days=1), end_date))
+    combined = (parts[0] if len(parts) == 1 else union_all(*parts)).subquery("spend")
+    return (
+        select(combined.c.category, func.sum(combined.c.total), func.sum(combined.c.unconverted))
+        .group_by(combined.c.category)
+    )
+
+def existing_days(user_filter, *conditions):
+    """Keys of rollup rows that already exist, for writes that touch many days at once."""
+    return select(models.DailyRollup.user_id, models.DailyRollup.date).where(user_filter, *conditions)
+
+async def refresh_after_carry_over(db: AsyncSession, user_ids: List[uuid.UUID], target_date: date) -> None:
+    """
+    After a carry-over the days the todos left are the ones whose rollup still shows open
+    todos, and the day they landed on is target_date. The caller commits.
+    """
+    rollups, todos = models.DailyRollup, models.Todo
+    await refresh(db, union(
+        existing_days(rollups.user_id.in_(user_ids), rollups.date < target_date, rollups.todos_done < rollups.todos_total),
+        select(todos.user_id, todos.date).where(todos.user_id.in_(user_ids), todos.date == target_date),
+    ))
+
+async def _rebuild_spend(db: AsyncSession, user_ids: List[uuid.UUID]) -> int:
+    # Per-day totals in each user's base currency, folded into months here
+    expenses = models.Expense
+    amount = fx.expense_amount(models.User.base_currency)
+    result = await db.execute(
+        select(
+            expenses.user_id, expenses.date, expenses.category,
+            func.sum(amount), func.count(), fx.unconverted(amount),
+        )
+        .join(models.User, models.User.id == expenses.user_id)
+        .where(expenses.user_id.in_(user_ids))
+        .group_by(expenses.user_id, expenses.date, expenses.category)
+    )
+    months = {}
+    for user_id, day, category, total, count, unconverted in result:
+        key = (user_id, month_start(day), category)
+        previous_total, previous_count, previous_unconverted = months.get(key, (0.0, 0, 0))
+        # total is NULL when none of the day's expenses had a rate
+        months[key] = (previous_total + (total or 0.0), previous_count + count, previous_unconverted + unconverted)
+
+    await db.execute(delete(models.ExpenseRollup).where(models.ExpenseRollup.user_id.in_(user_ids)))
+    if months:
+        now = datetime.utcnow()
+        await db.execute(insert(models.ExpenseRollup), [
+            {
+                "user_id": user_id, "month": month, "category": category,
+                "total": total, "expense_count": count, "unconverted_count": unconverted, "updated_at": now,
+            }
+            for (user_id, month, category), (total, count, unconverted) in months.items()
+        ])
+    return len(months)
+
+async def rebuild_users(db: AsyncSession, user_ids: List[uuid.UUID]) -> int:
+    """
+    Deletes and rewrites the users' daily and monthly rollups, e.g. after a base currency
+    change re-prices their spend. The caller commits.
+    """
+    await db.execute(delete(models.DailyRollup).where(models.DailyRollup.user_id.in_(user_ids)))
+    written = await refresh(db, union(*[
+        select(model.user_id, model.date).where(model.user_id.in_(user_ids)) for model in SOURCE_MODELS
+    ]))
+    return written + await _rebuild_spend(db, user_ids)
+
+async def backfill(batch_users: int = ROLLUP_BACKFILL_BATCH_USERS) -> int:
+    """
+    Rebuilds every user's daily and monthly spend rollups from the source tables, paging
+    through users by id. Each batch deletes its users' rows and rewrites them, so it is safe
+    to re-run at any time.
+    """
+    written, after = 0, None
+    while True:
+        async with database.SessionLocal() as db:
+            query = select(models.User.id).order_by(models.User.id).limit(batch_users)
+            if after is not None:
+                query = query.where(models.User.id > after)
+            user_ids = list((await db.scalars(query)).all())
+            if not user_ids:
+                return written
+            written += await rebuild_users(db, user_ids)
+            await db.commit()
+            after = user_ids[-1]
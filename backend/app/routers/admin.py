@@ -0,0 +1,38 @@
+import os
+from fastapi import APIRouter, Depends, HTTPException, status
+from .. import models, query_stats, auth, mailer, database, rollover
+from ..auth import get_current_user
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+# Comma-separated list of emails allowed to use operational endpoints
+ADMIN_EMAILS = {e.strip().lower() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip()}
+
+async def require_admin(current_user: models.User = Depends(get_current_user)):
+    if current_user.email.lower() not in ADMIN_EMAILS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
+
+@router.get("/query-stats")
+async def get_query_stats(admin: models.User = Depends(require_admin)):
+    return {
+        "slow_query_ms": query_stats.DB_SLOW_QUERY_MS,
+        "routes": query_stats.route_stats(),
+    }
+
+@router.get("/runtime-stats")
+async def get_runtime_stats(admin: models.User = Depends(require_admin)):
+    """Caches, queues and background jobs of this worker process."""
+    return {
+        "principal_cache": auth.principal_cache_stats(),
+        "password_hashing": auth.password_hash_stats(),
+        "email_outbox": mailer.dispatcher.snapshot(),
+        "sqlite_maintenance": database.maintenance_stats if database.DRIVE_TYPE == "SQLITE" else None,
+        "write_queue": database.writer.snapshot() if database.writer else None,
+        "todo_rollover": rollover.rollover_stats if rollover.TODO_ROLLOVER_HOUR_UTC else None,
+    }
+
+@router.delete("/query-stats", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_query_stats(admin: models.User = Depends(require_admin)):
+    query_stats.reset_route_stats()
+    return None
@@ -2,12 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from typing import Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
-from .. import models, schemas, database
+from .. import models, schemas, database, expense_import, rollups, fx
 from ..auth import get_current_user
 import re
 import random
 from datetime import date, timedelta
-from sqlalchemy import or_
+from sqlalchemy import select, or_
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 
@@ -82,6 +82,7 @@ async def chat_with_ai(
             priority="medium"
         )
         db.add(new_todo)
+        await rollups.refresh_days(db, current_user.id, [new_todo.date])
         await db.commit()
         return respond(f"I've added '{content}' to your task list.", action="REFRESH_TASKS")
 
@@ -101,11 +102,14 @@ async def chat_with_ai(
             amount=amount,
             description=desc,
             category=category,
-            date=date.today()
+            date=date.today(),
+            currency=current_user.base_currency,
+            content_hash=await expense_import.next_content_hash(db, current_user.id, date.today(), amount, desc),
         )
         db.add(new_expense)
+        await rollups.refresh_expenses(db, current_user.id, [(new_expense.date, new_expense.category)])
         await db.commit()
-        return respond(f"Logged expense: ₦{amount} for {desc} ({category}).", action="REFRESH_EXPENSES")
+        return respond(f"Logged expense: {fx.format_amount(amount, new_expense.currency)} for {desc} ({category}).", action="REFRESH_EXPENSES")
 
     # 4. Timer Intent
     timer_match = re.search(r'set timer for (\d+)', msg)
@@ -141,7 +145,8 @@ async def chat_with_ai(
         elif query_text:
              note_q = note_q.where(models.DailyNote.content.ilike(f"%{query_text}%"))
         
-        exp_q = select(models.Expense).where(models.Expense.user_id == current_user.id)
+        # The base-currency amount comes from the same SQL conversion as every spend total
+        exp_q = select(models.Expense, fx.expense_amount(current_user.base_currency)).where(models.Expense.user_id == current_user.id)
         if date_query:
             exp_q = exp_q.where(models.Expense.date == date_query)
         elif query_text and "expense" in msg:
@@ -159,7 +164,7 @@ async def chat_with_ai(
         if run_notes:
             notes = (await db.execute(note_q)).scalars().all()
         if run_expenses:
-            expenses = (await db.execute(exp_q)).scalars().all()
+            expenses = (await db.execute(exp_q)).all()
 
         if not notes and not expenses:
             return respond(f"I searched high and low, but found nothing matching that criteria.")
@@ -171,8 +176,12 @@ async def chat_with_ai(
                 response_text += f"- {n.date}: {n.content[:100]}...\n"
         if expenses:
             response_text += "\n💸 **Expenses**:\n"
-            for e in expenses[:3]:
-                response_text += f"- {e.date}: {e.description} (₦{e.amount})\n"
+            for e, base_amount in expenses[:3]:
+                amount = fx.format_amount(e.amount, e.currency)
+                # None when no rate covers that day
+                if e.currency != current_user.base_currency and base_amount is not None:
+                    amount += f" ≈ {fx.format_amount(base_amount, current_user.base_currency)}"
+                response_text += f"- {e.date}: {e.description} ({amount})\n"
 
         return respond(response_text)
 
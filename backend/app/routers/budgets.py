@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import math
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
-from typing import List, Annotated
-from .. import models, schemas, database
+from sqlalchemy import select, func, case, and_
+from typing import List, Annotated, Optional
+from datetime import date, timedelta
+from .. import models, schemas, database, upsert, http_cache, rollups, fx
 from ..auth import get_current_user
 
 router = APIRouter(prefix="/budgets", tags=["budgets"])
@@ -23,26 +26,74 @@ async def create_or_update_budget(
     db: AsyncSession = Depends(database.get_db),
     current_user: Annotated[schemas.User, Depends(get_current_user)] = None
 ):
-    # Upsert logic
-    stmt = select(models.Budget).where(
-        and_(
-            models.Budget.user_id == current_user.id,
-            models.Budget.category == budget_in.category,
-            models.Budget.period == budget_in.period
-        )
+    db_budget = await upsert.upsert(
+        db, models.Budget,
+        {**budget_in.model_dump(), "user_id": current_user.id},
+        conflict=["user_id", "category", "period"],
+        update=["amount"],
     )
-    result = await db.execute(stmt)
-    db_budget = result.scalar_one_or_none()
-
-    if db_budget:
-        db_budget.amount = budget_in.amount
-    else:
-        db_budget = models.Budget(
-            **budget_in.model_dump(),
-            user_id=current_user.id
-        )
-        db.add(db_budget)
-    
     await db.commit()
-    await db.refresh(db_budget)
     return db_budget
+
+_status_rows = TypeAdapter(List[schemas.BudgetStatus])
+
+def _period(period: str, day: date):
+    if period == "WEEKLY":
+        start = day - timedelta(days=day.weekday())  # Monday, as on the expenses page
+        return start, start + timedelta(days=6)
+    return rollups.month_start(day), rollups.month_end(day)
+
+def _status(budget: models.Budget, spent: float, unconverted: int, as_of: date) -> schemas.BudgetStatus:
+    start, end = _period(budget.period, as_of)
+    burn_rate = spent / ((as_of - start).days + 1)
+    overspend_on = None
+    if burn_rate > 0:
+        # First day on which the running total at this pace exceeds the budget
+        day = start + timedelta(days=max(0, math.floor(budget.amount / burn_rate)))
+        overspend_on = day if day <= end else None
+    return schemas.BudgetStatus(
+        budget_id=budget.id,
+        category=budget.category,
+        period=budget.period,
+        amount=budget.amount,
+        period_start=start,
+        period_end=end,
+        spent=round(spent, 2),
+        remaining=round(budget.amount - spent, 2),
+        burn_rate=round(burn_rate, 2),
+        projected_spend=round(burn_rate * ((end - start).days + 1), 2),
+        projected_overspend_on=overspend_on,
+        unconverted_count=unconverted,
+    )
+
+@router.get("/status", response_model=List[schemas.BudgetStatus])
+async def get_budget_status(
+    request: Request,
+    as_of: Optional[date] = None,
+    db: AsyncSession = Depends(database.get_read_db),
+    current_user: Annotated[schemas.User, Depends(get_current_user)] = None
+):
+    """Spend against every budget for its current week or month, up to and including as_of."""
+    as_of = as_of or date.today()
+    budgets, expenses = models.Budget, models.Expense
+    week_start, _ = _period("WEEKLY", as_of)
+    month_start, _ = _period("MONTHLY", as_of)
+    # One grouped statement: each budget joined to its category's expenses since its period began.
+    # Categories match case-insensitively, like the budget list on the expenses page, and spend
+    # is converted into the base currency the budget amounts are set in (rows without a rate
+    # are left out and counted).
+    amount = fx.expense_amount(current_user.base_currency)
+    result = await db.execute(
+        select(budgets, func.coalesce(func.sum(amount), 0), fx.unconverted(amount, expenses.id))
+        .outerjoin(expenses, and_(
+            expenses.user_id == budgets.user_id,
+            func.lower(expenses.category) == func.lower(budgets.category),
+            expenses.date >= case((budgets.period == "WEEKLY", week_start), else_=month_start),
+            expenses.date <= as_of,
+        ))
+        .where(budgets.user_id == current_user.id)
+        .group_by(budgets.id)
+        .order_by(budgets.category, budgets.period)
+    )
+    rows = [_status(budget, float(spent), unconverted, as_of) for budget, spent, unconverted in result]
+    return http_cache.etag_response(request, _status_rows.dump_json(rows))
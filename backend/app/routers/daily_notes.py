@@ -1,26 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, func
 from datetime import date
 from typing import Optional, Annotated, List
-from .. import models, schemas, database
+from .. import models, schemas, database, pagination, upsert, rollups
 from ..auth import get_current_user
 
 router = APIRouter(prefix="/daily-notes", tags=["daily-notes"])
 
 @router.get("/", response_model=List[schemas.DailyNote])
 async def get_recent_notes(
-    limit: int = 10,
+    response: Response,
+    page: pagination.PageParams = Depends(),
     db: AsyncSession = Depends(database.get_db),
     current_user: Annotated[schemas.User, Depends(get_current_user)] = None
 ):
-    result = await db.execute(
-        select(models.DailyNote)
-        .where(models.DailyNote.user_id == current_user.id)
-        .order_by(models.DailyNote.date.desc())
-        .limit(limit)
+    condition = models.DailyNote.user_id == current_user.id
+    if page.first_page:
+        total = await db.scalar(select(func.count()).select_from(models.DailyNote).where(condition))
+        pagination.set_total_headers(response, total_count=total)
+    return await pagination.paginate(
+        db, select(models.DailyNote).where(condition),
+        [models.DailyNote.date, models.DailyNote.id], page, response, default_limit=10,
     )
-    return result.scalars().all()
 
 @router.get("/{note_date}", response_model=Optional[schemas.DailyNote])
 async def get_daily_note(
@@ -45,33 +47,13 @@ async def save_daily_note(
     db: AsyncSession = Depends(database.get_db),
     current_user: Annotated[schemas.User, Depends(get_current_user)] = None
 ):
-    stmt = select(models.DailyNote).where(
-        and_(
-            models.DailyNote.user_id == current_user.id,
-            models.DailyNote.date == note_date
-        )
+    fields = ["content", "mood", "highlight", "lowlight", "tags"]
+    db_note = await upsert.upsert(
+        db, models.DailyNote,
+        {**note_in.model_dump(include=set(fields)), "date": note_date, "user_id": current_user.id},
+        conflict=["user_id", "date"],
+        update=fields,
     )
-    result = await db.execute(stmt)
-    db_note = result.scalar_one_or_none()
-
-    if db_note:
-        db_note.content = note_in.content
-        db_note.mood = note_in.mood
-        db_note.highlight = note_in.highlight
-        db_note.lowlight = note_in.lowlight
-        db_note.tags = note_in.tags
-    else:
-        db_note = models.DailyNote(
-            date=note_date,
-            content=note_in.content,
-            mood=note_in.mood,
-            highlight=note_in.highlight,
-            lowlight=note_in.lowlight,
-            tags=note_in.tags,
-            user_id=current_user.id
-        )
-        db.add(db_note)
-    
+    await rollups.refresh_days(db, current_user.id, [note_date])
     await db.commit()
-    await db.refresh(db_note)
     return db_note
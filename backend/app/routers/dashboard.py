@@ -0,0 +1,61 @@
+import os
+import asyncio
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy import select, and_
+from sqlalchemy.orm import selectinload
+from typing import Annotated
+from datetime import date
+from .. import models, schemas, database, http_cache, rollups
+from ..auth import get_current_user
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+# Sessions one dashboard request may hold at once; the queries are independent and run side by side
+DASHBOARD_MAX_PARALLEL = int(os.getenv("DASHBOARD_MAX_PARALLEL", "4"))
+
+@router.get("/{day}", response_model=schemas.Dashboard)
+async def get_dashboard(
+    day: date,
+    request: Request,
+    current_user: Annotated[schemas.User, Depends(get_current_user)] = None
+):
+    user_id = current_user.id
+    queries = {
+        "habits": select(models.Habit).where(models.Habit.user_id == user_id),
+        "habit_logs": select(models.HabitLog).where(and_(models.HabitLog.user_id == user_id, models.HabitLog.date == day)),
+        "projects": select(models.Project).where(models.Project.user_id == user_id).options(selectinload(models.Project.todos)),
+        "focus": select(models.ProjectFocus).where(and_(models.ProjectFocus.user_id == user_id, models.ProjectFocus.date == day)),
+        "note": select(models.DailyNote).where(and_(models.DailyNote.user_id == user_id, models.DailyNote.date == day)),
+        "todos": select(models.Todo).where(and_(models.Todo.user_id == user_id, models.Todo.date == day)),
+        "learning_sessions": select(models.LearningSession).where(
+            and_(models.LearningSession.user_id == user_id, models.LearningSession.date == day)
+        ),
+    }
+
+    # A session can only run one statement at a time, so each query gets its own
+    slots = asyncio.Semaphore(max(1, DASHBOARD_MAX_PARALLEL))
+
+    async def fetch(stmt):
+        async with slots:
+            async with database.read_session(request) as db:
+                return (await db.scalars(stmt)).all()
+
+    rows = dict(zip(queries, await asyncio.gather(*[fetch(stmt) for stmt in queries.values()])))
+    payload = schemas.Dashboard(
+        date=day,
+        habits=rows["habits"],
+        habit_logs=rows["habit_logs"],
+        projects=rows["projects"],
+        focus=rows["focus"][0] if rows["focus"] else None,
+        note=rows["note"][0] if rows["note"] else None,
+        todos=rows["todos"],
+        learning_sessions=rows["learning_sessions"],
+        life_score=rollups.life_score(
+            habits_completed=sum(log.completed for log in rows["habit_logs"]),
+            habits_total=len(rows["habits"]),
+            todos_done=sum(todo.is_completed for todo in rows["todos"]),
+            todos_total=len(rows["todos"]),
+            learning_minutes=sum(session.duration_minutes for session in rows["learning_sessions"]),
+        ),
+    )
+    return http_cache.etag_response(request, payload.model_dump_json().encode())
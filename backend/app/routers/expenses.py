@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import io
+from fastapi import APIRouter, Depends, HTTPException, Response, UploadFile, File, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, func
-from typing import List, Annotated
+from typing import List, Annotated, Literal, Optional
 from datetime import date
-from .. import models, schemas, database
+from .. import models, schemas, database, pagination, expense_import, rollups, fx
 from ..auth import get_current_user
 
 router = APIRouter(prefix="/expenses", tags=["expenses"])
@@ -12,19 +13,26 @@ router = APIRouter(prefix="/expenses", tags=["expenses"])
 async def get_expenses_range(
     start_date: date,
     end_date: date,
-    db: AsyncSession = Depends(database.get_db),
+    response: Response,
+    page: pagination.PageParams = Depends(),
+    db: AsyncSession = Depends(database.get_read_db),
     current_user: Annotated[schemas.User, Depends(get_current_user)] = None
 ):
-    result = await db.execute(
-        select(models.Expense).where(
-            and_(
-                models.Expense.user_id == current_user.id,
-                models.Expense.date >= start_date,
-                models.Expense.date <= end_date
-            )
-        ).order_by(models.Expense.date.desc())
+    condition = and_(
+        models.Expense.user_id == current_user.id,
+        models.Expense.date >= start_date,
+        models.Expense.date <= end_date
+    )
+    if page.first_page:
+        # Answered from the (user_id, date, category, amount, currency) index alone
+        amount = fx.expense_amount(current_user.base_currency)
+        count, total, unconverted = (await db.execute(
+            select(func.count(), func.sum(amount), fx.unconverted(amount)).where(condition)
+        )).one()
+        pagination.set_total_headers(response, total_count=count, total_amount=total, unconverted_count=unconverted)
+    return await pagination.paginate(
+        db, select(models.Expense).where(condition), [models.Expense.date, models.Expense.id], page, response,
     )
-    return result.scalars().all()
 
 @router.get("/{expense_date}", response_model=List[schemas.Expense])
 async def get_expenses(
@@ -49,16 +57,42 @@ async def create_expense(
     current_user: Annotated[schemas.User, Depends(get_current_user)] = None
 ):
     db_expense = models.Expense(
-        **expense_in.model_dump(),
-        user_id=current_user.id
+        **expense_in.model_dump(exclude={"currency"}),
+        currency=expense_in.currency or current_user.base_currency,
+        user_id=current_user.id,
+        content_hash=await expense_import.next_content_hash(
+            db, current_user.id, expense_in.date, expense_in.amount, expense_in.description,
+        ),
     )
     db.add(db_expense)
-    await db.commit()
-    await db.refresh(db_expense)
+    await rollups.refresh_expenses(db, current_user.id, [(expense_in.date, expense_in.category)])
     await db.commit()
     await db.refresh(db_expense)
     return db_expense
 
+@router.post("/import", response_model=schemas.ExpenseImportResult)
+async def import_expenses(
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "ofx", "qif"]] = None,
+    default_category: str = "Imported",
+    date_format: Optional[str] = None,
+    db: AsyncSession = Depends(database.get_db),
+    current_user: Annotated[schemas.User, Depends(get_current_user)] = None
+):
+    file_format = format or expense_import.detect_format(file.filename)
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        summary = await expense_import.import_expenses(
+            db, current_user.id, stream, file_format,
+            default_category=default_category, date_format=date_format, currency=current_user.base_currency,
+        )
+    except expense_import.ImportRowError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        stream.detach()
+    await db.commit()
+    return summary
+
 @router.put("/{expense_id}", response_model=schemas.Expense)
 async def update_expense(
     expense_id: str,
@@ -82,10 +116,17 @@ async def update_expense(
     if not db_expense:
         raise HTTPException(status_code=404, detail="Expense not found")
 
+    previous = (db_expense.date, db_expense.category)
     update_data = expense_update.model_dump(exclude_unset=True)
+    if update_data.get("currency", "") is None:
+        del update_data["currency"]
     for key, value in update_data.items():
         setattr(db_expense, key, value)
+    db_expense.content_hash = await expense_import.next_content_hash(
+        db, current_user.id, db_expense.date, db_expense.amount, db_expense.description, exclude_id=db_expense.id,
+    )
 
+    await rollups.refresh_expenses(db, current_user.id, [previous, (db_expense.date, db_expense.category)])
     await db.commit()
     await db.refresh(db_expense)
     return db_expense
@@ -112,6 +153,7 @@ async def delete_expense(
         raise HTTPException(status_code=404, detail="Expense not found")
     
     await db.delete(db_expense)
+    await rollups.refresh_expenses(db, current_user.id, [(db_expense.date, db_expense.category)])
     await db.commit()
     return None
 
@@ -119,27 +161,21 @@ async def delete_expense(
 async def get_expenses_summary(
     start_date: date,
     end_date: date,
-    db: AsyncSession = Depends(database.get_db),
+    response: Response,
+    db: AsyncSession = Depends(database.get_read_db),
     current_user: Annotated[schemas.User, Depends(get_current_user)] = None
 ):
-    stmt = select(
-        models.Expense.category,
-        func.sum(models.Expense.amount).label("total")
-    ).where(
-        and_(
-            models.Expense.user_id == current_user.id,
-            models.Expense.date >= start_date,
-            models.Expense.date <= end_date
-        )
-    ).group_by(models.Expense.category)
-    
-    result = await db.execute(stmt)
-    summary = {row[0]: row[1] or 0.0 for row in result.all()}
+    # Whole months come from the monthly rollup; only partial edge months read raw expenses.
+    # Totals are in the user's base currency; expenses without a rate are left out and counted.
+    result = await db.execute(rollups.spend_by_category(current_user.id, current_user.base_currency, start_date, end_date))
+    rows = result.all()
+    pagination.set_total_headers(response, unconverted_count=sum(row[2] or 0 for row in rows))
+    summary = {row[0]: row[1] or 0.0 for row in rows}
     return summary
 
 @router.get("/categories/all", response_model=List[str])
 async def get_all_categories(
-    db: AsyncSession = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_read_db),
     current_user: Annotated[schemas.User, Depends(get_current_user)] = None
 ):
     # Get categories from Expenses
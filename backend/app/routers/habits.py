@@ -1,13 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import os
+import base64
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
-from typing import List, Annotated
-from datetime import date
-from .. import models, schemas, database
+from sqlalchemy import select, and_, func, case, union
+from typing import List, Optional, Annotated
+from datetime import date, datetime
+from .. import models, schemas, database, pagination, upsert, rollups, habit_stats, habit_bitmaps, http_cache
 from ..auth import get_current_user
 
 router = APIRouter(prefix="/habits", tags=["habits"])
 
+# Widest range /habits/heatmap packs in one response
+HABIT_HEATMAP_MAX_DAYS = int(os.getenv("HABIT_HEATMAP_MAX_DAYS", "1830"))
+
 @router.get("/", response_model=List[schemas.Habit])
 async def get_habits(
     db: AsyncSession = Depends(database.get_db),
@@ -29,10 +34,66 @@ async def create_habit(
         user_id=current_user.id
     )
     db.add(db_habit)
+    # A new habit counts towards habits_total from today on
+    await rollups.refresh(db, rollups.existing_days(
+        models.DailyRollup.user_id == current_user.id, models.DailyRollup.date >= datetime.utcnow().date()
+    ))
     await db.commit()
     await db.refresh(db_habit)
     return db_habit
 
+@router.get("/stats", response_model=List[schemas.HabitStats])
+async def get_habit_stats(
+    today: Optional[date] = None,
+    db: AsyncSession = Depends(database.get_read_db),
+    current_user: Annotated[schemas.User, Depends(get_current_user)] = None
+):
+    """Streaks and 7/30/90-day completion rates per habit, read from the habit rows alone."""
+    today = today or date.today()
+    habits = (await db.scalars(
+        select(models.Habit).where(models.Habit.user_id == current_user.id).order_by(models.Habit.created_at)
+    )).all()
+    return [habit_stats.stats(habit, today) for habit in habits]
+
+@router.get("/heatmap", response_model=schemas.HabitHeatmap)
+async def get_habit_heatmap(
+    request: Request,
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    db: AsyncSession = Depends(database.get_read_db),
+    current_user: Annotated[schemas.User, Depends(get_current_user)] = None
+):
+    """
+    Completion history as one base64 bitstring per habit, bit i (LSB first) being
+    start_date + i, cut from the per-year bitmaps. Habits with no completions are omitted.
+    """
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+    if (end_date - start_date).days >= HABIT_HEATMAP_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {HABIT_HEATMAP_MAX_DAYS} days")
+
+    result = await db.execute(
+        select(models.HabitBitmap.habit_id, models.HabitBitmap.year, models.HabitBitmap.bits).where(
+            models.HabitBitmap.user_id == current_user.id,
+            models.HabitBitmap.year >= start_date.year,
+            models.HabitBitmap.year <= end_date.year,
+        )
+    )
+    years = {}
+    for habit_id, year, bits in result:
+        years.setdefault(habit_id, {})[year] = bits
+
+    payload = schemas.HabitHeatmap(
+        start_date=start_date,
+        end_date=end_date,
+        days=(end_date - start_date).days + 1,
+        habits={
+            habit_id: base64.b64encode(habit_bitmaps.pack_range(habit_years, start_date, end_date)).decode()
+            for habit_id, habit_years in years.items()
+        },
+    )
+    return http_cache.etag_response(request, payload.model_dump_json().encode())
+
 @router.get("/logs/{log_date}", response_model=List[schemas.HabitLog])
 async def get_habit_logs(
     log_date: date,
@@ -51,21 +112,26 @@ async def get_habit_logs(
 
 @router.get("/logs/stats/range", response_model=List[schemas.HabitLog])
 async def get_habit_logs_range(
+    response: Response,
     start_date: date = Query(...),
     end_date: date = Query(...),
-    db: AsyncSession = Depends(database.get_db),
+    page: pagination.PageParams = Depends(),
+    db: AsyncSession = Depends(database.get_read_db),
     current_user: Annotated[schemas.User, Depends(get_current_user)] = None
 ):
-    result = await db.execute(
-        select(models.HabitLog).where(
-            and_(
-                models.HabitLog.user_id == current_user.id,
-                models.HabitLog.date >= start_date,
-                models.HabitLog.date <= end_date
-            )
-        )
+    condition = and_(
+        models.HabitLog.user_id == current_user.id,
+        models.HabitLog.date >= start_date,
+        models.HabitLog.date <= end_date
+    )
+    if page.first_page:
+        count, completed = (await db.execute(
+            select(func.count(), func.sum(case((models.HabitLog.completed, 1), else_=0))).where(condition)
+        )).one()
+        pagination.set_total_headers(response, total_count=count, completed_count=completed)
+    return await pagination.paginate(
+        db, select(models.HabitLog).where(condition), [models.HabitLog.date, models.HabitLog.id], page, response,
     )
-    return result.scalars().all()
 
 @router.post("/logs", response_model=schemas.HabitLog)
 async def toggle_habit_log(
@@ -73,37 +139,30 @@ async def toggle_habit_log(
     db: AsyncSession = Depends(database.get_db),
     current_user: Annotated[schemas.User, Depends(get_current_user)] = None
 ):
-    # Verify the habit belongs to the user
-    habit_result = await db.execute(
-        select(models.Habit).where(
-            and_(models.Habit.id == log_in.habit_id, models.Habit.user_id == current_user.id)
-        )
-    )
-    if not habit_result.scalar_one_or_none():
+    # The habit row carries the streak state, so lock it against concurrent toggles; its
+    # bitmap for the year comes along in the same round trip
+    row = (await db.execute(
+        select(models.Habit, models.HabitBitmap)
+        .outerjoin(models.HabitBitmap, and_(
+            models.HabitBitmap.habit_id == models.Habit.id, models.HabitBitmap.year == log_in.date.year
+        ))
+        .where(models.Habit.id == log_in.habit_id, models.Habit.user_id == current_user.id)
+        .with_for_update(of=models.Habit)
+    )).one_or_none()
+    if row is None:
         raise HTTPException(status_code=404, detail="Habit not found")
+    db_habit, db_bitmap = row
 
-    # Upsert logic for the ledger
-    stmt = select(models.HabitLog).where(
-        and_(
-            models.HabitLog.user_id == current_user.id,
-            models.HabitLog.habit_id == log_in.habit_id,
-            models.HabitLog.date == log_in.date
-        )
+    db_log = await upsert.upsert(
+        db, models.HabitLog,
+        {**log_in.model_dump(), "user_id": current_user.id},
+        conflict=["user_id", "habit_id", "date"],
+        update=["completed"],
     )
-    result = await db.execute(stmt)
-    db_log = result.scalar_one_or_none()
-
-    if db_log:
-        db_log.completed = log_in.completed
-    else:
-        db_log = models.HabitLog(
-            **log_in.model_dump(),
-            user_id=current_user.id
-        )
-        db.add(db_log)
-    
+    habit_bitmaps.set_day(db, db_habit, db_bitmap, log_in.date, log_in.completed)
+    await habit_stats.apply_toggle(db, db_habit, log_in.date, log_in.completed)
+    await rollups.refresh_days(db, current_user.id, [log_in.date])
     await db.commit()
-    await db.refresh(db_log)
     return db_log
 
 @router.delete("/{habit_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -124,6 +183,13 @@ async def delete_habit(
     if not db_habit:
         raise HTTPException(status_code=404, detail="Habit not found")
 
+    # Its logs go with it, and habits_total drops on every day since it was created
+    logs, rollup = models.HabitLog, models.DailyRollup
+    days = (await db.scalars(union(
+        select(logs.date).where(logs.habit_id == uid),
+        select(rollup.date).where(rollup.user_id == current_user.id, rollup.date >= db_habit.created_at.date()),
+    ))).all()
     await db.delete(db_habit)
+    await rollups.refresh_days(db, current_user.id, days)
     await db.commit()
     return None
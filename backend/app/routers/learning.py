@@ -1,33 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, func
 from typing import List, Annotated
 from datetime import date
-from .. import models, schemas, database
+from .. import models, schemas, database, pagination, rollups
 from ..auth import get_current_user
 
 router = APIRouter(prefix="/learning", tags=["learning"])
 
-@router.get("/{session_date}", response_model=List[schemas.LearningSession])
-async def get_learning_sessions(
-    session_date: date,
-    db: AsyncSession = Depends(database.get_db),
-    current_user: Annotated[schemas.User, Depends(get_current_user)] = None
-):
-    result = await db.execute(
-        select(models.LearningSession).where(
-            and_(
-                models.LearningSession.user_id == current_user.id,
-                models.LearningSession.date == session_date
-            )
-        )
-    )
-    return result.scalars().all()
-
+# Registered before /{session_date}, which would otherwise capture "range" and fail date parsing
 @router.get("/range", response_model=List[schemas.LearningSession])
 async def get_learning_sessions_range(
+    response: Response,
     start_date: date = Query(...),
     end_date: date = Query(...),
+    page: pagination.PageParams = Depends(),
+    db: AsyncSession = Depends(database.get_read_db),
+    current_user: Annotated[schemas.User, Depends(get_current_user)] = None
+):
+    condition = and_(
+        models.LearningSession.user_id == current_user.id,
+        models.LearningSession.date >= start_date,
+        models.LearningSession.date <= end_date
+    )
+    if page.first_page:
+        count, minutes = (await db.execute(
+            select(func.count(), func.sum(models.LearningSession.duration_minutes)).where(condition)
+        )).one()
+        pagination.set_total_headers(response, total_count=count, total_minutes=minutes)
+    return await pagination.paginate(
+        db, select(models.LearningSession).where(condition),
+        [models.LearningSession.date, models.LearningSession.id], page, response,
+    )
+
+@router.get("/{session_date}", response_model=List[schemas.LearningSession])
+async def get_learning_sessions(
+    session_date: date,
     db: AsyncSession = Depends(database.get_db),
     current_user: Annotated[schemas.User, Depends(get_current_user)] = None
 ):
@@ -35,8 +43,7 @@ async def get_learning_sessions_range(
         select(models.LearningSession).where(
             and_(
                 models.LearningSession.user_id == current_user.id,
-                models.LearningSession.date >= start_date,
-                models.LearningSession.date <= end_date
+                models.LearningSession.date == session_date
             )
         )
     )
@@ -53,6 +60,7 @@ async def create_learning_session(
         user_id=current_user.id
     )
     db.add(db_session)
+    await rollups.refresh_days(db, current_user.id, [session_in.date])
     await db.commit()
     await db.refresh(db_session)
     return db_session
@@ -76,5 +84,6 @@ async def delete_learning_session(
         raise HTTPException(status_code=404, detail="Session not found")
 
     await db.delete(db_session)
+    await rollups.refresh_days(db, current_user.id, [db_session.date])
     await db.commit()
     return None
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
+from sqlalchemy.orm.attributes import set_committed_value
 from typing import List, Optional, Annotated
 from datetime import date
-from .. import models, schemas, database
+from .. import models, schemas, database, upsert
 from ..auth import get_current_user
 
 router = APIRouter(prefix="/projects", tags=["projects"])
@@ -42,8 +43,8 @@ async def create_project(
     db.add(db_project)
     await db.commit()
     await db.refresh(db_project)
-    # Explicitly set empty list to avoid async lazy load error in Pydantic
-    db_project.todos = []
+    # A new project has no todos; mark the collection loaded so serialization never lazy loads
+    set_committed_value(db_project, "todos", [])
     return db_project
 
 @router.get("/focus/{focus_date}", response_model=Optional[schemas.ProjectFocus])
@@ -86,36 +87,17 @@ async def set_project_focus(
     db: AsyncSession = Depends(database.get_db),
     current_user: Annotated[schemas.User, Depends(get_current_user)] = None
 ):
-    # Verify the project belongs to the user
-    project_result = await db.execute(
-        select(models.Project).where(
-            and_(models.Project.id == focus_in.project_id, models.Project.user_id == current_user.id)
-        )
+    # Upsert into the ledger, guarded on the project belonging to the user
+    db_focus = await upsert.upsert(
+        db, models.ProjectFocus,
+        {**focus_in.model_dump(), "user_id": current_user.id},
+        conflict=["user_id", "date"],
+        update=["project_id"],
+        guard=and_(models.Project.id == focus_in.project_id, models.Project.user_id == current_user.id),
     )
-    if not project_result.scalar_one_or_none():
+    if db_focus is None:
         raise HTTPException(status_code=404, detail="Project not found")
-
-    # Upsert logic for the ledger
-    stmt = select(models.ProjectFocus).where(
-        and_(
-            models.ProjectFocus.user_id == current_user.id,
-            models.ProjectFocus.date == focus_in.date
-        )
-    )
-    result = await db.execute(stmt)
-    db_focus = result.scalar_one_or_none()
-
-    if db_focus:
-        db_focus.project_id = focus_in.project_id
-    else:
-        db_focus = models.ProjectFocus(
-            **focus_in.model_dump(),
-            user_id=current_user.id
-        )
-        db.add(db_focus)
-    
     await db.commit()
-    await db.refresh(db_focus)
     return db_focus
 @router.put("/{project_id}", response_model=schemas.Project)
 async def update_project(
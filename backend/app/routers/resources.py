@@ -1,27 +1,32 @@
 import uuid
 from typing import List, Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, and_
+from sqlalchemy import select, desc, and_, func
 from sqlalchemy.orm import selectinload
-from .. import models, schemas, database
+from .. import models, schemas, database, pagination
 from ..auth import get_current_user
 
 router = APIRouter(prefix="/resources", tags=["resources"])
 
 @router.get("/", response_model=List[schemas.Resource])
 async def get_resources(
+    response: Response,
+    page: pagination.PageParams = Depends(),
     db: AsyncSession = Depends(database.get_db),
     current_user: Annotated[schemas.User, Depends(get_current_user)] = None,
     status: str = None
 ):
-    query = select(models.Resource).where(models.Resource.user_id == current_user.id)
+    condition = models.Resource.user_id == current_user.id
     if status:
-        query = query.where(models.Resource.status == status)
-    
-    query = query.order_by(desc(models.Resource.updated_at))
-    result = await db.execute(query)
-    return result.scalars().all()
+        condition = and_(condition, models.Resource.status == status)
+
+    if page.first_page:
+        total = await db.scalar(select(func.count()).select_from(models.Resource).where(condition))
+        pagination.set_total_headers(response, total_count=total)
+    return await pagination.paginate(
+        db, select(models.Resource).where(condition), [models.Resource.updated_at, models.Resource.id], page, response,
+    )
 
 @router.post("/", response_model=schemas.Resource)
 async def create_resource(
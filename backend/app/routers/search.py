@@ -10,7 +10,7 @@ router = APIRouter(prefix="/search", tags=["search"])
 @router.get("/")
 async def search(
     q: str = Query(..., min_length=1),
-    db: AsyncSession = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_read_db),
     current_user: Annotated[schemas.User, Depends(get_current_user)] = None
 ):
     # Search Daily Notes
@@ -0,0 +1,62 @@
+import os
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import List, Optional, Annotated
+from datetime import date, timedelta
+from .. import models, schemas, database, http_cache, rollups
+from ..auth import get_current_user
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+# Widest range /stats/daily serves in one response
+STATS_DAILY_MAX_DAYS = int(os.getenv("STATS_DAILY_MAX_DAYS", "366"))
+
+_daily_rows = TypeAdapter(List[schemas.DailyRollup])
+
+@router.get("/daily", response_model=List[schemas.DailyRollup])
+async def get_daily_stats(
+    request: Request,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: AsyncSession = Depends(database.get_read_db),
+    current_user: Annotated[schemas.User, Depends(get_current_user)] = None
+):
+    """Per-day totals and life score from daily_rollups; days without activity are omitted."""
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=STATS_DAILY_MAX_DAYS - 1)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+    if (end_date - start_date).days >= STATS_DAILY_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {STATS_DAILY_MAX_DAYS} days")
+
+    # One range scan of the (user_id, date) primary key
+    result = await db.scalars(
+        select(models.DailyRollup)
+        .where(
+            models.DailyRollup.user_id == current_user.id,
+            models.DailyRollup.date >= start_date,
+            models.DailyRollup.date <= end_date,
+        )
+        .order_by(models.DailyRollup.date)
+    )
+    rows = [
+        schemas.DailyRollup(
+            date=row.date,
+            habits_completed=row.habits_completed,
+            habits_total=row.habits_total,
+            todos_done=row.todos_done,
+            todos_total=row.todos_total,
+            learning_minutes=row.learning_minutes,
+            workout_count=row.workout_count,
+            spend=row.spend,
+            spend_unconverted=row.spend_unconverted,
+            mood=row.mood,
+            life_score=rollups.life_score(
+                row.habits_completed, row.habits_total, row.todos_done, row.todos_total, row.learning_minutes
+            ),
+        )
+        for row in result
+    ]
+    return http_cache.etag_response(request, _daily_rows.dump_json(rows))
@@ -1,13 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, update
+from sqlalchemy import select, and_
 from typing import List, Annotated
 from datetime import date
-from .. import models, schemas, database
+from .. import models, schemas, database, rollover, rollups, upsert
 from ..auth import get_current_user
 
 router = APIRouter(prefix="/todos", tags=["todos"])
 
+async def _check_projects(db: AsyncSession, user_id, project_ids) -> None:
+    """404s unless every given project belongs to the user, so a todo can't be filed under someone else's."""
+    project_ids = {project_id for project_id in project_ids if project_id is not None}
+    if not project_ids:
+        return
+    owned = set((await db.scalars(
+        select(models.Project.id).where(models.Project.user_id == user_id, models.Project.id.in_(project_ids))
+    )).all())
+    missing = project_ids - owned
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Project not found: {', '.join(sorted(map(str, missing)))}")
+
 @router.get("/{todo_date}", response_model=List[schemas.Todo])
 async def get_todos(
     todo_date: date,
@@ -30,15 +42,84 @@ async def create_todo(
     db: AsyncSession = Depends(database.get_db),
     current_user: Annotated[schemas.User, Depends(get_current_user)] = None
 ):
+    await _check_projects(db, current_user.id, [todo_in.project_id])
     db_todo = models.Todo(
         **todo_in.model_dump(),
         user_id=current_user.id
     )
     db.add(db_todo)
+    await rollups.refresh_days(db, current_user.id, [todo_in.date])
     await db.commit()
     await db.refresh(db_todo)
     return db_todo
 
+@router.post("/batch", response_model=schemas.TodoBatchResult)
+async def batch_todos(
+    batch: schemas.TodoBatch,
+    db: AsyncSession = Depends(database.get_db),
+    current_user: Annotated[schemas.User, Depends(get_current_user)] = None
+):
+    """
+    Creates, updates, completions and deletes in one transaction: one multi-row INSERT, one
+    UPDATE per distinct patch and one DELETE, all with RETURNING where the dialect has it.
+    Any id that isn't one of the user's todos, or project_id that isn't one of their
+    projects, fails the whole batch with 404.
+    """
+    owned = models.Todo.user_id == current_user.id
+    await _check_projects(
+        db, current_user.id, [item.project_id for item in [*batch.create, *batch.update]],
+    )
+
+    # Identical patches share a statement, so "move all to tomorrow" is a single UPDATE
+    patches = {}
+    for item in batch.update:
+        values = item.model_dump(exclude_unset=True, exclude={"ids"})
+        if values:
+            patches.setdefault(tuple(sorted(values.items())), set()).update(item.ids)
+    if batch.complete:
+        patches.setdefault((("is_completed", True),), set()).update(batch.complete)
+
+    # Days the rollups need recomputing for; a moved todo also changes the day it left
+    touched = set()
+    moved_ids = set().union(*[ids for values, ids in patches.items() if "date" in dict(values)])
+    if moved_ids:
+        touched.update((await db.scalars(
+            select(models.Todo.date).where(owned, models.Todo.id.in_(moved_ids)).distinct()
+        )).all())
+
+    created = await upsert.insert_returning(
+        db, models.Todo, [{**item.model_dump(), "user_id": current_user.id} for item in batch.create],
+    )
+
+    updated = {}
+    for values, ids in patches.items():
+        rows = await upsert.update_returning(db, models.Todo, and_(owned, models.Todo.id.in_(ids)), dict(values))
+        missing = ids - {row.id for row in rows}
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Todo not found: {', '.join(sorted(map(str, missing)))}")
+        updated.update({row.id: row for row in rows})
+
+    deleted = []
+    if batch.delete:
+        ids = set(batch.delete)
+        rows = await upsert.delete_returning(
+            db, models.Todo, and_(owned, models.Todo.id.in_(ids)), models.Todo.id, models.Todo.date,
+        )
+        deleted = [todo_id for todo_id, _ in rows]
+        missing = ids - set(deleted)
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Todo not found: {', '.join(sorted(map(str, missing)))}")
+        touched.update(day for _, day in rows)
+
+    touched.update(row.date for row in [*created, *updated.values()])
+    await rollups.refresh_days(db, current_user.id, touched)
+    await db.commit()
+    return {
+        "created": created,
+        "updated": [row for todo_id, row in updated.items() if todo_id not in deleted],
+        "deleted": deleted,
+    }
+
 @router.patch("/{todo_id}", response_model=schemas.Todo)
 async def update_todo(
     todo_id: str,
@@ -58,10 +139,13 @@ async def update_todo(
     if not db_todo:
         raise HTTPException(status_code=404, detail="Todo not found")
 
+    previous_date = db_todo.date
     update_data = todo_update.model_dump(exclude_unset=True)
+    await _check_projects(db, current_user.id, [update_data.get("project_id")])
     for key, value in update_data.items():
         setattr(db_todo, key, value)
 
+    await rollups.refresh_days(db, current_user.id, [previous_date, db_todo.date])
     await db.commit()
     await db.refresh(db_todo)
     return db_todo
@@ -72,29 +156,11 @@ async def carry_over_todos(
     db: AsyncSession = Depends(database.get_db),
     current_user: Annotated[schemas.User, Depends(get_current_user)] = None
 ):
-    # Find all uncompleted todos before target_date
-    stmt = select(models.Todo).where(
-        and_(
-            models.Todo.user_id == current_user.id,
-            models.Todo.date < target_date,
-            models.Todo.is_completed == False
-        )
-    )
-    result = await db.execute(stmt)
-    pending_todos = result.scalars().all()
-
-    carried_todos = []
-    for todo in pending_todos:
-        # Update existing todo to mark it was carried over (optional, or just move it)
-        todo.is_carried_over = True
-        todo.date = target_date
-        carried_todos.append(todo)
-
+    # One UPDATE ... RETURNING regardless of how many todos piled up
+    carried_todos = await rollover.carry_over_for_user(db, current_user.id, target_date)
+    if carried_todos:
+        await rollups.refresh_after_carry_over(db, [current_user.id], target_date)
     await db.commit()
-    # Refreshing all might be expensive, but needed for return
-    for todo in carried_todos:
-        await db.refresh(todo)
-        
     return carried_todos
 
 @router.delete("/{todo_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -116,5 +182,6 @@ async def delete_todo(
         raise HTTPException(status_code=404, detail="Todo not found")
 
     await db.delete(db_todo)
+    await rollups.refresh_days(db, current_user.id, [db_todo.date])
     await db.commit()
     return None
@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from .. import models, schemas, database
-from ..auth import get_current_user
+from typing import Literal
+from datetime import datetime
+from .. import models, schemas, database, data_export, rollups
+from ..auth import get_current_user, invalidate_principal
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -16,6 +19,11 @@ async def update_user_profile(
     db: AsyncSession = Depends(database.get_db),
     current_user: models.User = Depends(get_current_user)
 ):
+    # The principal may come from the auth cache (detached), so load the row in this session
+    current_user = await db.get(models.User, current_user.id)
+    if current_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
     if user_update.username is not None and user_update.username != current_user.username:
         # Check uniqueness
         result = await db.execute(select(models.User).where(models.User.username == user_update.username))
@@ -28,41 +36,28 @@ async def update_user_profile(
 
     if user_update.ai_personality is not None:
         current_user.ai_personality = user_update.ai_personality
-        
+
+    if user_update.base_currency is not None and user_update.base_currency != current_user.base_currency:
+        current_user.base_currency = user_update.base_currency
+        # Stored rollup totals are in the old currency
+        await db.flush()
+        await rollups.rebuild_users(db, [current_user.id])
+
     await db.commit()
+    invalidate_principal(current_user.id)
     await db.refresh(current_user)
     return current_user
 
 @router.get("/export_data")
 async def export_user_data(
-    db: AsyncSession = Depends(database.get_db),
+    format: Literal["ndjson", "csv"] = "ndjson",
+    db: AsyncSession = Depends(database.get_read_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    # Fetch all data related to user
-    # Habits
-    habits_res = await db.execute(select(models.Habit).where(models.Habit.user_id == current_user.id))
-    habits = habits_res.scalars().all()
-    
-    # Projects
-    projects_res = await db.execute(select(models.Project).where(models.Project.user_id == current_user.id))
-    projects = projects_res.scalars().all()
-    
-    # Expenses
-    expenses_res = await db.execute(select(models.Expense).where(models.Expense.user_id == current_user.id))
-    expenses = expenses_res.scalars().all()
-    
-    # Daily Notes
-    notes_res = await db.execute(select(models.DailyNote).where(models.DailyNote.user_id == current_user.id))
-    notes = notes_res.scalars().all()
-
-    return {
-        "user_info": {
-            "email": current_user.email,
-            "full_name": current_user.full_name,
-            "joined": current_user.created_at
-        },
-        "habits": habits,
-        "projects": projects,
-        "expenses": expenses,
-        "daily_notes": notes
-    }
+    # Streamed table by table; the session stays open until the last chunk is sent
+    stamp = datetime.utcnow().strftime("%Y-%m-%d")
+    if format == "csv":
+        body, media_type, filename = data_export.stream_csv_zip(db, current_user.id), "application/zip", f"atlas_export_{stamp}.zip"
+    else:
+        body, media_type, filename = data_export.stream_ndjson(db, current_user.id), "application/x-ndjson", f"atlas_export_{stamp}.ndjson"
+    return StreamingResponse(body, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
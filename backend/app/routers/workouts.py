@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, desc
+from sqlalchemy import select, and_, desc, func
 from sqlalchemy.orm import selectinload
 from typing import List, Annotated, Optional
 from datetime import date
-from .. import models, schemas, database
+from .. import models, schemas, database, pagination, rollups
 from ..auth import get_current_user
 
 router = APIRouter(prefix="/workouts", tags=["workouts"])
@@ -32,29 +32,29 @@ async def get_workouts(
 async def get_workouts_range(
     start_date: date,
     end_date: date,
-    db: AsyncSession = Depends(database.get_db),
+    response: Response,
+    page: pagination.PageParams = Depends(),
+    db: AsyncSession = Depends(database.get_read_db),
     current_user: Annotated[schemas.User, Depends(get_current_user)] = None
 ):
-    result = await db.execute(
-        select(models.Workout)
-        .options(selectinload(models.Workout.sets))
-        .where(
-            and_(
-                models.Workout.user_id == current_user.id,
-                models.Workout.date >= start_date,
-                models.Workout.date <= end_date
-            )
-        )
-        .order_by(models.Workout.date.desc(), models.Workout.created_at.desc())
+    condition = and_(
+        models.Workout.user_id == current_user.id,
+        models.Workout.date >= start_date,
+        models.Workout.date <= end_date
+    )
+    if page.first_page:
+        total = await db.scalar(select(func.count()).select_from(models.Workout).where(condition))
+        pagination.set_total_headers(response, total_count=total)
+    return await pagination.paginate(
+        db, select(models.Workout).options(selectinload(models.Workout.sets)).where(condition),
+        [models.Workout.date, models.Workout.created_at, models.Workout.id], page, response,
     )
-    return result.scalars().all()
 
 @router.get("/stats/heatmap")
 async def get_workout_heatmap(
-    db: AsyncSession = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_read_db),
     current_user: Annotated[schemas.User, Depends(get_current_user)] = None
 ):
-    from sqlalchemy import func
     # Count workouts per day
     result = await db.execute(
         select(models.Workout.date, func.count(models.Workout.id))
@@ -65,10 +65,9 @@ async def get_workout_heatmap(
 
 @router.get("/stats/prs")
 async def get_personal_records(
-    db: AsyncSession = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_read_db),
     current_user: Annotated[schemas.User, Depends(get_current_user)] = None
 ):
-    from sqlalchemy import func
     # Get max weight per exercise
     stmt = (
         select(
@@ -108,6 +107,7 @@ async def create_workout(
         )
         db.add(db_set)
     
+    await rollups.refresh_days(db, current_user.id, [workout_in.date])
     await db.commit()
     
     # Re-fetch with sets loaded to avoid ResponseValidationError
@@ -160,5 +160,6 @@ async def delete_workout(
         raise HTTPException(status_code=404, detail="Workout not found")
 
     await db.delete(db_workout)
+    await rollups.refresh_days(db, current_user.id, [db_workout.date])
     await db.commit()
     return None
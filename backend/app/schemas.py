@@ -1,7 +1,10 @@
 from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime, date
+import datetime as dt
 from uuid import UUID
-from typing import Optional, List
+from typing import Dict, Optional, List
+
+CURRENCY_PATTERN = r"^[A-Z]{3}$"  # ISO 4217 code
 
 # User Schemas
 class UserBase(BaseModel):
@@ -19,11 +22,13 @@ class UserUpdate(BaseModel):
     email: Optional[EmailStr] = None
     password: Optional[str] = None
     ai_personality: Optional[str] = None
+    base_currency: Optional[str] = Field(None, pattern=CURRENCY_PATTERN)
 
 class User(UserBase):
     id: UUID
     full_name: Optional[str] = None # Explicitly defined as per instruction
     ai_personality: Optional[str] = None # Default from DB is SERIOUS
+    base_currency: str = "NGN"
     created_at: datetime
 
     class Config:
@@ -144,22 +149,34 @@ class ExpenseBase(BaseModel):
     description: str
 
 class ExpenseCreate(ExpenseBase):
-    pass
+    currency: Optional[str] = Field(None, pattern=CURRENCY_PATTERN)  # defaults to the user's base currency
 
+# A field named `date` shadows the type inside the class body, hence dt.date
 class ExpenseUpdate(BaseModel):
-    date: Optional[date] = None
+    date: Optional[dt.date] = None
     amount: Optional[float] = None
     category: Optional[str] = None
     description: Optional[str] = None
+    currency: Optional[str] = Field(None, pattern=CURRENCY_PATTERN)
 
 class Expense(ExpenseBase):
     id: UUID
     user_id: UUID
+    currency: str = "NGN"
     created_at: datetime
 
     class Config:
         from_attributes = True
 
+class ExpenseImportResult(BaseModel):
+    format: str
+    parsed: int
+    inserted: int
+    duplicates: int
+    skipped: int  # credits / deposits, which aren't expenses
+    invalid: int
+    errors: List[str] = []
+
 # Account Schemas
 class AccountBase(BaseModel):
     name: str = Field(..., max_length=100)
@@ -244,6 +261,20 @@ class Budget(BudgetBase):
     class Config:
         from_attributes = True
 
+class BudgetStatus(BaseModel):
+    budget_id: UUID
+    category: str
+    period: str
+    amount: float
+    period_start: date
+    period_end: date
+    spent: float
+    remaining: float
+    burn_rate: float  # average spend per elapsed day of the period
+    projected_spend: float
+    projected_overspend_on: Optional[date] = None  # None when the current pace stays within budget
+    unconverted_count: int = 0  # expenses left out of spent for lack of an exchange rate
+
 # Todo Schemas
 class TodoBase(BaseModel):
     content: str
@@ -260,7 +291,7 @@ class TodoUpdate(BaseModel):
     priority: Optional[str] = None
     is_completed: Optional[bool] = None
     is_carried_over: Optional[bool] = None
-    date: Optional[date] = None
+    date: Optional[dt.date] = None
     project_id: Optional[UUID] = None
 
 class Todo(TodoBase):
@@ -272,6 +303,26 @@ class Todo(TodoBase):
     class Config:
         from_attributes = True
 
+TODO_BATCH_MAX = 500
+
+class TodoBatchCreate(TodoCreate):
+    is_carried_over: bool = False
+
+class TodoBatchUpdate(TodoUpdate):
+    # One patch applied to every listed todo, e.g. "move all to tomorrow"
+    ids: List[UUID] = Field(..., min_length=1, max_length=TODO_BATCH_MAX)
+
+class TodoBatch(BaseModel):
+    create: List[TodoBatchCreate] = Field(default=[], max_length=TODO_BATCH_MAX)
+    update: List[TodoBatchUpdate] = Field(default=[], max_length=TODO_BATCH_MAX)
+    complete: List[UUID] = Field(default=[], max_length=TODO_BATCH_MAX)
+    delete: List[UUID] = Field(default=[], max_length=TODO_BATCH_MAX)
+
+class TodoBatchResult(BaseModel):
+    created: List[Todo]
+    updated: List[Todo]
+    deleted: List[UUID]
+
 # Learning Schemas
 class LearningSessionBase(BaseModel):
     date: date
@@ -400,3 +451,53 @@ class VisionItem(VisionItemBase):
 
     class Config:
         from_attributes = True
+
+# Dashboard Schemas
+class LifeScore(BaseModel):
+    score: int
+    grade: str
+    habits: float
+    todos: float
+    focus: float
+
+class Dashboard(BaseModel):
+    date: date
+    habits: List[Habit]
+    habit_logs: List[HabitLog]
+    projects: List[Project]
+    focus: Optional[ProjectFocus] = None
+    note: Optional[DailyNote] = None
+    todos: List[Todo]
+    learning_sessions: List[LearningSession]
+    life_score: LifeScore
+
+# Daily Rollup Schemas
+class DailyRollup(BaseModel):
+    date: date
+    habits_completed: int
+    habits_total: int
+    todos_done: int
+    todos_total: int
+    learning_minutes: int
+    workout_count: int
+    spend: float
+    spend_unconverted: int = 0  # expenses left out of spend for lack of an exchange rate
+    mood: Optional[str] = None
+    life_score: LifeScore
+
+# Habit Stats Schemas
+class HabitStats(BaseModel):
+    habit_id: UUID
+    name: str
+    current_streak: int
+    longest_streak: int
+    last_completed_on: Optional[date] = None
+    completion_7d: float
+    completion_30d: float
+    completion_90d: float
+
+class HabitHeatmap(BaseModel):
+    start_date: date
+    end_date: date
+    days: int
+    habits: Dict[UUID, str]  # base64; bit i (LSB first) = start_date + i
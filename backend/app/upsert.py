@@ -0,0 +1,84 @@
+from typing import List, Optional, Sequence
+from sqlalchemy import select, literal, insert, update, delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import database
+
+def dialect_insert(model):
+    return (postgresql if database.DRIVE_TYPE == "POSTGRESQL" else sqlite).insert(model)
+
+async def upsert(
+    db: AsyncSession,
+    model,
+    values: dict,
+    conflict: Sequence[str],
+    update: Sequence[str],
+    guard=None,
+):
+    """
+    INSERT ... ON CONFLICT (conflict) DO UPDATE SET update ... RETURNING, as one statement on
+    both Postgres and SQLite, so concurrent writers can't race into the unique constraint.
+
+    `guard` is an optional WHERE over another table (e.g. "this habit belongs to the user"):
+    the row is inserted from a SELECT filtered by it, and None is returned when it doesn't
+    match, which saves the separate ownership lookup.
+    """
+    table = model.__table__
+    if guard is None:
+        stmt = dialect_insert(model).values(values)
+    else:
+        source = select(*[literal(value, table.c[name].type) for name, value in values.items()]).where(guard)
+        stmt = dialect_insert(model).from_select(list(values), source)
+
+    set_ = {name: stmt.excluded[name] for name in update}
+    # ON CONFLICT bypasses the ORM, so apply Python-side onupdate values (updated_at) here
+    for column in table.columns:
+        if column.onupdate is not None and column.onupdate.is_callable and column.name not in set_:
+            set_[column.name] = column.onupdate.arg(None)
+
+    stmt = stmt.on_conflict_do_update(index_elements=list(conflict), set_=set_).returning(model)
+    result = await db.scalars(stmt, execution_options={"populate_existing": True})
+    return result.one_or_none()
+
+# SQLite before 3.35 (and some other dialects) has no RETURNING; these fall back to extra
+# statements there, and are a single statement everywhere else. The caller commits.
+
+async def insert_returning(db: AsyncSession, model, rows: List[dict]) -> list:
+    """Multi-row INSERT ... RETURNING, objects in the order of `rows`."""
+    if not rows:
+        return []
+    if database.engine.dialect.insert_executemany_returning_sort_by_parameter_order:
+        return list((await db.scalars(insert(model).returning(model, sort_by_parameter_order=True), rows)).all())
+    objects = [model(**row) for row in rows]
+    db.add_all(objects)
+    await db.flush()
+    return objects
+
+async def update_returning(db: AsyncSession, model, condition, values: dict) -> list:
+    """UPDATE ... WHERE condition ... RETURNING the updated objects."""
+    if database.engine.dialect.update_returning:
+        return list((await db.scalars(update(model).where(condition).values(values).returning(model))).all())
+
+    # Pick the ids, update them, read them back
+    ids = list((await db.scalars(select(model.id).where(condition))).all())
+    if not ids:
+        return []
+    await db.execute(
+        update(model).where(model.id.in_(ids)).values(values),
+        execution_options={"synchronize_session": False},
+    )
+    result = await db.execute(select(model).where(model.id.in_(ids)).execution_options(populate_existing=True))
+    return list(result.scalars().all())
+
+async def delete_returning(db: AsyncSession, model, condition, *columns) -> list:
+    """DELETE ... WHERE condition ... RETURNING `columns` of the deleted rows."""
+    if database.engine.dialect.delete_returning:
+        return list((await db.execute(delete(model).where(condition).returning(*columns))).all())
+
+    rows = list((await db.execute(select(*columns, model.id.label("_deleted_id")).where(condition))).all())
+    if rows:
+        await db.execute(
+            delete(model).where(model.id.in_([row[-1] for row in rows])),
+            execution_options={"synchronize_session": False},
+        )
+    return [tuple(row[:-1]) for row in rows]
@@ -0,0 +1,251 @@
+import asyncio
+from typing import List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import TextClause
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+class SerializedWriter:
+    """
+    Funnels write sessions through one SQLite connection and commits them in groups.
+
+    A request holds the writer from its first write until it commits (see
+    SerializedWriteSession). Its session works inside a SAVEPOINT of the writer's open
+    transaction, so session.commit() only releases the savepoint, hands the writer to the
+    next request and waits until the group is made durable by a single COMMIT (one fsync
+    for many small transactions).
+    """
+
+    def __init__(self, engine: AsyncEngine, queue_max: int, queue_timeout: float, group_max: int, window_ms: float):
+        self.engine = engine
+        self.queue_max = queue_max
+        self.queue_timeout = queue_timeout
+        self.group_max = group_max
+        self.window = window_ms / 1000
+        self._lock = asyncio.Lock()
+        self._conn: Optional[AsyncConnection] = None
+        self._waiting = 0
+        self._group: List[asyncio.Future] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self.stats = {"commits": 0, "grouped_transactions": 0, "largest_group": 0, "rejected": 0, "failed_commits": 0}
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "waiting": self._waiting,
+            "pending_group": len(self._group),
+            "avg_group": round(self.stats["grouped_transactions"] / self.stats["commits"], 2) if self.stats["commits"] else 0,
+        }
+
+    def _busy(self) -> HTTPException:
+        self.stats["rejected"] += 1
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many pending writes, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    async def acquire(self) -> AsyncConnection:
+        if self._lock.locked() and self._waiting >= self.queue_max:
+            raise self._busy()
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._lock.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise self._busy()
+        finally:
+            self._waiting -= 1
+        return await self._begin()
+
+    async def reacquire(self) -> AsyncConnection:
+        # For a session that already committed: skips the queue limit, since the request has
+        # done durable work and must not turn into a 503 halfway
+        await self._lock.acquire()
+        return await self._begin()
+
+    async def _begin(self) -> AsyncConnection:
+        try:
+            if self._conn is None:
+                self._conn = await self.engine.connect()
+            if not self._conn.in_transaction():
+                await self._conn.begin()
+        except Exception:
+            self._lock.release()
+            raise
+        return self._conn
+
+    async def release(self) -> None:
+        try:
+            if self._group and (self._waiting == 0 or len(self._group) >= self.group_max):
+                await self._flush()
+            elif self._group:
+                # Others are queued: let them join this group, but never wait longer than the window
+                if self._flush_task is None or self._flush_task.done():
+                    self._flush_task = asyncio.create_task(self._flush_later())
+            elif self._conn is not None and self._conn.in_transaction():
+                # Nothing released into this transaction, so drop it and the write lock with it
+                await self._conn.rollback()
+        finally:
+            self._lock.release()
+
+    async def wait_for_group_commit(self) -> None:
+        fut = asyncio.get_running_loop().create_future()
+        self._group.append(fut)
+        await self.release()
+        await fut
+
+    async def close(self) -> None:
+        async with self._lock:
+            if self._group:
+                await self._flush()
+            if self._conn is not None:
+                await self._conn.close()
+                self._conn = None
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.window)
+        async with self._lock:
+            if self._group:
+                await self._flush()
+
+    async def _flush(self) -> None:
+        group, self._group = self._group, []
+        try:
+            await self._conn.commit()
+        except Exception as e:
+            self.stats["failed_commits"] += 1
+            print(f"❌ Group commit of {len(group)} transactions failed: {e}")
+            try:
+                await self._conn.rollback()
+            except Exception:
+                await self._conn.invalidate()
+                self._conn = None
+            for fut in group:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+
+        self.stats["commits"] += 1
+        self.stats["grouped_transactions"] += len(group)
+        self.stats["largest_group"] = max(self.stats["largest_group"], len(group))
+        for fut in group:
+            if not fut.done():
+                fut.set_result(None)
+
+def _needs_writer(statement) -> bool:
+    # Raw SQL is assumed to write; the read pool is query_only, so a wrong guess the other way would fail
+    if isinstance(statement, TextClause):
+        return True
+    return bool(getattr(statement, "is_dml", False)) or getattr(statement, "_for_update_arg", None) is not None
+
+class _WriterRoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, **kw):
+        conn = self.info["writer_connection"]
+        return conn.sync_connection if conn is not None else self.info["read_bind"]
+
+class SerializedWriteSession(AsyncSession):
+    """
+    Session for write requests that takes the shared writer only once it needs it: on a flush,
+    an INSERT/UPDATE/DELETE or raw statement, or a SELECT ... FOR UPDATE. Plain reads before
+    that run on the read pool, so a handler that hashes a password or calls out to another
+    service first doesn't hold up every other writer meanwhile. Row locks take the writer so
+    read-modify-write paths stay serialized. commit() hands the writer back and returns once
+    the group is durable; later statements take it again.
+    """
+
+    def __init__(self, writer: SerializedWriter, read_engine: AsyncEngine):
+        super().__init__(
+            sync_session_class=_WriterRoutingSession,
+            join_transaction_mode="create_savepoint",
+            expire_on_commit=False,
+        )
+        self.writer = writer
+        self.info["read_bind"] = read_engine.sync_engine
+        self.info["writer_connection"] = None
+        self._committed = False
+
+    @property
+    def holds_writer(self) -> bool:
+        return self.info["writer_connection"] is not None
+
+    def _pending(self) -> bool:
+        sync = self.sync_session
+        return bool(sync.new or sync.dirty or sync.deleted)
+
+    async def _take_writer(self, needed: bool = True) -> None:
+        if self.holds_writer or not (needed or self._pending()):
+            return
+        self.info["writer_connection"] = await (self.writer.reacquire() if self._committed else self.writer.acquire())
+
+    async def _hand_back_writer(self) -> None:
+        if self.holds_writer:
+            self.info["writer_connection"] = None
+            await self.writer.release()
+
+    async def execute(self, statement, *args, **kwargs):
+        await self._take_writer(_needs_writer(statement))
+        return await super().execute(statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        await self._take_writer(_needs_writer(statement))
+        return await super().scalar(statement, *args, **kwargs)
+
+    async def scalars(self, statement, *args, **kwargs):
+        await self._take_writer(_needs_writer(statement))
+        return await super().scalars(statement, *args, **kwargs)
+
+    async def stream(self, statement, *args, **kwargs):
+        await self._take_writer(_needs_writer(statement))
+        return await super().stream(statement, *args, **kwargs)
+
+    async def get(self, entity, ident, *args, with_for_update=None, **kwargs):
+        await self._take_writer(with_for_update is not None)
+        return await super().get(entity, ident, *args, with_for_update=with_for_update, **kwargs)
+
+    async def refresh(self, instance, attribute_names=None, with_for_update=None):
+        await self._take_writer(with_for_update is not None)
+        return await super().refresh(instance, attribute_names, with_for_update)
+
+    async def flush(self, objects=None) -> None:
+        await self._take_writer(False)
+        await super().flush(objects)
+
+    async def connection(self, *args, **kwargs):
+        await self._take_writer()
+        return await super().connection(*args, **kwargs)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        await self._take_writer()
+        return await super().run_sync(fn, *args, **kwargs)
+
+    async def commit(self) -> None:
+        await self._take_writer(False)
+        if not self.holds_writer:
+            # Nothing was written: this only ends the read transaction
+            await super().commit()
+            return
+        had_transaction = self.in_transaction()
+        try:
+            await super().commit()
+        except Exception:
+            await super().rollback()
+            await self._hand_back_writer()
+            raise
+        self.info["writer_connection"] = None
+        self._committed = True
+        if had_transaction:
+            await self.writer.wait_for_group_commit()
+        else:
+            await self.writer.release()
+
+    async def rollback(self) -> None:
+        try:
+            await super().rollback()
+        finally:
+            await self._hand_back_writer()
+
+    async def close(self) -> None:
+        try:
+            await super().close()
+        finally:
+            await self._hand_back_writer()
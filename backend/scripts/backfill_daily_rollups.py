@@ -0,0 +1,26 @@
+import sys
+import os
+import asyncio
+import argparse
+import time
+
+# Add the parent directory (backend) to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import rollups
+
+def main():
+    """
+    Rebuilds daily_rollups and the monthly expense_rollups for every user from the source
+    tables. Run it after the migrations that create them; it is safe to re-run if they drift.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-users", type=int, default=rollups.ROLLUP_BACKFILL_BATCH_USERS)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    written = asyncio.run(rollups.backfill(args.batch_users))
+    print(f"📊 Wrote {written} rollup rows in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import sys
+import os
+import asyncio
+import argparse
+import time
+
+# Add the parent directory (backend) to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import habit_bitmaps
+
+def main():
+    """
+    Rebuilds every habit's per-year completion bitmaps from habit_logs. Run it once after the
+    migration that creates the table; it is safe to re-run.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch", type=int, default=habit_bitmaps.HABIT_BITMAP_BACKFILL_BATCH)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    written = asyncio.run(habit_bitmaps.backfill(args.batch))
+    print(f"🧮 Wrote {written} habit-year bitmaps in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
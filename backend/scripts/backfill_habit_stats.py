@@ -0,0 +1,26 @@
+import sys
+import os
+import asyncio
+import argparse
+import time
+
+# Add the parent directory (backend) to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import habit_stats
+
+def main():
+    """
+    Recomputes every habit's streaks and recent-completion window from its logs. Run it once
+    after the migration that adds the columns; it is safe to re-run.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch", type=int, default=habit_stats.HABIT_STATS_BACKFILL_BATCH)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    done = asyncio.run(habit_stats.backfill(args.batch))
+    print(f"🔥 Recomputed streaks for {done} habits in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import sys
+import os
+import time
+import uuid
+import asyncio
+import argparse
+from datetime import date, timedelta
+
+# Add the parent directory (backend) to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, select, func
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from app import models, database
+
+async def build(path: str, tuned: bool):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    # The baseline mirrors the original engine: only check_same_thread, default journal and sync
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", connect_args={"check_same_thread": False})
+    if tuned:
+        event.listen(engine.sync_engine, "connect", lambda conn, record: database.apply_sqlite_pragmas(conn))
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    async with sessions() as db:
+        user = models.User(email=f"{uuid.uuid4().hex}@example.com", hashed_password="x")
+        db.add(user)
+        await db.commit()
+    return engine, sessions, user.id
+
+async def writer(sessions, user_id, count: int, stats: dict):
+    for i in range(count):
+        try:
+            async with sessions() as db:
+                # One commit per request, like the routers
+                db.add(models.Todo(
+                    user_id=user_id, content=f"todo {i}",
+                    date=date(2026, 1, 1) + timedelta(days=i % 365),
+                ))
+                await db.commit()
+            stats["writes"] += 1
+        except OperationalError as e:
+            stats["errors"] += 1
+            stats["last_error"] = str(e.orig)
+
+async def reader(sessions, user_id, stop: asyncio.Event, stats: dict):
+    i = 0
+    while not stop.is_set():
+        try:
+            async with sessions() as db:
+                await db.execute(
+                    select(func.count(models.Todo.id))
+                    .where(models.Todo.user_id == user_id, models.Todo.date == date(2026, 1, 1) + timedelta(days=i % 365))
+                )
+            stats["reads"] += 1
+        except OperationalError as e:
+            stats["errors"] += 1
+            stats["last_error"] = str(e.orig)
+        i += 1
+
+async def run(path: str, tuned: bool, writers: int, readers: int, writes: int) -> dict:
+    engine, sessions, user_id = await build(path, tuned)
+    stats = {"writes": 0, "reads": 0, "errors": 0, "last_error": None}
+    stop = asyncio.Event()
+    started = time.perf_counter()
+    reader_tasks = [asyncio.create_task(reader(sessions, user_id, stop, stats)) for _ in range(readers)]
+    await asyncio.gather(*(writer(sessions, user_id, writes, stats) for _ in range(writers)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await asyncio.gather(*reader_tasks)
+    await engine.dispose()
+    return {**stats, "elapsed": elapsed}
+
+def main():
+    """
+    Runs the same concurrent write/read workload against a scratch SQLite file twice:
+    once with the original connection settings and once with database.SQLITE_PRAGMAS,
+    and prints throughput and lock errors for each.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--path", default="./bench_sqlite.db")
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=250, help="Commits per writer")
+    args = parser.parse_args()
+
+    results = {}
+    for label, tuned in (("baseline", False), ("tuned", True)):
+        r = asyncio.run(run(args.path, tuned, args.writers, args.readers, args.writes))
+        results[label] = r
+        print(
+            f"{'⚙️ ' if tuned else '🐌'} {label:8} writes={r['writes']:>6} ({r['writes'] / r['elapsed']:8.0f}/s) "
+            f"reads={r['reads']:>7} ({r['reads'] / r['elapsed']:8.0f}/s) errors={r['errors']} in {r['elapsed']:.1f}s"
+        )
+        if r["last_error"]:
+            print(f"    last error: {r['last_error']}")
+
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(args.path + suffix):
+            os.remove(args.path + suffix)
+
+    base, tuned = results["baseline"], results["tuned"]
+    write_gain = (tuned["writes"] / tuned["elapsed"]) / max(base["writes"] / base["elapsed"], 1e-9)
+    read_gain = (tuned["reads"] / tuned["elapsed"]) / max(base["reads"] / base["elapsed"], 1e-9)
+    print(f"📈 Tuned vs baseline: writes x{write_gain:.1f}, reads x{read_gain:.1f}")
+
+if __name__ == "__main__":
+    main()
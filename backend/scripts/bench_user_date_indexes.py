@@ -0,0 +1,162 @@
+import sys
+import os
+import time
+import uuid
+import random
+import argparse
+from datetime import date, timedelta
+
+# Add the parent directory (backend) to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select, func, and_, text, Index
+from app import models
+
+TABLES = {
+    "todos": models.Todo,
+    "habit_logs": models.HabitLog,
+    "expenses": models.Expense,
+    "learning_sessions": models.LearningSession,
+    "workouts": models.Workout,
+    "daily_notes": models.DailyNote,
+}
+CATEGORIES = ["Food", "Transport", "Bills", "Fun", "Health", "Shopping"]
+
+def seed(engine, users: int, days: int, start: date):
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    with engine.begin() as conn:
+        conn.execute(insert(models.User.__table__), [
+            {"id": uid, "email": f"bench{i}@example.com", "hashed_password": "x", "created_at": start}
+            for i, uid in enumerate(user_ids)
+        ])
+        habits = {uid: [uuid.uuid4() for _ in range(3)] for uid in user_ids}
+        conn.execute(insert(models.Habit.__table__), [
+            {"id": hid, "user_id": uid, "name": f"Habit {n}", "created_at": start}
+            for uid, hids in habits.items() for n, hid in enumerate(hids)
+        ])
+
+        for uid in user_ids:
+            rows = {name: [] for name in TABLES}
+            for offset in range(days):
+                day = start + timedelta(days=offset)
+                rows["todos"] += [
+                    {"id": uuid.uuid4(), "user_id": uid, "date": day, "content": f"todo {n}",
+                     "priority": "medium", "is_completed": random.random() < 0.8, "is_carried_over": False, "created_at": day}
+                    for n in range(3)
+                ]
+                rows["habit_logs"] += [
+                    {"id": uuid.uuid4(), "user_id": uid, "habit_id": hid, "date": day, "completed": random.random() < 0.7}
+                    for hid in habits[uid]
+                ]
+                rows["expenses"] += [
+                    {"id": uuid.uuid4(), "user_id": uid, "date": day, "amount": round(random.uniform(100, 20000), 2),
+                     "category": random.choice(CATEGORIES), "description": "bench", "created_at": day}
+                    for _ in range(2)
+                ]
+                rows["daily_notes"].append({"id": uuid.uuid4(), "user_id": uid, "date": day, "content": "note", "created_at": day})
+                if offset % 2 == 0:
+                    rows["learning_sessions"].append({
+                        "id": uuid.uuid4(), "user_id": uid, "date": day, "subject": "Python",
+                        "duration_minutes": 30, "created_at": day,
+                    })
+                    rows["workouts"].append({"id": uuid.uuid4(), "user_id": uid, "date": day, "type": "Push", "created_at": day})
+            for name, model in TABLES.items():
+                conn.execute(insert(model.__table__), rows[name])
+    return user_ids
+
+def queries(user_id, day: date):
+    """The WHERE/ORDER BY shapes used by the per-day and range endpoints."""
+    month_ago, quarter_ago, year_ago = day - timedelta(days=30), day - timedelta(days=90), day - timedelta(days=365)
+    return {
+        "GET /todos/{date}": select(models.Todo).where(and_(models.Todo.user_id == user_id, models.Todo.date == day)),
+        "GET /habits/logs/{date}": select(models.HabitLog).where(and_(models.HabitLog.user_id == user_id, models.HabitLog.date == day)),
+        "GET /expenses/{date}": select(models.Expense).where(and_(models.Expense.user_id == user_id, models.Expense.date == day)),
+        "GET /workouts/{date}": select(models.Workout).where(and_(models.Workout.user_id == user_id, models.Workout.date == day)),
+        "GET /learning/{date}": select(models.LearningSession).where(
+            and_(models.LearningSession.user_id == user_id, models.LearningSession.date == day)),
+        "GET /daily-notes/{date}": select(models.DailyNote).where(and_(models.DailyNote.user_id == user_id, models.DailyNote.date == day)),
+        "GET /expenses/range (30d)": select(models.Expense).where(and_(
+            models.Expense.user_id == user_id, models.Expense.date >= month_ago, models.Expense.date <= day,
+        )).order_by(models.Expense.date.desc()),
+        "GET /expenses/stats/summary (1y)": select(models.Expense.category, func.sum(models.Expense.amount)).where(and_(
+            models.Expense.user_id == user_id, models.Expense.date >= year_ago, models.Expense.date <= day,
+        )).group_by(models.Expense.category),
+        "GET /habits/logs/stats/range (90d)": select(models.HabitLog).where(and_(
+            models.HabitLog.user_id == user_id, models.HabitLog.date >= quarter_ago, models.HabitLog.date <= day,
+        )),
+        "GET /workouts/stats/range (90d)": select(models.Workout).where(and_(
+            models.Workout.user_id == user_id, models.Workout.date >= quarter_ago, models.Workout.date <= day,
+        )).order_by(models.Workout.date.desc(), models.Workout.created_at.desc()),
+        "GET /learning/range (30d)": select(models.LearningSession).where(and_(
+            models.LearningSession.user_id == user_id, models.LearningSession.date >= month_ago,
+            models.LearningSession.date <= day,
+        )),
+    }
+
+def legacy_indexes():
+    # The single-column user_id/date indexes the models defined before the composite migration
+    return [
+        Index(f"ix_{name}_{column}", model.__table__.c[column])
+        for name, model in TABLES.items() for column in ("user_id", "date")
+    ]
+
+def composite_indexes():
+    return [
+        index for model in TABLES.values() for index in model.__table__.indexes
+        if index.name and index.name.endswith("_user_date")
+    ]
+
+def measure(engine, user_ids, days: int, start: date, iterations: int) -> dict:
+    rng = random.Random(42)
+    samples = [(rng.choice(user_ids), start + timedelta(days=rng.randrange(365, days))) for _ in range(iterations)]
+    timings = {}
+    with engine.connect() as conn:
+        for user_id, day in samples:
+            for label, stmt in queries(user_id, day).items():
+                started = time.perf_counter()
+                conn.execute(stmt).all()
+                timings[label] = timings.get(label, 0.0) + (time.perf_counter() - started)
+    return {label: total / iterations * 1000 for label, total in timings.items()}
+
+def main():
+    """
+    Seeds a multi-year dataset and times the per-day and range endpoint queries with the
+    old single-column user_id/date indexes and then with the composite (user_id, date) ones.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--url", default="sqlite:///./bench_indexes.db", help="Sync URL of a scratch database")
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    models.Base.metadata.drop_all(engine)
+    models.Base.metadata.create_all(engine)
+
+    days = 365 * args.years
+    start = date.today() - timedelta(days=days)
+    started = time.perf_counter()
+    user_ids = seed(engine, args.users, days, start)
+    print(f"🌱 Seeded {args.users} users x {days} days in {time.perf_counter() - started:.1f}s ({engine.dialect.name})")
+
+    results = {}
+    for label, drop, create in (
+        ("before", composite_indexes(), legacy_indexes()),
+        ("after", legacy_indexes(), composite_indexes()),
+    ):
+        with engine.begin() as conn:
+            for index in drop:
+                index.drop(conn, checkfirst=True)
+            for index in create:
+                index.create(conn, checkfirst=True)
+            conn.execute(text("ANALYZE"))
+        results[label] = measure(engine, user_ids, days, start, args.iterations)
+
+    print(f"{'query':36} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+    for label, before in results["before"].items():
+        after = results["after"][label]
+        print(f"{label:36} {before:10.3f} {after:10.3f} {before / after:7.1f}x")
+
+if __name__ == "__main__":
+    main()
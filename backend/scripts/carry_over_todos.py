@@ -0,0 +1,26 @@
+import sys
+import os
+import asyncio
+import argparse
+from datetime import date
+
+# Add the parent directory (backend) to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import rollover
+
+def main():
+    """
+    Carries every user's unfinished past todos over to --date (default: today, UTC).
+    For cron on deployments that don't set TODO_ROLLOVER_HOUR_UTC on the API itself.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--date", type=date.fromisoformat, default=None, help="Target day, YYYY-MM-DD")
+    parser.add_argument("--batch-users", type=int, default=rollover.TODO_ROLLOVER_BATCH_USERS)
+    args = parser.parse_args()
+
+    moved = asyncio.run(rollover.run_rollover(args.date, args.batch_users))
+    print(f"🌅 Carried over {moved} open todos to {rollover.rollover_stats['last_target_date']} ({rollover.rollover_stats['last_ms']}ms)")
+
+if __name__ == "__main__":
+    main()
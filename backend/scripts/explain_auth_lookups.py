@@ -0,0 +1,84 @@
+import sys
+import os
+import time
+import argparse
+
+# Add the parent directory (backend) to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from app import models, auth
+
+def seed_users(conn, dialect: str, count: int):
+    if dialect == "postgresql":
+        conn.execute(text("""
+            INSERT INTO users (id, email, username, hashed_password, full_name, created_at)
+            SELECT gen_random_uuid(), 'user' || i || '@example.com', 'user' || i, 'x', 'User ' || i, now()
+            FROM generate_series(1, :count) AS i
+        """), {"count": count})
+        conn.execute(text("ANALYZE users"))
+        return
+
+    raw = conn.connection.dbapi_connection
+    batch = 50_000
+    for start in range(0, count, batch):
+        raw.executemany(
+            "INSERT INTO users (id, email, username, hashed_password, full_name, created_at) "
+            "VALUES (?, ?, ?, 'x', ?, '2026-01-01 00:00:00')",
+            [
+                (f"{i:032x}", f"user{i}@example.com", f"user{i}", f"User {i}")
+                for i in range(start, min(start + batch, count))
+            ],
+        )
+    conn.execute(text("ANALYZE"))
+
+def explain(conn, dialect: str, stmt) -> str:
+    compiled = stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+    rows = conn.execute(text(prefix + str(compiled))).all()
+    return "\n".join(str(row[-1]) for row in rows)
+
+def main():
+    """
+    Seeds a scratch database with N users and checks that the auth lookups
+    (register/forgot-password by email, login by email or username) are served
+    by the lower() expression indexes instead of a sequential scan.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--url", default="sqlite:///./explain_auth.db", help="Sync URL of a scratch database")
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    dialect = engine.dialect.name
+    models.Base.metadata.drop_all(engine)
+    models.Base.metadata.create_all(engine)
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        seed_users(conn, dialect, args.users)
+    print(f"🌱 Seeded {args.users:,} users in {time.perf_counter() - started:.1f}s ({dialect})")
+
+    probe = f"user{args.users // 2}@example.com"
+    checks = {
+        "email lookup": (auth.select_user_by_email(probe.upper()), ["ix_users_email_lower"]),
+        "identifier lookup": (auth.select_user_by_identifier(probe), ["ix_users_email_lower", "ix_users_username_lower"]),
+    }
+
+    failed = False
+    with engine.connect() as conn:
+        for name, (stmt, indexes) in checks.items():
+            plan = explain(conn, dialect, stmt)
+            missing = [ix for ix in indexes if ix not in plan]
+            started = time.perf_counter()
+            conn.execute(stmt).all()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            status = "✅" if not missing else "❌"
+            print(f"{status} {name}: {elapsed_ms:.2f}ms\n{plan}\n")
+            failed = failed or bool(missing)
+
+    engine.dispose()
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import sys
+import os
+import asyncio
+import argparse
+import time
+
+# Add the parent directory (backend) to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import database, fx, rollups
+
+async def load(path: str, skip_rollups: bool) -> None:
+    started = time.perf_counter()
+    async with database.SessionLocal() as db:
+        with open(path, encoding="utf-8-sig", newline="") as stream:
+            loaded = await fx.load_rates(db, stream)
+        await db.commit()
+    print(f"💱 Loaded {loaded} rates from {path} in {time.perf_counter() - started:.1f}s")
+
+    if not skip_rollups:
+        started = time.perf_counter()
+        written = await rollups.backfill()
+        print(f"📊 Rebuilt {written} rollup rows in {time.perf_counter() - started:.1f}s")
+
+def main():
+    """
+    Loads exchange rates from a local `date,currency,rate` CSV (units of the currency per one
+    FX_REFERENCE_CURRENCY), so conversions work without any network access. Rollup totals were
+    converted at the rates known when they were written, so they are rebuilt afterwards unless
+    --skip-rollups is given.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", nargs="?", default=fx.FX_RATES_FILE)
+    parser.add_argument("--skip-rollups", action="store_true")
+    args = parser.parse_args()
+    if not args.path:
+        parser.error("pass a rates file or set FX_RATES_FILE")
+
+    try:
+        asyncio.run(load(args.path, args.skip_rollups))
+    except ValueError as e:
+        print(f"❌ {args.path}: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import pytest
+
+# The engine is created at import time, so point it at a scratch database first
+_TMP_DIR = tempfile.mkdtemp(prefix="atlas-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_TMP_DIR}/atlas-test.db"
+os.environ.setdefault("DB_PROFILE", "prod")
+os.environ.setdefault("EMAIL_TRANSPORT", "memory")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# Resolve the principal on every request so query counts don't depend on test order
+os.environ.setdefault("PRINCIPAL_CACHE_TTL_SECONDS", "0")
+os.environ.setdefault("ADMIN_EMAILS", "owner@example.com")
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.routers import uploads
+
+EMAIL = "owner@example.com"
+PASSWORD = "correct-horse-battery"
+
+@pytest.fixture(scope="session")
+def client():
+    uploads.UPLOAD_DIR = _TMP_DIR
+    with TestClient(app) as c:
+        yield c
+
+@pytest.fixture(scope="session")
+def tokens(client):
+    client.post("/auth/register", json={"email": EMAIL, "password": PASSWORD, "full_name": "Owner"})
+    response = client.post("/auth/login", data={"username": EMAIL, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+@pytest.fixture(scope="session")
+def auth_headers(tokens):
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+@pytest.fixture(scope="session")
+def register(client):
+    """Registers and logs in a fresh user, returning their auth headers, for tests that need their own data."""
+    def _register(email: str) -> dict:
+        client.post("/auth/register", json={"email": email, "password": PASSWORD, "full_name": email.split("@")[0]})
+        response = client.post("/auth/login", data={"username": email, "password": PASSWORD})
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return _register
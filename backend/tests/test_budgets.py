@@ -0,0 +1,71 @@
+import pytest
+
+AS_OF = "2026-03-18"  # a Wednesday; its week runs Monday 16th to Sunday 22nd
+
+@pytest.fixture(scope="module")
+def budget_user(client, register):
+    headers = register("budget-status@example.com")
+    client.post("/budgets/", json={"category": "Food", "amount": 3000, "period": "WEEKLY"}, headers=headers)
+    client.post("/budgets/", json={"category": "Bills", "amount": 100000, "period": "MONTHLY"}, headers=headers)
+    client.post("/budgets/", json={"category": "Travel", "amount": 5000, "period": "MONTHLY"}, headers=headers)
+    for day, category, amount in [
+        ("2026-03-15", "food", 500),     # Sunday before: last week
+        ("2026-03-16", "FOOD", 1200),    # Monday
+        ("2026-03-18", "Food", 900),
+        ("2026-03-19", "Food", 700),     # after as_of
+        ("2026-02-28", "bills", 50000),  # last month
+        ("2026-03-02", "Bills", 3000),
+    ]:
+        response = client.post("/expenses/", json={
+            "date": day, "amount": amount, "category": category, "description": "Budget test",
+        }, headers=headers)
+        assert response.status_code == 200, response.text
+    return headers
+
+def _status(client, headers, as_of=AS_OF):
+    response = client.get("/budgets/status", params={"as_of": as_of}, headers=headers)
+    assert response.status_code == 200, response.text
+    return {row["category"]: row for row in response.json()}
+
+def test_weekly_budget_runs_monday_to_sunday(client, budget_user):
+    food = _status(client, budget_user)["Food"]
+    assert (food["period_start"], food["period_end"]) == ("2026-03-16", "2026-03-22")
+    # Matched case-insensitively; Sunday the 15th and the 19th fall outside
+    assert food["spent"] == 2100
+    assert food["remaining"] == 900
+    assert food["burn_rate"] == 700
+    assert food["projected_spend"] == 4900
+
+    for as_of in ["2026-03-16", "2026-03-22"]:
+        food = _status(client, budget_user, as_of)["Food"]
+        assert (food["period_start"], food["period_end"]) == ("2026-03-16", "2026-03-22")
+    assert _status(client, budget_user, "2026-03-15")["Food"]["period_start"] == "2026-03-09"
+
+def test_projected_overspend_inside_period(client, budget_user):
+    # 700 a day crosses 3000 on day 4 after Monday
+    assert _status(client, budget_user)["Food"]["projected_overspend_on"] == "2026-03-20"
+
+def test_projected_overspend_null_within_budget(client, budget_user):
+    statuses = _status(client, budget_user)
+    bills = statuses["Bills"]
+    assert (bills["period_start"], bills["period_end"]) == ("2026-03-01", "2026-03-31")
+    assert bills["spent"] == 3000
+    assert bills["projected_spend"] == pytest.approx(5166.67)
+    assert bills["projected_overspend_on"] is None
+    # Nothing spent at all
+    travel = statuses["Travel"]
+    assert (travel["spent"], travel["burn_rate"], travel["projected_overspend_on"]) == (0, 0, None)
+
+def test_status_revalidates_with_etag(client, budget_user):
+    first = client.get("/budgets/status", params={"as_of": AS_OF}, headers=budget_user)
+    etag = first.headers["ETag"]
+    cached = client.get("/budgets/status", params={"as_of": AS_OF}, headers={**budget_user, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+    client.post("/budgets/", json={"category": "Gym", "amount": 2000}, headers=budget_user)
+    changed = client.get("/budgets/status", params={"as_of": AS_OF}, headers={**budget_user, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert "Gym" in {row["category"] for row in changed.json()}
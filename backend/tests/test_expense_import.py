@@ -0,0 +1,30 @@
+def _import(client, headers, lines):
+    response = client.post("/expenses/import", files={
+        "file": ("statement.csv", "\n".join(["date,amount,description,category"] + lines), "text/csv"),
+    }, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def _coffees(client, headers):
+    listed = client.get("/expenses/2026-03-02", headers=headers).json()
+    return [expense for expense in listed if expense["description"].lower() == "coffee"]
+
+def test_manual_entries_and_statements_number_identical_rows_alike(client, register):
+    headers = register("import-dedup@example.com")
+    coffee = {"date": "2026-03-02", "amount": 900, "category": "Food", "description": "Coffee"}
+    for _ in range(2):
+        assert client.post("/expenses/", json=coffee, headers=headers).status_code == 200
+
+    # The statement's first two coffees are the two entered by hand
+    summary = _import(client, headers, ["2026-03-02,900,COFFEE,Food"] * 3)
+    assert (summary["inserted"], summary["duplicates"]) == (1, 2)
+    summary = _import(client, headers, ["2026-03-02,900,coffee,Food"] * 3)
+    assert (summary["inserted"], summary["duplicates"]) == (0, 3)
+    assert len(_coffees(client, headers)) == 3
+
+    # Re-saving one keeps its own number instead of colliding with the others
+    first = _coffees(client, headers)[0]
+    response = client.put(f"/expenses/{first['id']}", json={"description": "coffee"}, headers=headers)
+    assert response.status_code == 200, response.text
+    summary = _import(client, headers, ["2026-03-02,900,Coffee,Food"] * 4)
+    assert (summary["inserted"], summary["duplicates"]) == (1, 3)
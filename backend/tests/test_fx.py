@@ -0,0 +1,99 @@
+import io
+import pytest
+from app import database, fx
+
+# USD is the reference currency: rates are units per US dollar
+RATES = """date,currency,rate
+2026-03-01,NGN,1500
+2026-03-10,NGN,1600
+2026-03-01,EUR,0.9
+"""
+
+EXPENSES = [
+    ("2026-02-20", "NGN", 100, "Food"),
+    ("2026-02-20", "USD", 5, "Food"),        # no NGN rate yet in February
+    ("2026-02-20", "EUR", 9, "Transport"),   # no rate for either side
+    ("2026-03-02", "GBP", 10, "Bills"),      # GBP never has a rate
+    ("2026-03-05", "NGN", 3000, "Food"),
+    ("2026-03-05", "USD", 10, "Food"),       # 1500 NGN per USD
+    ("2026-03-12", "USD", 10, "Food"),       # 1600 from the 10th
+    ("2026-03-12", "EUR", 9, "Transport"),   # 9 / 0.9 USD at 1600
+]
+
+@pytest.fixture(scope="module")
+def fx_user(client, register):
+    async def load():
+        async with database.SessionLocal() as db:
+            await fx.load_rates(db, io.StringIO(RATES))
+            await db.commit()
+    client.portal.call(load)
+
+    headers = register("fx@example.com")
+    for day, currency, amount, category in EXPENSES:
+        response = client.post("/expenses/", json={
+            "date": day, "amount": amount, "currency": currency, "category": category, "description": f"FX {currency} {day}",
+        }, headers=headers)
+        assert response.status_code == 200, response.text
+    client.post("/budgets/", json={"category": "Food", "amount": 40000}, headers=headers)
+    client.post("/budgets/", json={"category": "Bills", "amount": 1000}, headers=headers)
+    return headers
+
+def _daily(client, headers):
+    rows = client.get("/stats/daily", params={"start_date": "2026-02-01", "end_date": "2026-03-31"}, headers=headers).json()
+    return {row["date"]: (row["spend"], row["spend_unconverted"]) for row in rows}
+
+def _summary(client, headers, start, end):
+    response = client.get("/expenses/stats/summary", params={"start_date": start, "end_date": end}, headers=headers)
+    totals = {category: total for category, total in response.json().items() if total}
+    return totals, int(response.headers["X-Unconverted-Count"])
+
+def test_missing_rates_are_left_out_and_counted(client, fx_user):
+    assert _daily(client, fx_user) == pytest.approx({
+        "2026-02-20": (100, 2),
+        "2026-03-02": (0, 1),
+        "2026-03-05": (18000, 0),
+        "2026-03-12": (32000, 0),
+    })
+
+    # Whole months come from expense_rollups, partial ones from the raw expenses
+    for start, end in [("2026-02-01", "2026-03-31"), ("2026-02-15", "2026-03-20")]:
+        totals, unconverted = _summary(client, fx_user, start, end)
+        assert totals == pytest.approx({"Food": 34100, "Transport": 16000})
+        assert unconverted == 3
+
+    response = client.get("/expenses/range", params={"start_date": "2026-03-01", "end_date": "2026-03-31"}, headers=fx_user)
+    assert response.headers["X-Total-Count"] == "5"
+    assert float(response.headers["X-Total-Amount"]) == pytest.approx(50000)
+    assert response.headers["X-Unconverted-Count"] == "1"
+
+    statuses = {
+        row["category"]: row
+        for row in client.get("/budgets/status", params={"as_of": "2026-03-15"}, headers=fx_user).json()
+    }
+    assert (statuses["Food"]["spent"], statuses["Food"]["unconverted_count"]) == (34000, 0)
+    assert (statuses["Bills"]["spent"], statuses["Bills"]["unconverted_count"]) == (0, 1)
+
+def test_base_currency_change_rebuilds_rollups(client, fx_user):
+    response = client.put("/users/me", json={"base_currency": "USD"}, headers=fx_user)
+    assert response.status_code == 200, response.text
+    try:
+        assert _daily(client, fx_user) == pytest.approx({
+            "2026-02-20": (5, 2),       # now the NGN and EUR rows lack a rate
+            "2026-03-02": (0, 1),
+            "2026-03-05": (12, 0),      # 3000 / 1500 + 10
+            "2026-03-12": (20, 0),      # 10 + 9 / 0.9
+        })
+        totals, unconverted = _summary(client, fx_user, "2026-02-01", "2026-03-31")
+        assert totals == pytest.approx({"Food": 27, "Transport": 10})
+        assert unconverted == 3
+    finally:
+        client.put("/users/me", json={"base_currency": "NGN"}, headers=fx_user)
+
+def test_assistant_search_shows_base_amount_when_a_rate_exists(client, fx_user):
+    def search(text):
+        response = client.post("/ai/chat", json={"message": f"show me {text}"}, headers=fx_user)
+        assert response.status_code == 200, response.text
+        return response.json()["response"]
+
+    assert "($10.00 ≈ ₦15,000.00)" in search("fx usd 2026-03-05")
+    assert "(£10.00)" in search("fx gbp 2026-03-02")
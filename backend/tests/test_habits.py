@@ -0,0 +1,80 @@
+import random
+from datetime import date, datetime, timedelta
+from app import habit_bitmaps, habit_stats
+
+# Logs are dated around a day well after the habits are created, so every rate window is tracked
+ANCHOR = date.today() + timedelta(days=120)
+
+def _expected(completed: set, created: date) -> dict:
+    """Brute-force stats for the completed days as of ANCHOR."""
+    days = sorted(completed)
+    longest = run = 0
+    for i, day in enumerate(days):
+        run = run + 1 if i and day == days[i - 1] + timedelta(days=1) else 1
+        longest = max(longest, run)
+    current = run if days and days[-1] >= ANCHOR - timedelta(days=1) else 0
+    age = (ANCHOR - created).days + 1
+    rates = {
+        f"completion_{window}d": round(min(1.0, sum(
+            1 for day in days if ANCHOR - timedelta(days=window - 1) <= day <= ANCHOR
+        ) / max(1, min(window, age))), 3)
+        for window in habit_stats.RATE_WINDOWS
+    }
+    return {
+        "current_streak": current,
+        "longest_streak": longest,
+        "last_completed_on": str(days[-1]) if days else None,
+        **rates,
+    }
+
+def test_streaks_match_brute_force(client, register):
+    """Random toggle sequences, including un-toggles that split, join and trim runs."""
+    headers = register("streaks@example.com")
+    rng = random.Random(20260315)
+    for sequence in range(60):
+        habit = client.post("/habits/", json={"name": f"Streak {sequence}"}, headers=headers).json()
+        created = datetime.fromisoformat(habit["created_at"]).date()
+        completed = set()
+        for _ in range(rng.randint(1, 14)):
+            # Mostly the last few weeks, where runs form; now and then a day outside the 90-day window
+            offset = rng.randint(0, 20) if rng.random() < 0.9 else rng.randint(21, 150)
+            day = ANCHOR - timedelta(days=offset)
+            done = rng.random() < 0.7
+            response = client.post("/habits/logs", json={
+                "habit_id": habit["id"], "date": str(day), "completed": done,
+            }, headers=headers)
+            assert response.status_code == 200, response.text
+            (completed.add if done else completed.discard)(day)
+
+        stats = client.get("/habits/stats", params={"today": str(ANCHOR)}, headers=headers).json()
+        actual = next(row for row in stats if row["habit_id"] == habit["id"])
+        expected = _expected(completed, created)
+        assert {key: actual[key] for key in expected} == expected, (sequence, sorted(completed))
+        client.delete(f"/habits/{habit['id']}", headers=headers)
+
+def _naive_pack(days: set, start: date, end: date) -> bytes:
+    length = (end - start).days + 1
+    packed = bytearray((length + 7) // 8)
+    for i in range(length):
+        if start + timedelta(days=i) in days:
+            packed[i >> 3] |= 1 << (i & 7)
+    return bytes(packed)
+
+def test_bitmap_round_trip_across_years():
+    """build_years then pack_range equals a day-by-day packing, over 2024 (leap) and both its year boundaries."""
+    rng = random.Random(2024)
+    first, last = date(2023, 11, 1), date(2025, 2, 28)
+    span = (last - first).days
+    edges = [date(2023, 12, 31), date(2024, 1, 1), date(2024, 2, 29), date(2024, 3, 1), date(2024, 12, 31), date(2025, 1, 1)]
+    for _ in range(200):
+        days = {first + timedelta(days=rng.randint(0, span)) for _ in range(rng.randint(0, 120))}
+        days.update(day for day in edges if rng.random() < 0.5)
+        years = habit_bitmaps.build_years(days)
+        start = first + timedelta(days=rng.randint(0, span))
+        end = start + timedelta(days=rng.randint(0, (last - start).days))
+        assert habit_bitmaps.pack_range(years, start, end) == _naive_pack(days, start, end), (start, end)
+
+    everything = set(first + timedelta(days=i) for i in range(span + 1))
+    years = habit_bitmaps.build_years(everything)
+    assert habit_bitmaps.pack_range(years, first, last) == _naive_pack(everything, first, last)
+    assert habit_bitmaps.pack_range(years, date(2024, 2, 29), date(2024, 2, 29)) == b"\x01"
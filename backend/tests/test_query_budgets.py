@@ -0,0 +1,323 @@
+import os
+import re
+import time
+import uuid
+from datetime import date, timedelta
+from typing import Any, Callable, NamedTuple, Optional
+import pytest
+from app import auth, query_stats
+from app.main import app
+
+# Raise on slow CI machines instead of editing every budget
+LATENCY_SCALE = float(os.getenv("QUERY_BUDGET_LATENCY_SCALE", "1"))
+DEFAULT_MAX_MS = 250
+
+TODAY = date(2026, 3, 15)
+START = TODAY - timedelta(days=30)
+
+class Api:
+    def __init__(self, client, headers):
+        self.client = client
+        self.headers = headers
+
+    def post(self, path: str, **kwargs):
+        response = self.client.post(path, headers=self.headers, **kwargs)
+        assert response.status_code < 300, response.text
+        return response.json()
+
+    def put(self, path: str, **kwargs):
+        response = self.client.put(path, headers=self.headers, **kwargs)
+        assert response.status_code < 300, response.text
+        return response.json()
+
+class Case(NamedTuple):
+    name: str
+    method: str
+    path: str  # str.format()-ed with the world + setup context
+    max_queries: int
+    setup: Optional[Callable[[Api], dict]] = None
+    json: Any = None  # dict, or callable(ctx) -> dict
+    data: Any = None
+    params: Any = None
+    files: Any = None
+    status: int = 200
+    max_ms: float = DEFAULT_MAX_MS
+    xfail: Optional[str] = None
+
+@pytest.fixture(scope="session")
+def api(client, auth_headers):
+    return Api(client, auth_headers)
+
+@pytest.fixture(scope="session")
+def world(api, tokens):
+    """Seed a few rows of everything so per-row (N+1) query patterns show up in the counts."""
+    habits = [api.post("/habits/", json={"name": f"Habit {i}"}) for i in range(3)]
+    for offset in range(5):
+        for habit in habits:
+            api.post("/habits/logs", json={
+                "habit_id": habit["id"], "date": str(TODAY - timedelta(days=offset)), "completed": True,
+            })
+
+    projects = [api.post("/projects/", json={"name": f"Project {i}"}) for i in range(3)]
+    for project in projects:
+        for i in range(3):
+            api.post("/todos/", json={"content": f"Task {i}", "date": str(TODAY), "project_id": project["id"]})
+    api.post("/projects/focus", json={"date": str(TODAY), "project_id": projects[0]["id"]})
+
+    for offset in range(5):
+        day = str(TODAY - timedelta(days=offset))
+        api.put(f"/daily-notes/{day}", json={"content": f"Note {offset}", "mood": "good"})
+        api.post("/expenses/", json={"date": day, "amount": 1000 + offset, "category": "Food", "description": f"Lunch {offset}"})
+        api.post("/learning/", json={"date": day, "subject": "Python", "duration_minutes": 30})
+        api.post("/workouts/", json={"date": day, "type": "Push", "sets": [
+            {"exercise_name": "Bench", "weight": 60 + offset, "reps": 8, "order": i} for i in range(3)
+        ]})
+    api.post("/budgets/", json={"category": "Food", "amount": 50000})
+
+    resources = [api.post("/resources/", json={"title": f"Book {i}", "type": "Book"}) for i in range(3)]
+
+    return {
+        "today": str(TODAY),
+        "start": str(START),
+        "habit_id": habits[0]["id"],
+        "project_id": projects[0]["id"],
+        "resource_id": resources[0]["id"],
+        "refresh_token": tokens["refresh_token"],
+    }
+
+def _pending_todos(api: Api) -> dict:
+    for offset in range(1, 6):
+        api.post("/todos/", json={"content": f"Overdue {offset}", "date": str(TODAY - timedelta(days=offset))})
+    return {}
+
+def _new_habit(api: Api) -> dict:
+    return {"new_id": api.post("/habits/", json={"name": "Disposable"})["id"]}
+
+def _new_project(api: Api) -> dict:
+    return {"new_id": api.post("/projects/", json={"name": "Disposable"})["id"]}
+
+def _new_todo(api: Api) -> dict:
+    return {"new_id": api.post("/todos/", json={"content": "Disposable", "date": str(TODAY)})["id"]}
+
+def _new_expense(api: Api) -> dict:
+    return {"new_id": api.post("/expenses/", json={
+        "date": str(TODAY), "amount": 10, "category": "Misc", "description": "Disposable",
+    })["id"]}
+
+def _new_todos(api: Api) -> dict:
+    ids = [api.post("/todos/", json={"content": f"Batch {i}", "date": str(TODAY)})["id"] for i in range(3)]
+    return {"todo_ids": ids}
+
+def _new_learning_session(api: Api) -> dict:
+    return {"new_id": api.post("/learning/", json={"date": str(TODAY), "subject": "Go", "duration_minutes": 5})["id"]}
+
+def _new_workout(api: Api) -> dict:
+    return {"new_id": api.post("/workouts/", json={"date": str(TODAY), "type": "Legs", "sets": []})["id"]}
+
+def _new_resource(api: Api) -> dict:
+    return {"new_id": api.post("/resources/", json={"title": "Disposable", "type": "Video"})["id"]}
+
+def _new_vision_item(api: Api) -> dict:
+    return {"new_id": api.post("/vision/", json={"type": "TEXT", "content": "Disposable", "section": "NORTH_STAR"})["id"]}
+
+def _second_page(path: str, params: Optional[dict] = None) -> Callable[[Api], dict]:
+    def setup(api: Api) -> dict:
+        response = api.client.get(path, headers=api.headers, params={**(params or {}), "limit": 2})
+        assert response.status_code == 200, response.text
+        return {"cursor": response.headers["X-Next-Cursor"]}
+    return setup
+
+def _reset_token(api: Api) -> dict:
+    me = api.client.get("/users/me", headers=api.headers).json()
+    token = auth.create_access_token(
+        data={"sub": me["id"], "type": "password_reset"}, expires_delta=timedelta(minutes=5)
+    )
+    return {"reset_token": token}
+
+# Budgets are per request and include the principal lookup done by get_current_user.
+# Lower them when an endpoint gets cheaper; raising one needs a reason in the commit.
+CASES = [
+    # main.py
+    Case("register", "POST", "/auth/register", 3, json=lambda ctx: {
+        "email": f"{uuid.uuid4().hex[:8]}@example.com", "password": "another-password", "full_name": "New",
+    }, status=201),
+    Case("login", "POST", "/auth/login", 1, data={"username": "owner@example.com", "password": "correct-horse-battery"}),
+    Case("refresh", "POST", "/auth/refresh", 1, json=lambda ctx: {"refresh_token": ctx["refresh_token"]}),
+    Case("forgot_password", "POST", "/auth/forgot-password", 2, json={"email": "owner@example.com"}),
+    Case("reset_password", "POST", "/auth/reset-password", 2, setup=_reset_token,
+         json=lambda ctx: {"token": ctx["reset_token"], "new_password": "correct-horse-battery"}),
+    Case("health", "GET", "/health", 0),
+    Case("root", "GET", "/", 0),
+
+    # habits
+    Case("habits_list", "GET", "/habits/", 2),
+    Case("habits_create", "POST", "/habits/", 4, json={"name": "Read"}),
+    Case("habit_logs_day", "GET", "/habits/logs/{today}", 2),
+    Case("habit_logs_range", "GET", "/habits/logs/stats/range", 3, params=lambda ctx: {"start_date": ctx["start"], "end_date": ctx["today"]}),
+    Case("habits_stats", "GET", "/habits/stats", 2),
+    Case("habits_heatmap", "GET", "/habits/heatmap", 2, params=lambda ctx: {"start_date": ctx["start"], "end_date": ctx["today"]}),
+    Case("habit_log_toggle", "POST", "/habits/logs", 7, json=lambda ctx: {"habit_id": ctx["habit_id"], "date": ctx["today"], "completed": False}),
+    Case("habits_delete", "DELETE", "/habits/{new_id}", 6, setup=_new_habit, status=204),
+
+    # projects
+    Case("projects_list", "GET", "/projects/", 3),
+    Case("projects_create", "POST", "/projects/", 3, json={"name": "Ship it"}),
+    Case("project_focus_get", "GET", "/projects/focus/{today}", 2),
+    Case("project_todos", "GET", "/projects/{project_id}/todos", 2),
+    Case("project_focus_set", "POST", "/projects/focus", 2, json=lambda ctx: {"date": ctx["today"], "project_id": ctx["project_id"]}),
+    Case("projects_update", "PUT", "/projects/{project_id}", 6, json={"name": "Renamed", "status": "in_progress"}),
+    Case("projects_delete", "DELETE", "/projects/{new_id}", 5, setup=_new_project, status=204),
+
+    # daily notes
+    Case("notes_recent", "GET", "/daily-notes/", 3),
+    Case("notes_recent_next_page", "GET", "/daily-notes/", 2, setup=_second_page("/daily-notes/"),
+         params=lambda ctx: {"cursor": ctx["cursor"], "limit": 2}),
+    Case("notes_day", "GET", "/daily-notes/{today}", 2),
+    Case("notes_save", "PUT", "/daily-notes/{today}", 3, json={"content": "Updated", "mood": "great"}),
+
+    # expenses
+    Case("expenses_range", "GET", "/expenses/range", 3, params=lambda ctx: {"start_date": ctx["start"], "end_date": ctx["today"]}),
+    Case("expenses_range_next_page", "GET", "/expenses/range", 2,
+         setup=_second_page("/expenses/range", {"start_date": str(START), "end_date": str(TODAY)}),
+         params=lambda ctx: {"start_date": ctx["start"], "end_date": ctx["today"], "cursor": ctx["cursor"], "limit": 2}),
+    Case("expenses_day", "GET", "/expenses/{today}", 2),
+    Case("expenses_create", "POST", "/expenses/", 6, json=lambda ctx: {"date": ctx["today"], "amount": 250, "category": "Transport", "description": "Bus"}),
+    Case("expenses_update", "PUT", "/expenses/{new_id}", 7, setup=_new_expense, json={"amount": 99}),
+    Case("expenses_delete", "DELETE", "/expenses/{new_id}", 5, setup=_new_expense, status=204),
+    # principal + one hash lookup and one multi-row INSERT per batch
+    Case("expenses_import", "POST", "/expenses/import", 5, files={"file": ("statement.csv", "date,amount,description,category\n" + "".join(
+        f"2026-02-{day:02d},{day * 100},Groceries {day},Food\n" for day in range(1, 29)
+    ), "text/csv")}),
+    Case("expenses_summary", "GET", "/expenses/stats/summary", 2, params=lambda ctx: {"start_date": ctx["start"], "end_date": ctx["today"]}),
+    Case("expenses_summary_year", "GET", "/expenses/stats/summary", 2, params={"start_date": "2025-03-10", "end_date": str(TODAY)}),
+    Case("expenses_categories", "GET", "/expenses/categories/all", 3),
+
+    # search
+    Case("search", "GET", "/search/", 4, params={"q": "lunch"}),
+
+    # budgets
+    Case("budgets_list", "GET", "/budgets/", 2),
+    Case("budgets_upsert", "POST", "/budgets/", 2, json={"category": "Food", "amount": 60000, "period": "MONTHLY"}),
+    Case("budgets_status", "GET", "/budgets/status", 2),
+
+    # todos
+    Case("todos_day", "GET", "/todos/{today}", 2),
+    Case("todos_create", "POST", "/todos/", 4, json=lambda ctx: {"content": "Write tests", "date": ctx["today"]}),
+    Case("todos_update", "PATCH", "/todos/{new_id}", 5, setup=_new_todo, json={"is_completed": True}),
+    Case("todos_carry_over", "POST", "/todos/carry-over/{today}", 3, setup=_pending_todos),
+    Case("todos_delete", "DELETE", "/todos/{new_id}", 4, setup=_new_todo, status=204),
+    Case("todos_batch", "POST", "/todos/batch", 7, setup=_new_todos, json=lambda ctx: {
+        "create": [{"content": f"Bulk {i}", "date": ctx["today"]} for i in range(5)],
+        "update": [{"ids": ctx["todo_ids"][:2], "date": str(TODAY + timedelta(days=1))}],
+        "complete": ctx["todo_ids"][:2],
+        "delete": ctx["todo_ids"][2:],
+    }),
+
+    # learning
+    Case("learning_day", "GET", "/learning/{today}", 2),
+    Case("learning_range", "GET", "/learning/range", 3, params=lambda ctx: {"start_date": ctx["start"], "end_date": ctx["today"]}),
+    Case("learning_create", "POST", "/learning/", 4, json=lambda ctx: {"date": ctx["today"], "subject": "SQL", "duration_minutes": 45}),
+    Case("learning_delete", "DELETE", "/learning/{new_id}", 4, setup=_new_learning_session, status=204),
+
+    # workouts
+    Case("workouts_day", "GET", "/workouts/{today}", 3),
+    Case("workouts_range", "GET", "/workouts/stats/range", 4, params=lambda ctx: {"start_date": ctx["start"], "end_date": ctx["today"]}),
+    Case("workouts_heatmap", "GET", "/workouts/stats/heatmap", 2),
+    Case("workouts_prs", "GET", "/workouts/stats/prs", 2),
+    Case("workouts_create", "POST", "/workouts/", 6, json=lambda ctx: {"date": ctx["today"], "type": "Pull", "sets": [
+        {"exercise_name": "Row", "weight": 50, "reps": 10, "order": i} for i in range(3)
+    ]}),
+    Case("workouts_last_set", "GET", "/workouts/exercises/last/Bench", 2),
+    Case("workouts_delete", "DELETE", "/workouts/{new_id}", 5, setup=_new_workout, status=204),
+
+    # users
+    Case("users_me", "GET", "/users/me", 1),
+    Case("users_update", "PUT", "/users/me", 3, json={"full_name": "Owner Renamed"}),
+    Case("users_export", "GET", "/users/export_data", 17),
+    Case("users_export_csv", "GET", "/users/export_data", 17, params={"format": "csv"}),
+
+    # ai
+    Case("ai_navigate", "POST", "/ai/chat", 1, json={"message": "go to tasks"}),
+    Case("ai_add_todo", "POST", "/ai/chat", 3, json={"message": "add todo buy milk"}),
+    Case("ai_search", "POST", "/ai/chat", 3, json={"message": "search lunch"}),
+
+    # resources
+    Case("resources_list", "GET", "/resources/", 3),
+    Case("resources_create", "POST", "/resources/", 3, json={"title": "Course", "type": "Course"}),
+    Case("resources_update", "PATCH", "/resources/{new_id}", 4, setup=_new_resource, json={"current_progress": 40}),
+    Case("resources_delete", "DELETE", "/resources/{new_id}", 4, setup=_new_resource, status=204),
+
+    # vision
+    Case("vision_create", "POST", "/vision/", 3, json={"type": "GOAL", "content": "Run a marathon", "section": "QUARTERLY"},
+         xfail="vision router calls the sync Session API on an AsyncSession"),
+    Case("vision_list", "GET", "/vision/", 2, xfail="vision router calls the sync Session API on an AsyncSession"),
+    Case("vision_update", "PATCH", "/vision/{new_id}", 4, setup=_new_vision_item, json={"is_achieved": True},
+         xfail="vision router calls the sync Session API on an AsyncSession"),
+    Case("vision_delete", "DELETE", "/vision/{new_id}", 4, setup=_new_vision_item,
+         xfail="vision router calls the sync Session API on an AsyncSession"),
+
+    # uploads
+    Case("uploads", "POST", "/uploads/", 0, files={"file": ("note.txt", b"hello", "text/plain")}),
+
+    # dashboard
+    Case("dashboard", "GET", "/dashboard/{today}", 9),
+
+    # stats
+    Case("stats_daily", "GET", "/stats/daily", 2),
+
+    # admin
+    Case("admin_query_stats", "GET", "/admin/query-stats", 1),
+    Case("admin_runtime_stats", "GET", "/admin/runtime-stats", 1),
+    Case("admin_query_stats_reset", "DELETE", "/admin/query-stats", 1, status=204),
+]
+
+def test_every_route_has_a_case():
+    # Route parameters match either a case's {placeholder} or a literal segment
+    def pattern(path):
+        return re.compile("^" + re.sub(r"\\\{[^/]*?\\\}", "[^/]+", re.escape(path)) + "$")
+
+    missing = [
+        f"{method.upper()} {path}"
+        for path, operations in app.openapi()["paths"].items()
+        for method in operations
+        if not any(case.method == method.upper() and pattern(path).match(case.path) for case in CASES)
+    ]
+    assert not missing, f"routes without a query budget case: {missing}"
+
+def _resolve(value, ctx):
+    return value(ctx) if callable(value) else value
+
+@pytest.mark.parametrize(
+    "case",
+    [pytest.param(c, marks=pytest.mark.xfail(reason=c.xfail, strict=True)) if c.xfail else c for c in CASES],
+    ids=[c.name for c in CASES],
+)
+def test_query_budget(case: Case, api: Api, world: dict):
+    ctx = dict(world)
+    if case.setup:
+        ctx.update(case.setup(api))
+
+    kwargs = {}
+    if case.json is not None:
+        kwargs["json"] = _resolve(case.json, ctx)
+    if case.data is not None:
+        kwargs["data"] = _resolve(case.data, ctx)
+    if case.params is not None:
+        kwargs["params"] = _resolve(case.params, ctx)
+    if case.files is not None:
+        kwargs["files"] = case.files
+
+    # Route aggregates are recorded after the response body completes, so streamed responses count too
+    query_stats.reset_route_stats()
+    started = time.perf_counter()
+    response = api.client.request(case.method, case.path.format(**ctx), headers=api.headers, **kwargs)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    assert response.status_code == case.status, response.text
+    queries = sum(route["queries"] for route in query_stats.route_stats().values())
+    assert queries <= case.max_queries, (
+        f"{case.method} {case.path} issued {queries} SQL statements (budget {case.max_queries})"
+    )
+    assert elapsed_ms <= case.max_ms * LATENCY_SCALE, (
+        f"{case.method} {case.path} took {elapsed_ms:.1f}ms (budget {case.max_ms * LATENCY_SCALE:.0f}ms)"
+    )
@@ -0,0 +1,138 @@
+import random
+import uuid
+from collections import defaultdict
+from datetime import date, timedelta
+import pytest
+from sqlalchemy import select
+from app import database, models, rollups
+
+FIRST, LAST = date(2025, 11, 1), date(2026, 2, 28)
+CATEGORIES = ["Food", "Transport", "Bills"]
+
+def _user_id(client, headers):
+    return uuid.UUID(client.get("/users/me", headers=headers).json()["id"])
+
+def _read(client, user_id):
+    """(raw expenses, expense_rollups rows with expenses) straight from the tables."""
+    async def read():
+        async with database.SessionLocal() as db:
+            expenses = (await db.execute(
+                select(models.Expense.date, models.Expense.category, models.Expense.amount)
+                .where(models.Expense.user_id == user_id)
+            )).all()
+            monthly = (await db.execute(
+                select(models.ExpenseRollup.month, models.ExpenseRollup.category,
+                       models.ExpenseRollup.total, models.ExpenseRollup.expense_count)
+                .where(models.ExpenseRollup.user_id == user_id, models.ExpenseRollup.expense_count > 0)
+            )).all()
+            return expenses, monthly
+    return client.portal.call(read)
+
+def _raw_summary(expenses, start, end):
+    totals = defaultdict(float)
+    for day, category, amount in expenses:
+        if start <= day <= end:
+            totals[category] += amount
+    return totals
+
+def _assert_rollups_match(client, headers, user_id, rng):
+    expenses, monthly = _read(client, user_id)
+
+    daily = defaultdict(float)
+    months = defaultdict(lambda: [0.0, 0])
+    for day, category, amount in expenses:
+        daily[day] += amount
+        months[(rollups.month_start(day), category)][0] += amount
+        months[(rollups.month_start(day), category)][1] += 1
+
+    stats = client.get("/stats/daily", params={"start_date": str(FIRST), "end_date": str(LAST)}, headers=headers).json()
+    served = {date.fromisoformat(row["date"]): row["spend"] for row in stats if row["spend"]}
+    assert served == pytest.approx({day: total for day, total in daily.items() if total})
+
+    assert {(month, category): (total, count) for month, category, total, count in monthly} == pytest.approx(
+        {key: tuple(value) for key, value in months.items()}
+    )
+
+    span = (LAST - FIRST).days
+    for _ in range(20):
+        start = FIRST + timedelta(days=rng.randint(0, span))
+        end = start + timedelta(days=rng.randint(0, (LAST - start).days))
+        summary = client.get("/expenses/stats/summary", params={"start_date": str(start), "end_date": str(end)}, headers=headers).json()
+        expected = {category: total for category, total in _raw_summary(expenses, start, end).items() if total}
+        assert {category: total for category, total in summary.items() if total} == pytest.approx(expected), (start, end)
+
+def test_spend_rollups_match_raw_sums(client, register):
+    """Random creates, updates, deletes and imports, checked against the raw expenses before and after a backfill."""
+    headers = register("spend-rollups@example.com")
+    user_id = _user_id(client, headers)
+    rng = random.Random(2611)
+    span = (LAST - FIRST).days
+
+    def random_day():
+        return str(FIRST + timedelta(days=rng.randint(0, span)))
+
+    ids = []
+    for step in range(120):
+        action = rng.random()
+        if action < 0.45 or not ids:
+            response = client.post("/expenses/", json={
+                "date": random_day(), "amount": rng.randint(1, 500) * 10.0,
+                "category": rng.choice(CATEGORIES), "description": f"Expense {step}",
+            }, headers=headers)
+            assert response.status_code == 200, response.text
+            ids.append(response.json()["id"])
+        elif action < 0.7:
+            patch = rng.choice([
+                {"date": random_day()}, {"category": rng.choice(CATEGORIES)},
+                {"amount": rng.randint(1, 500) * 10.0}, {"date": random_day(), "category": rng.choice(CATEGORIES)},
+            ])
+            response = client.put(f"/expenses/{rng.choice(ids)}", json=patch, headers=headers)
+            assert response.status_code == 200, response.text
+        elif action < 0.9:
+            expense_id = ids.pop(rng.randrange(len(ids)))
+            assert client.delete(f"/expenses/{expense_id}", headers=headers).status_code == 204
+        else:
+            lines = ["date,amount,description,category"] + [
+                f"{random_day()},{rng.randint(1, 500) * 10},Imported {step}-{i},{rng.choice(CATEGORIES)}"
+                for i in range(rng.randint(1, 15))
+            ]
+            response = client.post(
+                "/expenses/import", files={"file": ("statement.csv", "\n".join(lines), "text/csv")}, headers=headers,
+            )
+            assert response.status_code == 200, response.text
+            listed = client.get("/expenses/range", params={
+                "start_date": str(FIRST), "end_date": str(LAST), "limit": 500,
+            }, headers=headers).json()
+            ids = [expense["id"] for expense in listed]
+
+    _assert_rollups_match(client, headers, user_id, rng)
+    client.portal.call(rollups.backfill)
+    _assert_rollups_match(client, headers, user_id, rng)
+
+@pytest.fixture(scope="module")
+def edge_user(client, register):
+    headers = register("spend-edges@example.com")
+    for day, category, amount in [
+        ("2026-01-01", "Food", 100), ("2026-01-15", "Food", 200), ("2026-01-31", "Bills", 400),
+        ("2026-02-01", "Food", 1000), ("2026-02-14", "Bills", 2000), ("2026-02-28", "Food", 4000),
+        ("2026-03-01", "Bills", 10000), ("2026-03-10", "Food", 20000),
+    ]:
+        client.post("/expenses/", json={"date": day, "amount": amount, "category": category, "description": "Edge"}, headers=headers)
+    return headers
+
+@pytest.mark.parametrize("start, end, expected", [
+    # starts mid-month: partial January, whole February and March
+    ("2026-01-15", "2026-03-31", {"Food": 25200, "Bills": 12400}),
+    # ends on the last day of a month: whole months only
+    ("2026-01-01", "2026-02-28", {"Food": 5300, "Bills": 2400}),
+    # starts mid-month and ends on that month's last day
+    ("2026-01-20", "2026-01-31", {"Bills": 400}),
+    # inside a single month
+    ("2026-02-10", "2026-02-20", {"Bills": 2000}),
+    ("2026-02-01", "2026-02-01", {"Food": 1000}),
+    # ends mid-month after whole months
+    ("2026-01-01", "2026-03-05", {"Food": 5300, "Bills": 12400}),
+])
+def test_spend_by_category_edges(client, edge_user, start, end, expected):
+    summary = client.get("/expenses/stats/summary", params={"start_date": start, "end_date": end}, headers=edge_user).json()
+    assert {category: total for category, total in summary.items() if total} == expected
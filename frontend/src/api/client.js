@@ -47,5 +47,32 @@ api.interceptors.response.use(
     }
 );
 
-export { baseURL };
+// List endpoints return one page per request, with the next page's cursor in X-Next-Cursor
+const fetchPage = async (url, params = {}, cursor = null) => {
+    const res = await api.get(url, { params: cursor ? { ...params, cursor } : params });
+    return { items: res.data, nextCursor: res.headers['x-next-cursor'] || null, headers: res.headers };
+};
+
+// Pages through a whole result set, for views that need all of it (charts, month totals).
+// Lists shown to the user should page with useInfiniteQuery + fetchPage instead.
+const FETCH_ALL_PAGE_SIZE = 500;
+const FETCH_ALL_MAX_PAGES = 10;
+
+const fetchAllPages = async (url, params = {}, maxPages = FETCH_ALL_MAX_PAGES) => {
+    const items = [];
+    let cursor = null;
+    let pages = 0;
+    do {
+        const page = await fetchPage(url, { limit: FETCH_ALL_PAGE_SIZE, ...params }, cursor);
+        items.push(...page.items);
+        cursor = page.nextCursor;
+        pages += 1;
+    } while (cursor && pages < maxPages);
+    if (cursor) {
+        console.warn(`fetchAllPages: stopped ${url} after ${items.length} items`);
+    }
+    return items;
+};
+
+export { baseURL, fetchPage, fetchAllPages };
 export default api;
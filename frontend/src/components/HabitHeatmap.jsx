@@ -1,22 +1,46 @@
 import React, { useMemo } from 'react';
 import { useQuery } from '@tanstack/react-query';
-import { format, subDays, eachDayOfInterval, startOfDay, isSameDay } from 'date-fns';
+import { format, subDays, differenceInCalendarDays, eachDayOfInterval, startOfDay } from 'date-fns';
 import api from '../api/client';
 
+const VISIBLE_DAYS = 30;
+// The streak looks back further than the grid shows; a year costs 46 bytes per habit
+const HISTORY_DAYS = 365;
+
+// Bit i (LSB first) of the base64 bitstring is start_date + i
+const decodeBits = (encoded) => {
+    const raw = atob(encoded);
+    return (i) => ((raw.charCodeAt(i >> 3) >> (i & 7)) & 1) === 1;
+};
+
 export default function HabitHeatmap({ habits }) {
     const today = startOfDay(new Date());
-    const startDate = subDays(today, 30); // Last 30 days
+    const historyStart = subDays(today, HISTORY_DAYS - 1);
+    const startDate = subDays(today, VISIBLE_DAYS);
 
-    const { data: logs = [] } = useQuery({
-        queryKey: ['habit-logs-range', format(startDate, 'yyyy-MM-dd'), format(today, 'yyyy-MM-dd')],
-        queryFn: () => api.get('/habits/logs/stats/range', {
+    const { data: heatmap } = useQuery({
+        queryKey: ['habit-heatmap', format(historyStart, 'yyyy-MM-dd'), format(today, 'yyyy-MM-dd')],
+        queryFn: () => api.get('/habits/heatmap', {
             params: {
-                start_date: format(startDate, 'yyyy-MM-dd'),
+                start_date: format(historyStart, 'yyyy-MM-dd'),
                 end_date: format(today, 'yyyy-MM-dd')
             }
         }).then(res => res.data)
     });
 
+    // Completed-habit count per day of the history window
+    const completedByDay = useMemo(() => {
+        const counts = new Array(HISTORY_DAYS).fill(0);
+        if (!heatmap) return counts;
+        Object.values(heatmap.habits).forEach(encoded => {
+            const isSet = decodeBits(encoded);
+            for (let i = 0; i < heatmap.days; i++) {
+                if (isSet(i)) counts[i]++;
+            }
+        });
+        return counts;
+    }, [heatmap]);
+
     const days = useMemo(() => {
         return eachDayOfInterval({ start: startDate, end: today });
     }, [startDate, today]);
@@ -24,8 +48,7 @@ export default function HabitHeatmap({ habits }) {
     // Calculate overall completion for each day
     const dayStats = useMemo(() => {
         return days.map(day => {
-            const dayLogs = logs.filter(l => isSameDay(startOfDay(new Date(l.date)), day));
-            const completedCount = dayLogs.filter(l => l.completed).length;
+            const completedCount = completedByDay[differenceInCalendarDays(day, historyStart)] || 0;
             const totalActiveHabits = habits.length;
 
             let intensity = 0;
@@ -41,50 +64,22 @@ export default function HabitHeatmap({ habits }) {
                 allDone: totalActiveHabits > 0 && completedCount === totalActiveHabits
             };
         });
-    }, [days, logs, habits]);
+    }, [days, completedByDay, habits]);
 
+    // Days in a row with at least one habit done, counting back from today (today may still be pending)
     const currentStreak = useMemo(() => {
-        if (!logs || logs.length === 0 || !habits || habits.length === 0) return 0;
-
-        // 1. Group logs by date
-        const logsByDate = {};
-        logs.forEach(log => {
-            // Normalize date string just in case
-            const dateKey = log.date.split('T')[0];
-            if (!logsByDate[dateKey]) logsByDate[dateKey] = [];
-            logsByDate[dateKey].push(log);
-        });
-
-        // 2. Determine "Active Days" (at least one habit completed)
-        const activeDays = new Set();
-        Object.keys(logsByDate).forEach(date => {
-            const dayLogs = logsByDate[date];
-            const anyHabitCompleted = dayLogs.some(l => l.completed);
-            if (anyHabitCompleted) activeDays.add(date);
-        });
+        if (!habits || habits.length === 0) return 0;
 
-        // 3. Count streak backwards from today
         let streak = 0;
-        let checkDate = new Date();
-        checkDate.setHours(0, 0, 0, 0);
-
-        for (let i = 0; i < 365; i++) {
-            const dateStr = format(checkDate, 'yyyy-MM-dd');
-
-            if (activeDays.has(dateStr)) {
+        for (let i = HISTORY_DAYS - 1; i >= 0; i--) {
+            if (completedByDay[i] > 0) {
                 streak++;
-            } else {
-                if (i === 0) {
-                    // Skip today if not done yet
-                } else {
-                    break;
-                }
+            } else if (i !== HISTORY_DAYS - 1) {
+                break;
             }
-            checkDate.setDate(checkDate.getDate() - 1);
         }
-
         return streak;
-    }, [logs, habits]);
+    }, [completedByDay, habits]);
 
     return (
         <div className="notion-card p-6">
@@ -57,6 +57,7 @@ export default function LearningWidget({ dateStr }) {
         mutationFn: (newSession) => api.post('/learning/', newSession),
         onSuccess: () => {
             queryClient.invalidateQueries({ queryKey: ['learning'] });
+            queryClient.invalidateQueries({ queryKey: ['dashboard', dateStr] });
             setSeconds(0);
             setIsTimerRunning(false);
             setSubject('');
@@ -67,7 +68,10 @@ export default function LearningWidget({ dateStr }) {
 
     const deleteSession = useMutation({
         mutationFn: (id) => api.delete(`/learning/${id}`),
-        onSuccess: () => queryClient.invalidateQueries({ queryKey: ['learning'] })
+        onSuccess: () => {
+            queryClient.invalidateQueries({ queryKey: ['learning'] });
+            queryClient.invalidateQueries({ queryKey: ['dashboard', dateStr] });
+        }
     });
 
     const handleStopTimer = () => {
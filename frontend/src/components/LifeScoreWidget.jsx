@@ -1,63 +1,16 @@
-import React, { useMemo } from 'react';
+import React from 'react';
 import { useQuery } from '@tanstack/react-query';
 import api from '../api/client';
 import { Trophy, TrendingUp, TrendingDown, Activity } from 'lucide-react';
 
 export default function LifeScoreWidget({ dateStr }) {
-    // 1. Fetch Habits Logs
-    const { data: habitLogs = [] } = useQuery({
-        queryKey: ['logs', dateStr],
-        queryFn: () => api.get(`/habits/logs/${dateStr}`).then(res => res.data)
+    // Shares the dashboard query, which carries the score computed server-side
+    const { data: dashboard } = useQuery({
+        queryKey: ['dashboard', dateStr],
+        queryFn: () => api.get(`/dashboard/${dateStr}`).then(res => res.data)
     });
 
-    const { data: habits = [] } = useQuery({
-        queryKey: ['habits'],
-        queryFn: () => api.get('/habits/').then(res => res.data)
-    });
-
-    // 2. Fetch Todos
-    const { data: todos = [] } = useQuery({
-        queryKey: ['todos', dateStr],
-        queryFn: () => api.get(`/todos/${dateStr}`).then(res => res.data)
-    });
-
-    // 3. Fetch Learning
-    const { data: sessions = [] } = useQuery({
-        queryKey: ['learning', dateStr],
-        queryFn: () => api.get(`/learning/${dateStr}`).then(res => res.data)
-    });
-
-    // Calculate Score
-    const score = useMemo(() => {
-        let totalScore = 0;
-
-        // Habits (50%)
-        if (habits.length > 0) {
-            const completedHabits = habitLogs.filter(l => l.completed).length;
-            const habitScore = (completedHabits / habits.length) * 50;
-            totalScore += habitScore;
-        } else {
-            // If no habits, give full points (charitable) or 0? generous for now
-            totalScore += 25;
-        }
-
-        // Todos (30%)
-        if (todos.length > 0) {
-            const completedTodos = todos.filter(t => t.is_completed).length;
-            const todoScore = (completedTodos / todos.length) * 30;
-            totalScore += todoScore;
-        } else {
-            // If empty todo list, neutral?
-            totalScore += 0;
-        }
-
-        // Focus (20%) - Target 60 mins a day?
-        const totalMinutes = sessions.reduce((acc, s) => acc + s.duration_minutes, 0);
-        const focusScore = Math.min(20, (totalMinutes / 60) * 20); // Cap at 20 pts for 1 hour
-        totalScore += focusScore;
-
-        return Math.round(totalScore);
-    }, [habitLogs, habits, todos, sessions]);
+    const score = dashboard?.life_score?.score ?? 0;
 
     const getGrade = (s) => {
         if (s >= 90) return { label: 'S', color: 'text-accent' };
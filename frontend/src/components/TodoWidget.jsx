@@ -44,6 +44,7 @@ export default function TodoWidget({ dateStr }) {
         mutationFn: (newTodo) => api.post('/todos/', newTodo),
         onSuccess: () => {
             queryClient.invalidateQueries({ queryKey: ['todos', dateStr] });
+            queryClient.invalidateQueries({ queryKey: ['dashboard', dateStr] });
             setContent('');
             setIsAdding(false);
         }
@@ -51,12 +52,18 @@ export default function TodoWidget({ dateStr }) {
 
     const toggleTodo = useMutation({
         mutationFn: ({ id, is_completed }) => api.patch(`/todos/${id}`, { is_completed }),
-        onSuccess: () => queryClient.invalidateQueries({ queryKey: ['todos', dateStr] })
+        onSuccess: () => {
+            queryClient.invalidateQueries({ queryKey: ['todos', dateStr] });
+            queryClient.invalidateQueries({ queryKey: ['dashboard', dateStr] });
+        }
     });
 
     const deleteTodo = useMutation({
         mutationFn: (id) => api.delete(`/todos/${id}`),
-        onSuccess: () => queryClient.invalidateQueries({ queryKey: ['todos', dateStr] })
+        onSuccess: () => {
+            queryClient.invalidateQueries({ queryKey: ['todos', dateStr] });
+            queryClient.invalidateQueries({ queryKey: ['dashboard', dateStr] });
+        }
     });
 
     const carryOver = useMutation({
@@ -64,6 +71,7 @@ export default function TodoWidget({ dateStr }) {
         onSuccess: () => {
             queryClient.invalidateQueries({ queryKey: ['todos', dateStr] });
             queryClient.invalidateQueries({ queryKey: ['todos', yesterdayStr] });
+            queryClient.invalidateQueries({ queryKey: ['dashboard', dateStr] });
         }
     });
 
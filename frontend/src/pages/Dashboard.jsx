@@ -84,42 +84,17 @@ function DashboardContent() {
     const { user, logout } = useAuth();
     const navigate = useNavigate();
 
-    // Queries
-    const { data: habits = [] } = useQuery({
-        queryKey: ['habits'],
-        queryFn: () => api.get('/habits/').then(res => res.data)
+    // One round trip for everything the page shows for the day; answers 304 when nothing changed
+    const { data: dashboard } = useQuery({
+        queryKey: ['dashboard', dateStr],
+        queryFn: () => api.get(`/dashboard/${dateStr}`).then(res => res.data)
     });
 
-    const { data: logs = [] } = useQuery({
-        queryKey: ['logs', dateStr], // This is mainly for "Today's" state.
-        queryFn: () => api.get(`/habits/logs/${dateStr}`).then(res => res.data)
-    });
-
-    // New: Fetch history for Heatmap & Streak
-    const { data: historyLogs = [] } = useQuery({
-        queryKey: ['habit-history'],
-        queryFn: () => api.get('/habits/logs', {
-            params: {
-                start_date: format(subDays(new Date(), 90), 'yyyy-MM-dd'),
-                end_date: format(new Date(), 'yyyy-MM-dd')
-            }
-        }).then(res => res.data).catch(() => [])
-    });
-
-    const { data: focus } = useQuery({
-        queryKey: ['focus', dateStr],
-        queryFn: () => api.get(`/projects/focus/${dateStr}`).then(res => res.data)
-    });
-
-    const { data: projects = [] } = useQuery({
-        queryKey: ['projects'],
-        queryFn: () => api.get('/projects').then(res => res.data)
-    });
-
-    const { data: note } = useQuery({
-        queryKey: ['note', dateStr],
-        queryFn: () => api.get(`/daily-notes/${dateStr}`).then(res => res.data)
-    });
+    const habits = dashboard?.habits ?? [];
+    const logs = dashboard?.habit_logs ?? [];
+    const focus = dashboard?.focus;
+    const projects = dashboard?.projects ?? [];
+    const note = dashboard?.note;
 
     // Mutations
     const toggleHabit = useMutation({
@@ -132,14 +107,16 @@ function DashboardContent() {
             });
         },
         onSuccess: () => {
+            queryClient.invalidateQueries({ queryKey: ['dashboard', dateStr] });
             queryClient.invalidateQueries({ queryKey: ['logs', dateStr] });
-            queryClient.invalidateQueries({ queryKey: ['habit-history'] });
+            queryClient.invalidateQueries({ queryKey: ['habit-heatmap'] });
+            queryClient.invalidateQueries({ queryKey: ['habit-stats'] });
         }
     });
 
     const updateNote = useMutation({
         mutationFn: (content) => api.put(`/daily-notes/${dateStr}`, { content }),
-        onSuccess: () => queryClient.invalidateQueries({ queryKey: ['note', dateStr] })
+        onSuccess: () => queryClient.invalidateQueries({ queryKey: ['dashboard', dateStr] })
     });
 
     const setFocus = useMutation({
@@ -147,7 +124,7 @@ function DashboardContent() {
             project_id: projectId,
             date: dateStr
         }),
-        onSuccess: () => queryClient.invalidateQueries({ queryKey: ['focus', dateStr] })
+        onSuccess: () => queryClient.invalidateQueries({ queryKey: ['dashboard', dateStr] })
     });
 
     // Note auto-save logic
@@ -276,7 +253,7 @@ function DashboardContent() {
                         </div>
 
                         <div className="mb-8">
-                            <HabitHeatmap habits={habits} logs={historyLogs} />
+                            <HabitHeatmap habits={habits} />
                         </div>
 
                         <div className="space-y-3">
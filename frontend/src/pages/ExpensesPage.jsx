@@ -4,7 +4,7 @@ import {
     format, startOfMonth, endOfMonth, parseISO, subMonths, addMonths,
     isSameDay, isSameWeek, startOfWeek, endOfWeek, isValid
 } from 'date-fns';
-import api from '../api/client';
+import api, { fetchAllPages } from '../api/client';
 import {
     Trash2,
     ChevronLeft,
@@ -21,6 +21,7 @@ import {
     Search,
     Filter,
     Download,
+    Upload,
     Edit2,
     ShoppingBag,
     Coffee,
@@ -67,7 +68,7 @@ export default function ExpensesPage() {
     // Fetch Expenses for range
     const { data: expenses = [] } = useQuery({
         queryKey: ['expenses-range', startDate, endDate],
-        queryFn: () => api.get(`/expenses/range?start_date=${startDate}&end_date=${endDate}`).then(res => res.data)
+        queryFn: () => fetchAllPages('/expenses/range', { start_date: startDate, end_date: endDate })
     });
 
     // Fetch Budgets
@@ -93,6 +94,20 @@ export default function ExpensesPage() {
         onSuccess: () => queryClient.invalidateQueries({ queryKey: ['expenses-range'] })
     });
 
+    // Bank statement import (CSV, OFX/QFX, QIF); rows already recorded are skipped server-side
+    const importStatement = useMutation({
+        mutationFn: (file) => {
+            const formData = new FormData();
+            formData.append('file', file);
+            return api.post('/expenses/import', formData).then(res => res.data);
+        },
+        onSuccess: (summary) => {
+            queryClient.invalidateQueries({ queryKey: ['expenses-range'] });
+            alert(`Imported ${summary.inserted} expenses (${summary.duplicates} already recorded, ${summary.invalid} unreadable).`);
+        },
+        onError: (err) => alert(err.response?.data?.detail || "Failed to import statement.")
+    });
+
     // --- Metrics Calculations ---
     const today = new Date();
 
@@ -317,6 +332,19 @@ export default function ExpensesPage() {
                                 <button onClick={downloadCSV} className="flex items-center gap-2 px-3 py-1.5 bg-surface border border-border-subtle rounded-lg text-xs font-bold text-text-secondary hover:text-primary hover:border-primary transition-all">
                                     <Download size={14} /> CSV
                                 </button>
+                                <label className="flex items-center gap-2 px-3 py-1.5 bg-surface border border-border-subtle rounded-lg text-xs font-bold text-text-secondary hover:text-primary hover:border-primary transition-all cursor-pointer">
+                                    <Upload size={14} /> {importStatement.isPending ? 'Importing...' : 'Import'}
+                                    <input
+                                        type="file"
+                                        accept=".csv,.ofx,.qfx,.qif"
+                                        className="hidden"
+                                        disabled={importStatement.isPending}
+                                        onChange={(e) => {
+                                            if (e.target.files[0]) importStatement.mutate(e.target.files[0]);
+                                            e.target.value = '';
+                                        }}
+                                    />
+                                </label>
                             </div>
                         </div>
 
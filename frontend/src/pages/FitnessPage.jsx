@@ -1,7 +1,7 @@
 import React, { useState } from 'react';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { format, subDays, startOfDay, getDay, startOfYear, eachDayOfInterval, isSameDay } from 'date-fns';
-import api from '../api/client';
+import api, { fetchAllPages } from '../api/client';
 import {
     Dumbbell,
     Plus,
@@ -80,12 +80,10 @@ export default function FitnessPage() {
     // Queries
     const { data: workouts = [] } = useQuery({
         queryKey: ['workouts', 'history'],
-        queryFn: () => api.get('/workouts/stats/range', {
-            params: {
-                start_date: format(subDays(today, 60), 'yyyy-MM-dd'),
-                end_date: format(today, 'yyyy-MM-dd')
-            }
-        }).then(res => res.data)
+        queryFn: () => fetchAllPages('/workouts/stats/range', {
+            start_date: format(subDays(today, 60), 'yyyy-MM-dd'),
+            end_date: format(today, 'yyyy-MM-dd')
+        })
     });
 
     const { data: heatmap = [] } = useQuery({
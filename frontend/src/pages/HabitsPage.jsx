@@ -1,6 +1,7 @@
 import React, { useState } from 'react';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import api from '../api/client';
+import { formatDateForAPI } from '../utils/date';
 import {
     Plus,
     Trash2,
@@ -26,6 +27,13 @@ export default function HabitsPage() {
         queryFn: () => api.get('/habits/').then(res => res.data)
     });
 
+    // Streaks and completion rates are kept on the server, so this is one row per habit
+    const { data: stats = [] } = useQuery({
+        queryKey: ['habit-stats'],
+        queryFn: () => api.get('/habits/stats', { params: { today: formatDateForAPI(new Date()) } }).then(res => res.data)
+    });
+    const statsById = Object.fromEntries(stats.map(s => [s.habit_id, s]));
+
     const createHabit = useMutation({
         mutationFn: (newHabit) => api.post('/habits/', newHabit),
         onSuccess: () => {
@@ -182,6 +190,15 @@ export default function HabitsPage() {
                                                         }`}>
                                                         {habit.difficulty}
                                                     </span>
+                                                    {statsById[habit.id] && (
+                                                        <span
+                                                            className="flex items-center gap-1 text-[10px] font-bold uppercase tracking-widest text-text-secondary"
+                                                            title={`Longest: ${statsById[habit.id].longest_streak} days · 7d ${Math.round(statsById[habit.id].completion_7d * 100)}% · 90d ${Math.round(statsById[habit.id].completion_90d * 100)}%`}
+                                                        >
+                                                            <Flame size={12} className="text-accent" />
+                                                            {statsById[habit.id].current_streak}d · {Math.round(statsById[habit.id].completion_30d * 100)}%
+                                                        </span>
+                                                    )}
                                                 </div>
                                             </div>
                                         </div>
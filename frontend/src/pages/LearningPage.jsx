@@ -1,7 +1,7 @@
 import React, { useState, useMemo } from 'react';
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { format, subDays, eachDayOfInterval, startOfDay } from 'date-fns';
-import api from '../api/client';
+import api, { fetchPage, fetchAllPages } from '../api/client';
 import {
     Timer,
     Play,
@@ -117,9 +117,10 @@ function FocusStudio() {
     const [feynmanExplanation, setFeynmanExplanation] = useState('');
 
     // Queries
+    // The session picker needs every active resource; the shelf pages through the rest
     const { data: resources = [] } = useQuery({
-        queryKey: ['resources'],
-        queryFn: () => api.get('/resources/', { params: { status: 'active' } }).then(res => res.data)
+        queryKey: ['resources', 'active'],
+        queryFn: () => fetchAllPages('/resources/', { status: 'active' })
     });
 
     const { data: sessions = [] } = useQuery({
@@ -394,15 +395,40 @@ function FocusStudio() {
     );
 }
 
+const SHELF_PAGE_SIZE = 24;
+
+function useShelf(status) {
+    const query = useInfiniteQuery({
+        queryKey: ['resources', 'shelf', status],
+        queryFn: ({ pageParam }) => fetchPage('/resources/', { status, limit: SHELF_PAGE_SIZE }, pageParam),
+        initialPageParam: null,
+        getNextPageParam: (lastPage) => lastPage.nextCursor ?? undefined
+    });
+    const items = query.data?.pages.flatMap(page => page.items) ?? [];
+    return { ...query, items };
+}
+
+function LoadMoreButton({ shelf }) {
+    if (!shelf.hasNextPage) return null;
+    return (
+        <button
+            onClick={() => shelf.fetchNextPage()}
+            disabled={shelf.isFetchingNextPage}
+            className="w-full mt-4 py-3 text-center text-xs font-bold uppercase tracking-widest text-text-secondary hover:text-primary transition-colors"
+        >
+            {shelf.isFetchingNextPage ? 'Loading...' : 'Load More'}
+        </button>
+    );
+}
+
 function LibraryShelf() {
     const [isAdding, setIsAdding] = useState(false);
     const [editingResource, setEditingResource] = useState(null);
     const queryClient = useQueryClient();
 
-    const { data: resources = [] } = useQuery({
-        queryKey: ['resources'],
-        queryFn: () => api.get('/resources/').then(res => res.data)
-    });
+    const activeShelf = useShelf('active');
+    const backlogShelf = useShelf('backlog');
+    const completedShelf = useShelf('completed');
 
     const createResource = useMutation({
         mutationFn: (newResource) => api.post('/resources/', newResource),
@@ -420,10 +446,9 @@ function LibraryShelf() {
         }
     });
 
-    // Grouping
-    const active = resources.filter(r => r.status === 'active');
-    const backlog = resources.filter(r => r.status === 'backlog');
-    const completed = resources.filter(r => r.status === 'completed');
+    const active = activeShelf.items;
+    const backlog = backlogShelf.items;
+    const completed = completedShelf.items;
 
     return (
         <div className="space-y-12 animate-in fade-in duration-500">
@@ -465,6 +490,7 @@ function LibraryShelf() {
                         </div>
                     )}
                 </div>
+                <LoadMoreButton shelf={activeShelf} />
             </section>
 
             {/* Backlog */}
@@ -482,6 +508,7 @@ function LibraryShelf() {
                         />
                     ))}
                 </div>
+                <LoadMoreButton shelf={backlogShelf} />
             </section>
 
             {/* Completed */}
@@ -499,6 +526,7 @@ function LibraryShelf() {
                         />
                     ))}
                 </div>
+                <LoadMoreButton shelf={completedShelf} />
             </section>
         </div>
     );
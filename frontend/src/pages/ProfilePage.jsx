@@ -34,14 +34,16 @@ export default function ProfilePage() {
 
     const handleExport = async () => {
         try {
-            const response = await api.get('/users/export_data');
-            const dataStr = "data:text/json;charset=utf-8," + encodeURIComponent(JSON.stringify(response.data, null, 2));
+            // One JSON object per line ({"table", "row"}), covering every table
+            const response = await api.get('/users/export_data', { params: { format: 'ndjson' }, responseType: 'blob' });
+            const url = URL.createObjectURL(response.data);
             const downloadAnchorNode = document.createElement('a');
-            downloadAnchorNode.setAttribute("href", dataStr);
-            downloadAnchorNode.setAttribute("download", `atlas_export_${new Date().toISOString().split('T')[0]}.json`);
+            downloadAnchorNode.setAttribute("href", url);
+            downloadAnchorNode.setAttribute("download", `atlas_export_${new Date().toISOString().split('T')[0]}.ndjson`);
             document.body.appendChild(downloadAnchorNode);
             downloadAnchorNode.click();
             downloadAnchorNode.remove();
+            URL.revokeObjectURL(url);
         } catch (err) {
             alert("Failed to export data.");
         }
@@ -83,14 +83,15 @@ export default function TasksPage() {
             const incomplete = yesterdayTodos.filter(t => !t.is_completed);
             if (incomplete.length === 0) return;
 
-            // Create all incomplete tasks for today
-            const promises = incomplete.map(t => api.post('/todos/', {
-                content: t.content,
-                priority: t.priority,
-                date: dateStr,
-                is_carried_over: true
-            }));
-            await Promise.all(promises);
+            // Create all incomplete tasks for today in one request
+            await api.post('/todos/batch', {
+                create: incomplete.map(t => ({
+                    content: t.content,
+                    priority: t.priority,
+                    date: dateStr,
+                    is_carried_over: true
+                }))
+            });
         },
         onSuccess: () => {
             queryClient.invalidateQueries({ queryKey: ['todos', dateStr] });